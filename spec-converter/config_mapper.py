@@ -1,4 +1,5 @@
 import camelot
+import argparse
 import logging
 import pandas as pd
 from pandas import DataFrame
@@ -6,7 +7,7 @@ import json
 import datetime
 import uuid
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import requests
 # from pathlib import Path
 from openai import OpenAI
@@ -18,6 +19,20 @@ from modules.test_bed_component import TestbedComponentsItem
 from modules.test_lab import TestLab,ContactsItem
 from modules.test_result import TestCase
 from modules.test_specification import TestSpecification,ExpectationObjectFragment, ExpectationTargetRequest
+from modules.pdf_ingest import iter_table_chunks, ingest_pdfs, camelot_settings
+from modules.extraction_cache import ExtractionCache
+from modules.llm_mapper import LLMMapper, build_prompt, DEFAULT_BASE_URL, DEFAULT_MODEL
+from modules.llm_cache import LLMResponseCache, mapping_key
+from modules.schema_slicer import SchemaSlicer
+from modules.rule_mapper import RuleMapper
+from modules.json_stream import IncrementalJsonParser, iter_configuration_parameters
+from modules.coordinate_store import CoordinateStore
+from modules.report_serializer import get_report_serializer
+from modules.provmns_client import ProvMnSClient, DEFAULT_BASE_URL as PROVMNS_BASE_URL
+from modules.rictest_exporter import rictest_config, write_rictest_config
+from modules.scenario_loader import (
+    CELL_COLUMN_FIELDS, load_scenario_csv, build_configuration_parameters, build_additional_context,
+)
 print(camelot.__file__)
 
 def open_json_schema(workdir):
@@ -29,82 +44,108 @@ def open_json_schema(workdir):
   print("No JSON schema found")
 
 
-def process_pdf(pdf_file):
+def process_pdf(pdf_file, pages_per_shard: int = 20, start_page: int = 1, header=None, cache=None):
+    """
+    Yield TableChunks of header-aligned rows from `pdf_file`, one per page shard.
 
+    Rows become available as soon as the first shard has been extracted and
+    only one shard of camelot tables is alive at a time. Resume an interrupted
+    run with start_page=chunk.last_page + 1 and header=chunk.header.
+    """
+    n_chunks = 0
+    last_page = start_page - 1
     # Read tables from the PDF using camelot
     try:
-        tables = camelot.read_pdf(str(pdf_file), flavor='lattice', pages='all')
+        for chunk in iter_table_chunks(pdf_file, pages_per_shard, start_page, header, cache):
+            n_chunks += len(chunk.df) > 0
+            last_page = chunk.last_page
+            yield chunk
     except Exception as e:
-        print(f"Failed to read PDF {pdf_file.name}: {e}")
-        logging.error(f"Failed to read PDF {pdf_file.name}: {e}")
+        print(f"Failed to read PDF {pdf_file.name} after page {last_page}: {e}")
+        logging.error(f"Failed to read PDF {pdf_file.name} after page {last_page}: {e}")
         return
 
-    if len(tables) == 0:
+    if n_chunks == 0:
         print(f"No tables detected in {pdf_file.name}")
         logging.warning(f"No tables detected in {pdf_file.name}")
         return
 
-    combined_df = pd.DataFrame()
-    first_table = True
-    header = None
-
-    for i, table in enumerate(tables):
-        table_df = table.df.reset_index(drop=True)
-
-        if first_table:
-            header = table_df.iloc[0]  # Assume the first row of the first table is the header
-            combined_df = pd.DataFrame(table_df.iloc[1:].values, columns=header)
-            first_table = False
-        else:
-            # Try to identify and remove header rows from subsequent tables
-            current_header = table_df.iloc[0]
-            if header is not None and current_header.equals(header):
-                # If the first row matches the header of the first table, skip it
-                data_rows = table_df.iloc[1:].values
-                if data_rows.size > 0:
-                    temp_df = pd.DataFrame(data_rows, columns=header)
-                    combined_df = pd.concat([combined_df, temp_df], ignore_index=True)
-            else:
-                # If the header doesn't match, assume the first row is data
-                if header is not None and table_df.shape[1] == len(header):
-                    combined_df = pd.concat([combined_df, pd.DataFrame(table_df.values, columns=header)], ignore_index=True)
-                else:
-                    print(f"Warning: Header mismatch in table {i+1} of {pdf_file.name}. Concatenating raw data.")
-                    logging.warning(f"Header mismatch in table {i+1} of {pdf_file.name}. Concatenating raw data.")
-                    combined_df = pd.concat([combined_df, table_df], ignore_index=True)
-
-    # display(combined_df)
     print("--------------------")
-    return combined_df
-    # display(combined_df.dropna())
 
-def inference_llm(content, json_schema):
-    client = OpenAI(
-        base_url = "https://integrate.api.nvidia.com/v1",
-        api_key = ""
-    )
 
-    prompt = f"""You are a helpful assistant that transforms tabular data into JSON format based on a provided JSON schema.
+_client = None
+
+
+def get_llm_client() -> OpenAI:
+    # One client (and connection pool) for every inference_llm call
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            base_url = DEFAULT_BASE_URL,
+            api_key = ""
+        )
+    return _client
+
+
+def inference_llm(content, json_schema, cache: Optional[LLMResponseCache] = None,
+                  slicer: Optional[SchemaSlicer] = None):
+    if cache is not None:
+        key = mapping_key(content, json_schema, DEFAULT_MODEL, 0.1)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-    Here is the tabular data:
-    {content}
+    client = get_llm_client()
 
+    # Only send the schema properties this row plausibly maps to
+    if slicer is not None:
+        json_schema = slicer.slice_for(json_schema, [json.loads(content)])
 
-    And here is the JSON schema:
-    {json_schema}
-    Instructions:
-    1. Map the table keys stricly to the JSON schema properties.
-    2. Only filled parameters in JSON schema that has context provided from tabular data. 
-    3. Return the result as pure JSON. Do not include any additional text or explanations."""
+    prompt = build_prompt(content, json_schema)
+
+    completion = _stream_completion(client, prompt)
+
+    # Parse while the answer streams in; a malformed answer stops the stream early
+    parser = IncrementalJsonParser()
+    values = []
+    try:
+        for text in _delta_texts(completion):
+            values.extend(parser.feed(text))
+        parser.finish()
+    finally:
+        completion.close()
+
+    result = values if parser.root == "[" or len(values) != 1 else values[0]
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def stream_inference_llm(content, json_schema, slicer: Optional[SchemaSlicer] = None):
+    """
+    Like inference_llm, but yield ConfigurationParameters as each object of the answer closes.
+
+    Validation runs while the model is still generating; malformed JSON or an
+    invalid object raises immediately and closes the stream.
+    """
+    if slicer is not None:
+        json_schema = slicer.slice_for(json_schema, [json.loads(content)])
+    completion = _stream_completion(get_llm_client(), build_prompt(content, json_schema))
+    try:
+        yield from iter_configuration_parameters(_delta_texts(completion))
+    finally:
+        completion.close()
 
+
+def _stream_completion(client, prompt):
     messages = [{"role": "user", "content": prompt}]
 
     # Print the messages array (including the prompt)
     # print("Messages Array (Sent to LLM):")
     # print(json.dumps(messages, indent=2))  # Pretty print the messages
 
-    completion = client.chat.completions.create(
-        model="meta/llama-3.3-70b-instruct",
+    return client.chat.completions.create(
+        model=DEFAULT_MODEL,
         messages=messages,
         temperature=0.1,
         top_p=0.7,
@@ -112,85 +153,91 @@ def inference_llm(content, json_schema):
         stream=True
     )
 
-    full_response = ""  # Initialize an empty string to accumulate the chunks
+
+def _delta_texts(completion):
     for chunk in completion:
-        if chunk.choices[0].delta.content is not None:
+        if chunk.choices and chunk.choices[0].delta.content is not None:
         #   print(chunk.choices[0].delta.content, end="")
-            full_response += chunk.choices[0].delta.content  # Append the chunk to the full response
+            yield chunk.choices[0].delta.content
 
-    clean_str = full_response.strip().removeprefix("```json").removesuffix("```").strip()
-    # print(clean_str)
-    return json.loads(clean_str)  # Parse the accumulated JSON string
-
-    
-# def rictest_format(config_params:ConfigurationParameters):
-#     format_dict = {
-#         "Cell_Config": [
-#             {
-#                 "Cell Type Name": "",
-#                 "Number of Cells": 0,
-#                 "band5G": "n79",
-#                 "cellsConfig": [
-#                     {
-#                         "Configured Tx Power": 0,
-#                         "Height": 0,
-#                         "Azimuth": 0,
-#                         "Tilt": 0,
-#                         "Advanced traffic model": ""
-#                     }
-#                 ]
-#             }
-#         ]
-#     }
     
-#     format_dict["Cell_Config"][0]["Cell Type Name"] = config_params.deploymentScale
-#     format_dict["Cell_Config"][0]["Number of Cells"] = config_params.numberOfCells
-#     format_dict["Cell_Config"][0]["band5G"] = config_params.band5G
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Configured Tx Power"] = config_params.totalTransmitPowerIntoAntenna
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Configured Tx Power"] = config_params.totalTransmitPowerIntoAntenna
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Height"] = config_params.height
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Azimuth"] = config_params.azimuth
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Tilt"] = config_params.tilt
-#     format_dict["Cell_Config"][0]["cellsConfig"][0]["Advanced traffic model"] = config_params.tddDlUlRatio
-    
-#     print("success formatting")
-#     return format_dict
+def rictest_format(config_params: ConfigurationParameters) -> dict:
+    """RICTest Cell_Config document for one cell type (see modules.rictest_exporter for whole layouts)."""
+    return rictest_config([config_params])
+
+def rows_to_json_objects(df: DataFrame) -> list:
+    # Get columns with integer names or single-character string names to be removed
+    cols_to_drop = [col for col in df.columns if isinstance(col, int) or (isinstance(col, str) and col.isdigit() and len(col) == 1)]
 
-def parse_pdf():
+    # Drop the identified columns
+    df = df.drop(axis=1,labels=cols_to_drop)
+
+    # Drop rows with all NaN values
+    df = df.dropna()
+
+    # Convert dataframe into json string
+    json_data = df.to_json(orient='records')
+
+    # Deserialize the JSON string into a JSON object
+    return json.loads(json_data)
+
+
+def parse_pdf(workers: int = 1, pages_per_shard: Optional[int] = None, cache_dir: Optional[str] = None,
+              mapper: Optional[LLMMapper] = None, rule_mapper: Optional[RuleMapper] = None):
+    """
+    Extract the tables of every PDF in docs/ and print them as JSON rows.
+
+    workers=1 processes the PDFs one after another in this process, streaming
+    rows out shard by shard. Any other value (None meaning one per CPU) fans
+    the PDFs, split into shards of `pages_per_shard` pages, out over a process
+    pool; results still arrive in file order and a broken PDF is skipped
+    without stopping the batch.
+
+    With `cache_dir`, extracted tables are cached per PDF content and page, so
+    unchanged documents skip camelot entirely on the next run.
+
+    With a `mapper`, the rows of each chunk are mapped to the JSON schema by
+    concurrent LLM requests and the results are printed instead of the rows.
+    A `rule_mapper` maps rows with known headers locally first, so only the
+    remaining rows reach the LLM.
+    """
     cwd = os.getcwd()  # Get the current working directory
     print(f"Current working directory: {cwd}")
 
     input_dir = Path(cwd+"/docs/")
     # print(f"Input directory: {input_dir}")
     # List each PDF in the input directory
-    pdf_files = list(input_dir.glob("*.pdf"))
+    pdf_files = sorted(input_dir.glob("*.pdf"))
     print(f"Found {len(pdf_files)} PDF files")
 
     # Load the JSON schema
     json_schema = open_json_schema(cwd)
-    # Initiate an empty list to store columns to drop
-    cols_to_drop = []
 
-    df = pd.DataFrame()
+    cache = ExtractionCache(cache_dir, settings=camelot_settings()) if cache_dir else None
 
-    for each in pdf_files:
-        # Process the PDF and get the combined DataFrame
-        df = process_pdf(each)
+    if workers == 1:
+        results = ((each, chunk.df) for each in pdf_files for chunk in process_pdf(each, pages_per_shard or 20, cache=cache))
+    else:
+        results = ((r.pdf_file, r.df) for r in ingest_pdfs(pdf_files, workers=workers, pages_per_shard=pages_per_shard, cache=cache))
 
-        # Get columns with integer names or single-character string names to be removed
-        cols_to_drop = [col for col in df.columns if isinstance(col, int) or (isinstance(col, str) and col.isdigit() and len(col) == 1)]
-       
-        # Drop the identified columns
-        df = df.drop(axis=1,labels=cols_to_drop)
-        
-        # Drop rows with all NaN values
-        df = df.dropna()
+    for each, df in results:
+        if df is None:
+            print(f"Skipping {each.name}")
+            continue
+
+        json_deserialized = rows_to_json_objects(df)
 
-        # Convert dataframe into json string
-        json_data = df.to_json(orient='records')
+        if rule_mapper is not None:
+            llmresponse = rule_mapper.map_rows(json_deserialized, json_schema, mapper)
+            for each_response in llmresponse:
+                print(each_response)
+            continue
 
-        # Deserialize the JSON string into a JSON object
-        json_deserialized = json.loads(json_data)
+        if mapper is not None:
+            llmresponse = mapper.map_rows_sync(json_deserialized, json_schema)
+            for each_response in llmresponse:
+                print(each_response)
+            continue
 
         llmresponse = []
 
@@ -220,64 +267,59 @@ def parse_pdf():
         #     # config_params.totalTransmitPowerIntoAntenna = each.get("totalTransmitPowerIntoAntenna")
         #     # print(rictest_format(config_params))
 
+    if cache is not None:
+        print(cache.report())
+    if rule_mapper is not None:
+        print(rule_mapper.report())
+        rule_mapper.save()
+    if mapper is not None:
+        print(f"LLM mapping: {mapper.stats}")
+        if mapper.cache is not None:
+            print(mapper.cache.report())
+        if mapper.schema_slicer is not None:
+            print(mapper.schema_slicer.report())
     print("Script execution finished.")
 
-def parse_csv(filename)->DataFrame:
+def parse_csv(filename, model=None, column_fields=None)->DataFrame:
+    """Scenario CSV from docs/ with camel-cased headers; `model` fixes the column dtypes."""
     cwd = os.getcwd() 
-    df = pd.read_csv(cwd+"/docs/"+filename)
-    df = df.dropna()
-    new_columns = []
-    for col in df.columns:
-        trimmed_col = col.strip()
-        l = trimmed_col.split(' ')
-        l[1:] = [x.capitalize() for x in l[1:]]
-        l = ''.join(l)
-        l = l[0].lower() + l[1:]
-        new_columns.append(l)
-    df.columns = new_columns
-    return df
+    return load_scenario_csv(cwd+"/docs/"+filename, model, column_fields)
 
 
-def parse_json_to_geolocgrp(filename: str) -> GeoLocationGroup:
-    print(f"parsing {filename}")
-    cwd = os.getcwd() 
-    filename=cwd+"/docs/"+filename
+_coordinate_store = None
+
 
-    with open(filename, "r") as f:
-        json_data = json.load(f)
+def get_coordinate_store() -> CoordinateStore:
+    # Coordinate files under docs/ are parsed once and re-read only when they change
+    global _coordinate_store
+    if _coordinate_store is None:
+        _coordinate_store = CoordinateStore(os.getcwd()+"/docs")
+    return _coordinate_store
 
-    geoloc_group_instance = GeoLocationGroup()
-    for each in json_data.get("cellsCoordinate", []):
-        latitude = each.get("y")
-        longitude = each.get("x")
-        if latitude is not None and longitude is not None:
-            geocoor = GeoCoordinates(latitude=latitude, longitude=longitude)
-            geoloc_group_instance.geoLocGrp.append(geocoor)
 
-    return geoloc_group_instance
+def parse_json_to_geolocgrp(filename: str) -> GeoLocationGroup:
+    return get_coordinate_store().load(filename).to_geolocation_group()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the test configuration and TestReport from the scenario CSVs")
+    parser.add_argument("--rictest-out", help="also write the cell scenario as a RICTest Cell_Config to this path "
+                                              "(e.g. docs/rictest_config.json)")
+    args = parser.parse_args()
+
+    df_cell_sc=parse_csv("cell-scenario.csv", ConfigurationParameters, CELL_COLUMN_FIELDS)
+    df_ue_sc=parse_csv("ue-scenario.csv", UEContext)
+    config_params_arr = build_configuration_parameters(df_cell_sc)
+    coordinates = get_coordinate_store()
+    for config_params in config_params_arr:
+        # Rows of the same deployment scale share one coordinate array
+        config_params.geoLocGrp = coordinates.for_scale(config_params.deploymentScale)
 
-    df_cell_sc=parse_csv("cell-scenario.csv")
-    df_ue_sc=parse_csv("ue-scenario.csv")
-    config_params_arr = []
-    for row in df_cell_sc.itertuples():
-        config_params = ConfigurationParameters()
-
-        geolocgrp=parse_json_to_geolocgrp(str(row.deploymentScale)+"_cell_coordinates.json")
-
-        config_params.azimuth =  int(row.antennaAzimuth)
-        config_params.tilt =  int(row.antennaTilt)
-        config_params.height =  int(row.antennaHeight)
-        config_params.numberOfCells = int(row.numberOfCells)
-        config_params.deploymentScale = row.deploymentScale
-        config_params.band5G = [row.band5G]
-        config_params.tddDlUlRatio = row.tddDlUlRatio
-        config_params.totalTransmitPowerIntoAntenna = int(row.totalTransmitPowerIntoAntenna)
-        config_params.geoLocGrp = geolocgrp.geoLocGrp
-
-        config_params_arr.append(config_params)
         # print(config_params.model_dump_json(indent=2, exclude_none=True))
+
+    if args.rictest_out:
+        # One Cell_Config entry per cell type, one cellsConfig entry per cell, streamed to disk
+        rictest_stats = write_rictest_config(config_params_arr, args.rictest_out)
+        print(f"RICTest config written to {args.rictest_out}: {rictest_stats}")
     # add_context= AdditionalContext(
     #     ueContext=UEContext(
     #         numberOfUE = int(ue_row.numberOfUE),
@@ -290,18 +332,7 @@ if __name__ == "__main__":
     #     )
     # )
 
-    additional_context = [
-        AdditionalContext(ueContext = UEContext(
-            numberOfUE = int(ue_row.numberOfUE),
-            location = ue_row.location,
-            targetThroughput = ue_row.targetThroughput,
-            slice = ue_row.slice,
-            qosId = ue_row.qosId,
-            mobilityModel = ue_row.mobilityModel,
-            mobilitySpeed = ue_row.mobilitySpeed
-        ))
-        for ue_row in df_ue_sc.itertuples()
-    ]
+    additional_context = build_additional_context(df_ue_sc)
     
         
     
@@ -371,14 +402,20 @@ if __name__ == "__main__":
     )        
 
     
-    # r = requests.put('http://localhost:8000/ProvMnS/v1alpha1/SubNetwork/{testId}'.format(testId=tm.testId), data=t.model_dump_json(indent=2, exclude_none=True))
-    r = requests.put('http://192.168.8.111:8000/ProvMnS/v1alpha1/SubNetwork/{testId}'.format(testId=tm.testId), data=t.model_dump_json(indent=2, exclude_none=True))
-    print(t.model_dump_json(indent=2, exclude_none=True))
-    print(r.status_code)
+    # Compact gzip body for the upload; the indented text is only for the console
+    t.freeze()  # finished: the upload and the console text may share cached encodes
+    serializer = get_report_serializer()
+    # Local stand-in: python -m modules.provmns_server --port 8000
+    # client = ProvMnSClient("http://localhost:8000/ProvMnS/v1alpha1", auth=('user', 'pass'))
+    client = ProvMnSClient(PROVMNS_BASE_URL, auth=('user', 'pass'), encoding="json", compression="gzip")
+    result = client.put_report(t)
+    print(serializer.text(t))
+    print(result.status_code if result.ok else result.error)
     testId = "448046e8-b7a2-4dd9-a47a-f98074e755e6"
 
-    # r = requests.get("http://localhost:8000/ProvMnS/v1alpha1/SubNetwork/{testId}".format(testId=tm.testId), auth=('user', 'pass'))
-    r = requests.get("http://192.168.8.111:8000/ProvMnS/v1alpha1/SubNetwork/{testId}".format(testId=testId), auth=('user', 'pass'))
-    print(r.status_code)
+    stored = client.get_report(testId)
+    print("found" if stored is not None else "not found")
+    print(client.metrics.report())
+    client.close()
 
-        # print(r.json())
+        # print(stored)
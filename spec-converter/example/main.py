@@ -1,14 +1,35 @@
+import re
+import gc
 import json
 from pydantic import (
     BaseModel, Field, EmailStr, AnyUrl, model_validator, field_validator,
-    ValidationError, ConfigDict
+    ValidationError, ConfigDict, TypeAdapter, AfterValidator, WithJsonSchema
 )
-from typing import List, Optional, Union, Dict, Any, Literal
+from pydantic.networks import validate_email
+from typing import List, Optional, Union, Dict, Any, Literal, NamedTuple, Annotated
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from datetime import datetime
 from uuid import UUID
 
 from modules.configuration import ConfigurationParameters
+
+# Compiled once for the testId / tags validators below
+TEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9]{3,4}([23][0-9]){1}[0-9]{4}$")
+TAG_PATTERN = re.compile(r"^[a-z0-9-]+$")
+
+
+@lru_cache(maxsize=65536)
+def _checked_email(value: str) -> str:
+    # Same check and normalization as EmailStr, but the idna/email_validator work
+    # (most of the validation time of a report) is done once per distinct address
+    return validate_email(value)[1]
+
+
+# Drop-in for EmailStr: the same contacts recur across thousands of reports
+CachedEmailStr = Annotated[str, AfterValidator(_checked_email), WithJsonSchema({"type": "string", "format": "email"})]
+
 # --- Enums defined in the schema ---
 
 class UnitsEnum(str, Enum):
@@ -80,7 +101,7 @@ class Contact(BaseModel):
     firstName: str = Field(..., max_length=255)
     lastName: str = Field(..., max_length=255)
     organization: Optional[str] = Field(None, max_length=255)
-    email: EmailStr = Field(...) # max_length validated by EmailStr implicitly usually
+    email: CachedEmailStr = Field(...) # max_length validated by EmailStr implicitly usually
     phone: Optional[str] = Field(None, max_length=255)
 
     model_config = ConfigDict(extra='forbid')
@@ -197,14 +218,13 @@ class TestMetadata(BaseModel):
     @classmethod
     def check_test_id_format(cls, v):
         if isinstance(v, str):
-            pattern = r"^[A-Za-z0-9]{3,4}([23][0-9]){1}[0-9]{4}$"
-            if not (9 <= len(v) <= 10 and re.match(pattern, v)):
+            if not (9 <= len(v) <= 10 and TEST_ID_PATTERN.match(v)):
                  # Try parsing as UUID as fallback before raising error
                 try:
                     UUID(v)
                     return v # It's a valid UUID string
                 except ValueError:
-                    raise ValueError(f"testId string '{v}' does not match pattern '{pattern}' or UUID format")
+                    raise ValueError(f"testId string '{v}' does not match pattern '{TEST_ID_PATTERN.pattern}' or UUID format")
         elif not isinstance(v, UUID):
              raise TypeError("testId must be a string or UUID")
         return v
@@ -277,10 +297,9 @@ class TestResultsSummary(BaseModel):
         if v is None:
             return None
         if isinstance(v, list):
-            pattern = r"^[a-z0-9-]+$"
             for tag in v:
-                if not isinstance(tag, str) or not re.match(pattern, tag) or len(tag) > 255:
-                     raise ValueError(f"Invalid tag: '{tag}'. Must match pattern '{pattern}' and max length 255.")
+                if not isinstance(tag, str) or not TAG_PATTERN.match(tag) or len(tag) > 255:
+                     raise ValueError(f"Invalid tag: '{tag}'. Must match pattern '{TAG_PATTERN.pattern}' and max length 255.")
         return v
 
     model_config = {
@@ -294,10 +313,83 @@ TestGroup.model_rebuild()
 TestCase.model_rebuild() # Although TestCase doesn't directly reference TestGroup, rebuild if dependencies changed
 TestResultsSummary.model_rebuild() # Rebuild the main model as well
 
-# Need re for pattern validation in validators
-import re
 
-print("Pydantic models defined successfully.")
+# --- Bulk validation ---
+
+_summary_list = TypeAdapter(List[TestResultsSummary])
+
+
+class BulkValidationResult(NamedTuple):
+    reports: List[Optional[TestResultsSummary]]  # None where the report failed (or models weren't requested)
+    errors: Dict[int, List[Dict[str, Any]]]      # report index -> its validation errors
+
+    @property
+    def n_valid(self) -> int:
+        return len(self.reports) - len(self.errors)
+
+
+def _error_entries(errors) -> List[Dict[str, Any]]:
+    # Only plain data, so the index can cross process boundaries and be logged as JSON
+    return [{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in errors]
+
+
+def _validate_chunk(payloads: List[Any], offset: int = 0, return_models: bool = True) -> BulkValidationResult:
+    # Thousands of new models trigger repeated full gc passes that free nothing;
+    # skipping them makes bulk validation about 3x faster
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _validate_chunk_inner(payloads, offset, return_models)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _validate_chunk_inner(payloads: List[Any], offset: int, return_models: bool) -> BulkValidationResult:
+    try:
+        reports = _summary_list.validate_python(payloads)
+        return BulkValidationResult(reports if return_models else [None] * len(payloads), {})
+    except ValidationError as e:
+        by_report: Dict[int, List[Dict[str, Any]]] = {}
+        for err in e.errors(include_url=False):
+            index, loc = err["loc"][0], err["loc"][1:]
+            by_report.setdefault(index, []).append({**err, "loc": loc})
+    reports: List[Optional[TestResultsSummary]] = [None] * len(payloads)
+    if return_models:
+        # One more bulk call for the reports that passed
+        ok = [i for i in range(len(payloads)) if i not in by_report]
+        for i, report in zip(ok, _summary_list.validate_python([payloads[i] for i in ok])):
+            reports[i] = report
+    errors = {offset + i: _error_entries(errs) for i, errs in sorted(by_report.items())}
+    return BulkValidationResult(reports, errors)
+
+
+def validate_reports(payloads: List[Any], workers: int = 1, chunk_size: int = 1000,
+                     return_models: bool = True) -> BulkValidationResult:
+    """
+    Validate many TestResultsSummary payloads at once, collecting every failure.
+
+    Each chunk of `chunk_size` reports is a single TypeAdapter(List[...]) call;
+    a chunk with failures is validated once more without them. With
+    workers > 1 the chunks are spread over a process pool; pass
+    return_models=False there when only the error index is needed, to skip
+    pickling the validated models back.
+    """
+    starts = range(0, len(payloads), chunk_size)
+    if workers <= 1 or len(payloads) <= chunk_size:
+        results = [_validate_chunk(payloads[start:start + chunk_size], start, return_models) for start in starts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_validate_chunk, payloads[start:start + chunk_size], start, return_models)
+                       for start in starts]
+            results = [future.result() for future in futures]
+    reports: List[Optional[TestResultsSummary]] = []
+    errors: Dict[int, List[Dict[str, Any]]] = {}
+    for result in results:
+        reports.extend(result.reports)
+        errors.update(result.errors)
+    return BulkValidationResult(reports, errors)
+
 
 # 2. Example Data
 
@@ -621,15 +713,53 @@ def test_serialization_deserialization(example_name: str, data: dict):
 
     print(f"\n--- End Testing {example_name} ---")
 
-# Run the tests
-
-test_bed = TestbedComponent(
-componentDescription="O-RU Simulator",
-manufacturerName="Viavi",
-manufacturerModel="TM500 RU SIM",
-softwareVersion="2.0.0",
-)
-print(test_bed)
-
-test_serialization_deserialization("Example 1 (Minimal)", example_data_1)
-test_serialization_deserialization("Example 2 (Complex)", example_data_2)
\ No newline at end of file
+# Run the tests (guarded so process-pool workers can import this module)
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import copy
+
+    print("Pydantic models defined successfully.")
+
+    test_bed = TestbedComponent(
+    componentDescription="O-RU Simulator",
+    manufacturerName="Viavi",
+    manufacturerModel="TM500 RU SIM",
+    softwareVersion="2.0.0",
+    )
+    print(test_bed)
+
+    test_serialization_deserialization("Example 1 (Minimal)", example_data_1)
+    test_serialization_deserialization("Example 2 (Complex)", example_data_2)
+
+    # 4. Bulk validation: python -m example.main [reports]
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch = [copy.deepcopy(example_data_2 if i % 2 else example_data_1) for i in range(n_reports)]
+    batch[7]["testMetadata"]["testId"] = "not-an-id"
+    batch[11]["tags"] = ["Bad Tag"]
+
+    print(f"\n--- Bulk validation of {n_reports} reports ---")
+    start = time.perf_counter()
+    one_by_one = []
+    for data in batch:
+        try:
+            one_by_one.append(TestResultsSummary.model_validate(data))
+        except ValidationError:
+            pass
+    print(f"model_validate loop: {time.perf_counter() - start:.2f}s, {len(one_by_one)} valid")
+    del one_by_one
+
+    start = time.perf_counter()
+    result = validate_reports(batch)
+    print(f"validate_reports: {time.perf_counter() - start:.2f}s, {result.n_valid} valid")
+
+    workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    pooled = validate_reports(batch, workers=workers, return_models=False)
+    print(f"validate_reports(workers={workers}, return_models=False): {time.perf_counter() - start:.2f}s, "
+          f"{pooled.n_valid} valid")
+    assert pooled.errors == result.errors
+    for index, errs in result.errors.items():
+        print(f"   report {index}: {errs}")
\ No newline at end of file
@@ -0,0 +1,275 @@
+import re
+import logging
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.configuration import Band5GEnum, BandLTEEnum, FrequencyRange5GEnum
+
+# Operating band frequency ranges in MHz: the downlink range, or the uplink
+# range for uplink-only (SUL) bands. NR from TS 38.101-1/-2/-5, E-UTRA from
+# TS 36.101. Bands without an entry resolve by name only.
+NR_RANGES_MHZ = {
+    1: (2110, 2170), 2: (1930, 1990), 3: (1805, 1880), 5: (869, 894), 7: (2620, 2690), 8: (925, 960),
+    12: (729, 746), 13: (746, 756), 14: (758, 768), 18: (860, 875), 20: (791, 821), 24: (1525, 1559),
+    25: (1930, 1995), 26: (859, 894), 28: (758, 803), 29: (717, 728), 30: (2350, 2360), 31: (462.5, 467.5),
+    34: (2010, 2025), 38: (2570, 2620), 39: (1880, 1920), 40: (2300, 2400), 41: (2496, 2690), 46: (5150, 5925),
+    48: (3550, 3700), 50: (1432, 1517), 51: (1427, 1432), 53: (2483.5, 2495), 54: (1670, 1675),
+    65: (2110, 2200), 66: (2110, 2200), 70: (1995, 2020), 71: (617, 652), 72: (461, 466), 74: (1475, 1518),
+    75: (1432, 1517), 76: (1427, 1432), 77: (3300, 4200), 78: (3300, 3800), 79: (4400, 5000),
+    80: (1710, 1785), 81: (880, 915), 82: (832, 862), 83: (703, 748), 84: (1920, 1980), 85: (728, 746),
+    86: (1710, 1780), 89: (824, 849), 90: (2496, 2690), 91: (1427, 1432), 92: (1432, 1517), 93: (1427, 1432),
+    94: (1432, 1517), 95: (2010, 2025), 96: (5925, 7125), 97: (2300, 2400), 98: (1880, 1920),
+    99: (1626.5, 1660.5), 100: (919.4, 925), 101: (1900, 1910), 102: (5925, 6425), 104: (6425, 7125),
+    105: (612, 652), 106: (935, 940), 109: (1432, 1517), 254: (2483.5, 2500), 255: (1525, 1559),
+    256: (2170, 2200), 257: (26500, 29500), 258: (24250, 27500), 259: (39500, 43500), 260: (37000, 40000),
+    261: (27500, 28350), 262: (47200, 48200), 263: (57000, 71000),
+}
+LTE_RANGES_MHZ = {
+    **{b: r for b, r in NR_RANGES_MHZ.items() if b < 90},
+    4: (2110, 2155), 6: (875, 885), 9: (1844.9, 1879.9), 10: (2110, 2170), 11: (1475.9, 1495.9),
+    17: (734, 746), 19: (875, 890), 21: (1495.9, 1510.9), 22: (3510, 3590), 23: (2180, 2200),
+    27: (852, 869), 32: (1452, 1496), 33: (1900, 1920), 35: (1850, 1910), 36: (1930, 1990),
+    37: (1910, 1930), 42: (3400, 3600), 43: (3600, 3800), 44: (703, 803), 45: (1447, 1467),
+    47: (5855, 5925), 49: (3550, 3700), 52: (3300, 3400), 67: (738, 758), 68: (753, 783), 69: (2570, 2620),
+    87: (420, 425), 88: (422, 427), 103: (757, 758), 106: (935, 940), 107: (612, 652), 108: (470, 698),
+}
+
+# Uplink-only (SUL) NR bands: their range above is an uplink range, so a frequency
+# they share with a band that has a downlink there resolves to the latter
+NR_SUL_BANDS = frozenset({80, 81, 82, 83, 84, 86, 89, 95, 97, 98, 99})
+
+# Common names for bands or spectrum blocks; these win over the frequency table
+NR_NAMES = {
+    "cband": 77, "cbrs": 48, "aws": 66, "aws1": 66, "aws3": 66, "pcs": 25, "700mhz": 28, "600mhz": 71,
+    "800mhz": 20, "850mhz": 5, "900mhz": 8, "1800mhz": 3, "1.8ghz": 3, "1900mhz": 2, "1.9ghz": 2,
+    "2100mhz": 1, "2.1ghz": 1, "2300mhz": 40, "2.3ghz": 40, "2500mhz": 41, "2.5ghz": 41, "2600mhz": 7,
+    "2.6ghz": 7, "3500mhz": 78, "3.5ghz": 78, "3700mhz": 77, "3.7ghz": 77, "4900mhz": 79, "4.9ghz": 79,
+    "24ghz": 258, "26ghz": 258, "28ghz": 257, "39ghz": 260, "47ghz": 262, "60ghz": 263,
+}
+LTE_NAMES = {
+    "aws": 66, "aws1": 4, "aws3": 66, "pcs": 25, "cbrs": 48, "700mhz": 28, "800mhz": 20, "850mhz": 5,
+    "900mhz": 8, "1800mhz": 3, "1.8ghz": 3, "1900mhz": 2, "1.9ghz": 2, "2100mhz": 1, "2.1ghz": 1,
+    "2300mhz": 40, "2.3ghz": 40, "2600mhz": 7, "2.6ghz": 7, "3500mhz": 42, "3.5ghz": 42,
+}
+
+# Top of the frequency grid: FR2-2 ends at 71 GHz
+_GRID_MHZ = 71_001
+_FREQUENCY = re.compile(r"^(\d+(?:[.,]\d+)?)(ghz|mhz|khz|hz)$")
+_FREQUENCY_SCALE = {"ghz": 1000.0, "mhz": 1.0, "khz": 1e-3, "hz": 1e-6}
+# Prefixes people put in front of a band number
+_NR_PREFIXES = ("", "n", "nr", "band", "bandn", "nrband", "nrbandn", "5gband", "5gn", "5gnrn", "5gnr", "5gnrband")
+_LTE_PREFIXES = ("", "b", "band", "bandb", "lte", "lteb", "lteband", "eutra", "eutraband", "eband", "e")
+
+
+def frequency_range(mhz: float) -> Optional[FrequencyRange5GEnum]:
+    """FR1 / FR2-1 / FR2-2 for a frequency in MHz (TS 38.104 definitions)."""
+    if 410 <= mhz <= 7125:
+        return FrequencyRange5GEnum.FR1
+    if 24250 <= mhz <= 52600:
+        return FrequencyRange5GEnum.FR2_1
+    if 52600 < mhz <= 71000:
+        return FrequencyRange5GEnum.FR2_2
+    return None
+
+
+def arfcn_to_mhz(arfcn):
+    """NR-ARFCN to MHz on the global frequency raster (TS 38.104 5.4.2.1); works on arrays too."""
+    n = np.asarray(arfcn, dtype=np.float64)
+    mhz = np.where(n < 600_000, n * 0.005,
+                   np.where(n < 2_016_667, 3000 + (n - 600_000) * 0.015, 24250.08 + (n - 2_016_667) * 0.06))
+    return mhz if mhz.ndim else float(mhz)
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"[\s_\-:#]", "", text.lower())
+
+
+class BandIndex:
+    """
+    Hash indexes from free-text band values to one band enum (Band5GEnum or BandLTEEnum).
+
+    Every spelling is precomputed once: the enum values, the band number with
+    the usual prefixes ("n78", "N78", "78", "Band 78", "NR band n78", ...) and
+    common names ("C-band", "3.5 GHz"), keyed by the lowercased text with
+    spaces, dashes and underscores removed. Other frequencies ("3.6 GHz",
+    "2655 MHz") go through a 1 MHz grid over 0-71 GHz that holds the
+    narrowest band covering each frequency; among equally narrow bands a
+    non-SUL band wins, then the lowest band number. A lookup is therefore one dict
+    probe or one array index; resolve_series() does a whole column by
+    resolving its distinct values only.
+    """
+
+    def __init__(self, enum_cls: Type[Enum], ranges: Dict[int, Tuple[float, float]],
+                 names: Dict[str, int], prefixes: Iterable[str], uplink_only: Iterable[int] = ()):
+        self.enum_cls = enum_cls
+        self.members: List[Enum] = list(enum_cls)
+        number_of = {m: int(re.sub(r"\D", "", m.value)) for m in self.members}
+        by_number = {n: m for m, n in number_of.items()}
+
+        self.aliases: Dict[str, Enum] = {}
+        for member, number in number_of.items():
+            for prefix in prefixes:
+                self.aliases[f"{prefix}{number}"] = member
+            self.aliases[_compact(member.value)] = member
+            self.aliases[_compact(member.name)] = member
+        for name, number in names.items():
+            if number in by_number:
+                self.aliases.setdefault(name, by_number[number])
+
+        # Narrowest range wins where bands overlap (n78 inside n77, n48 inside n78, ...), then non-SUL
+        # (n34 over n95), then the lowest band number (n50 over n109); the winner is painted last
+        self.ranges = {m: ranges[n] for m, n in number_of.items() if n in ranges}
+        self.grid = np.full(_GRID_MHZ, -1, dtype=np.int16)
+        code_of = {m: i for i, m in enumerate(self.members)}
+        uplink_only = set(uplink_only)
+        priority = lambda m: (self.ranges[m][1] - self.ranges[m][0], number_of[m] in uplink_only, number_of[m])
+        for member in sorted(self.ranges, key=priority, reverse=True):
+            lo, hi = self.ranges[member]
+            self.grid[int(np.ceil(lo)):int(np.floor(hi)) + 1] = code_of[member]
+        self.misses = 0
+
+    def by_frequency(self, mhz: float) -> Optional[Enum]:
+        index = int(round(mhz))
+        if not 0 <= index < _GRID_MHZ:
+            return None
+        code = self.grid[index]
+        return self.members[code] if code >= 0 else None
+
+    def resolve(self, value) -> Optional[Enum]:
+        """The band for a free-text (or numeric band number) value, None when it is not a band."""
+        if value is None:
+            return None
+        if isinstance(value, self.enum_cls):
+            return value
+        if isinstance(value, (int, np.integer)):
+            value = str(int(value))
+        elif isinstance(value, (float, np.floating)):
+            if value != value or not float(value).is_integer():
+                return None
+            value = str(int(value))
+        key = _compact(str(value))
+        member = self.aliases.get(key)
+        if member is not None:
+            return member
+        match = _FREQUENCY.match(key)
+        if match:
+            return self.by_frequency(float(match.group(1).replace(",", ".")) * _FREQUENCY_SCALE[match.group(2)])
+        self.misses += 1
+        return None
+
+    def resolve_series(self, values: pd.Series, keep_unresolved: bool = False) -> pd.Series:
+        """
+        Resolve a whole column to band values (categorical of enum value strings).
+
+        Each distinct value is resolved once and mapped back through the
+        factorized codes. Unresolved cells become NA, or keep their original
+        text with keep_unresolved=True (so model validation reports them).
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        resolved = [self.resolve(u) for u in uniques]
+        categories = [m.value for m in self.members]
+        position = {v: i for i, v in enumerate(categories)}
+        lookup = np.array([position[m.value] if m is not None else -1 for m in resolved] + [-1], dtype=np.int32)
+        band_codes = lookup[codes]  # the NA sentinel -1 indexes the trailing -1
+        result = pd.Series(pd.Categorical.from_codes(band_codes, categories=categories), index=values.index,
+                           name=values.name)
+        if keep_unresolved and (band_codes < 0).any():
+            result = result.astype(object).where(band_codes >= 0, values.astype(object))
+        return result
+
+    def frequencies_to_bands(self, mhz) -> pd.Categorical:
+        """Vectorized by_frequency() over an array of MHz values."""
+        index = np.rint(np.asarray(mhz, dtype=np.float64))
+        valid = (index >= 0) & (index < _GRID_MHZ)
+        codes = np.full(index.shape, -1, dtype=np.int16)
+        codes[valid] = self.grid[index[valid].astype(np.int64)]
+        return pd.Categorical.from_codes(codes, categories=[m.value for m in self.members])
+
+    def frequency_range(self, band) -> Optional[FrequencyRange5GEnum]:
+        """The FrequencyRange5GEnum of a band (any spelling resolve() accepts)."""
+        member = self.resolve(band)
+        if member is None:
+            return None
+        return BAND_FREQUENCY_RANGES.get(member.value) if self.enum_cls is Band5GEnum else \
+            FrequencyRange5GEnum.FR1 if member in self.ranges else None
+
+
+NR_BANDS = BandIndex(Band5GEnum, NR_RANGES_MHZ, NR_NAMES, _NR_PREFIXES, NR_SUL_BANDS)
+LTE_BANDS = BandIndex(BandLTEEnum, LTE_RANGES_MHZ, LTE_NAMES, _LTE_PREFIXES)
+BAND_INDEXES = {Band5GEnum: NR_BANDS, BandLTEEnum: LTE_BANDS}
+
+# Band value -> frequency range; NTN bands n510-n512 are in the FR2-NTN range
+BAND_FREQUENCY_RANGES: Dict[str, FrequencyRange5GEnum] = {
+    member.value: frequency_range((lo + hi) / 2) for member, (lo, hi) in NR_BANDS.ranges.items()
+}
+BAND_FREQUENCY_RANGES.update({b: FrequencyRange5GEnum.FR2_NTN for b in ("n510", "n511", "n512")})
+
+
+def band_frequency_ranges(bands: pd.Series) -> pd.Series:
+    """Vectorized band -> FrequencyRange5GEnum value for a column of Band5GEnum values (any spelling)."""
+    resolved = NR_BANDS.resolve_series(bands)
+    categories = [BAND_FREQUENCY_RANGES[c].value if c in BAND_FREQUENCY_RANGES else None
+                  for c in resolved.cat.categories]
+    return pd.Series(np.array(categories + [None], dtype=object)[resolved.cat.codes.to_numpy()],
+                     index=bands.index, name="frequencyRange5G")
+
+
+def normalize_band(value, lte: bool = False) -> Optional[str]:
+    """Band enum value for free text ("N78", "Band 78", "3.5 GHz" -> "n78"), None when unknown."""
+    member = (LTE_BANDS if lte else NR_BANDS).resolve(value)
+    if member is None:
+        logging.debug(f"Unrecognised {'LTE' if lte else 'NR'} band {value!r}")
+    return member.value if member is not None else None
+
+
+if __name__ == "__main__":
+    # python -m modules.band_index [rows]
+    import sys
+    import time
+
+    samples = ["n78", "N78", "78", "Band 78", "3.5 GHz", "NR band n41", "2655 MHz", "C-band", "n257", "28GHz",
+               "band_n1", "700 MHz", "bogus", None, 77.0]
+    for text in samples:
+        band = NR_BANDS.resolve(text)
+        print(f"{text!r:15} -> {band.value if band else None!s:6} {NR_BANDS.frequency_range(band) if band else ''}")
+    print(f"LTE: {[normalize_band(t, lte=True) for t in ('B3', 'Band 7', '20', 'LTE band 41', '1.8 GHz')]}")
+    # Equally wide overlaps: downlink bands over SUL bands, then the lowest number; 2350 MHz is in the narrower n30
+    for text, expected in (("2015 MHz", "n34"), ("2380 MHz", "n40"), ("2350 MHz", "n30"), ("1450 MHz", "n50"),
+                           ("1890 MHz", "n39")):
+        assert NR_BANDS.resolve(text).value == expected, (text, NR_BANDS.resolve(text), expected)
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    column = pd.Series(rng.choice([s for s in samples if s is not None] + ["n79", "Band 3", "n28"], n_rows))
+
+    def enum_construction(value):
+        # The old way: try each spelling and let the enum reject it
+        text = str(value).strip()
+        for candidate in (text, text.lower(), f"n{text}", "n" + re.sub(r"\D", "", text)):
+            try:
+                return Band5GEnum(candidate).value
+            except ValueError:
+                continue
+        return None
+
+    start = time.perf_counter()
+    old = [enum_construction(v) for v in column.tolist()]
+    old_s = time.perf_counter() - start
+    start = time.perf_counter()
+    new = NR_BANDS.resolve_series(column)
+    new_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scalar = [NR_BANDS.resolve(v) for v in column.tolist()]
+    scalar_s = time.perf_counter() - start
+    print(f"{n_rows} values: enum construction loop {old_s:.2f}s ({sum(v is not None for v in old)} resolved), "
+          f"resolve() loop {scalar_s:.2f}s, resolve_series {new_s:.3f}s ({new.notna().sum()} resolved)")
+
+    mhz = rng.uniform(400, 45000, n_rows)
+    start = time.perf_counter()
+    bands = NR_BANDS.frequencies_to_bands(mhz)
+    ranges = band_frequency_ranges(pd.Series(bands))
+    print(f"{n_rows} frequencies -> band and frequency range: {time.perf_counter() - start:.3f}s "
+          f"({pd.Series(bands).notna().mean():.0%} inside a band)")
@@ -1,7 +1,7 @@
 import re
 from pydantic import (
     BaseModel, Field, AnyUrl, model_validator, field_validator,
-    ValidationError
+    ValidationError, field_serializer
 )
 from typing import List, Optional, Union, Dict, Any
 from enum import Enum
@@ -257,6 +257,13 @@ class ConfigurationParameters(BaseModel):
         'extra': 'allow'          # Allow fields not explicitly defined above
     }
 
+    @field_serializer("geoLocGrp", mode="wrap")
+    def _serialize_geo_loc_grp(self, value, handler, info):
+        # A shared CoordinatePoints array is turned into GeoCoordinates dicts only here
+        if hasattr(value, "to_json_list"):
+            return value.to_json_list(exclude_none=info.exclude_none)
+        return handler(value)
+
 # Example of how you might use this class definition with an LLM (conceptual)
 
 hypothetical_vendor_text = """
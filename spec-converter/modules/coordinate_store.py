@@ -0,0 +1,289 @@
+import os
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+
+from modules.configuration import GeoCoordinates, GeoLocationGroup
+
+# Binary coordinate file: 32-byte header, then the latitude, longitude and
+# altitude columns as little-endian float64 arrays of `count` values each
+COORD_MAGIC = b"GEOC"
+COORD_VERSION = 1
+COORD_SUFFIX = ".geoc"
+_HEADER = struct.Struct("<4sHHQ16x")  # magic, version, flags, count
+_HAS_ALTITUDE = 0x1
+
+
+class CoordinatePoints:
+    """
+    Read-only cell coordinates held as one (n, 3) float64 array of latitude,
+    longitude and altitude (NaN when unknown).
+
+    Many ConfigurationParameters can share the same instance as their
+    geoLocGrp; GeoCoordinates objects are only built when asked for, and
+    report serialization goes straight from the array to plain dicts.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        array = np.asarray(array, dtype=np.float64)
+        if array.ndim != 2 or array.shape[1] != 3:
+            raise ValueError(f"Expected an (n, 3) lat/lon/alt array, got shape {array.shape}")
+        if array.flags.writeable:
+            array = array.copy()
+            array.flags.writeable = False
+        self.array = array
+
+    @property
+    def latitude(self) -> np.ndarray:
+        return self.array[:, 0]
+
+    @property
+    def longitude(self) -> np.ndarray:
+        return self.array[:, 1]
+
+    @property
+    def altitude(self) -> np.ndarray:
+        return self.array[:, 2]
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, i: int) -> GeoCoordinates:
+        lat, lon, alt = self.array[i].tolist()
+        return GeoCoordinates(latitude=lat, longitude=lon, altitude=None if alt != alt else alt)
+
+    def __iter__(self):
+        for i in range(len(self.array)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"CoordinatePoints({len(self)} points)"
+
+    def to_geo_coordinates(self) -> List[GeoCoordinates]:
+        return list(self)
+
+    def to_geolocation_group(self) -> GeoLocationGroup:
+        return GeoLocationGroup(geoLocGrp=self.to_geo_coordinates())
+
+    def to_json_list(self, exclude_none: bool = False) -> List[dict]:
+        """What a list of GeoCoordinates would dump to, without building the models."""
+        has_alt = ~np.isnan(self.altitude)
+        out = []
+        for (lat, lon, alt), known in zip(self.array.tolist(), has_alt.tolist()):
+            if known:
+                out.append({"latitude": lat, "longitude": lon, "altitude": alt})
+            elif exclude_none:
+                out.append({"latitude": lat, "longitude": lon})
+            else:
+                out.append({"latitude": lat, "longitude": lon, "altitude": None})
+        return out
+
+
+def load_cells_coordinate(path) -> np.ndarray:
+    """(n, 3) lat/lon/alt array from a RICTest `cellsCoordinate` JSON file (x = lon, y = lat)."""
+    with open(path, "r") as f:
+        json_data = json.load(f)
+    cells = json_data.get("cellsCoordinate", [])
+    lat = np.array([c.get("y") for c in cells], dtype=np.float64)
+    lon = np.array([c.get("x") for c in cells], dtype=np.float64)
+    keep = ~(np.isnan(lat) | np.isnan(lon))  # entries without x or y are skipped
+    out = np.full((int(keep.sum()), 3), np.nan)
+    out[:, 0] = lat[keep]
+    out[:, 1] = lon[keep]
+    return out
+
+
+def write_coordinate_file(path, points) -> Path:
+    """Write an (n, 3) lat/lon/alt array (or CoordinatePoints) in the binary coordinate format."""
+    array = points.array if isinstance(points, CoordinatePoints) else np.asarray(points, dtype=np.float64)
+    flags = 0 if np.isnan(array[:, 2]).all() else _HAS_ALTITUDE
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(COORD_MAGIC, COORD_VERSION, flags, len(array)))
+        # Column by column so each of lat/lon/alt is one contiguous array on disk
+        np.ascontiguousarray(array.T, dtype="<f8").tofile(f)
+    os.replace(tmp, path)
+    return path
+
+
+def open_coordinate_file(path) -> CoordinatePoints:
+    """Memory-map a binary coordinate file; no point data is read until it is used."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path}: truncated coordinate file header")
+    magic, version, _flags, count = _HEADER.unpack(header)
+    if magic != COORD_MAGIC or version != COORD_VERSION:
+        raise ValueError(f"{path}: not a version {COORD_VERSION} coordinate file")
+    expected = _HEADER.size + 3 * 8 * count
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path}: expected {expected} bytes for {count} points")
+    if count == 0:
+        return CoordinatePoints(np.empty((0, 3)))
+    columns = np.memmap(path, dtype="<f8", mode="r", offset=_HEADER.size, shape=(3, count))
+    return CoordinatePoints(columns.T)
+
+
+def convert_cells_coordinate(json_path, out_path=None) -> Path:
+    """Convert a `cellsCoordinate` JSON file to the binary format (next to it by default)."""
+    json_path = Path(json_path)
+    out_path = Path(out_path) if out_path is not None else json_path.with_suffix(COORD_SUFFIX)
+    return write_coordinate_file(out_path, load_cells_coordinate(json_path))
+
+
+class MappedGeoLocationGroup(BaseModel):
+    """
+    GeoLocationGroup read zero-copy from a binary coordinate file.
+
+    Serializes exactly like GeoLocationGroup, but geoLocGrp stays a
+    memory-mapped CoordinatePoints until the dump.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    geoLocGrp: CoordinatePoints = Field(
+        description="Memory-mapped geolocation points."
+    )
+
+    @classmethod
+    def from_file(cls, path) -> "MappedGeoLocationGroup":
+        return cls(geoLocGrp=open_coordinate_file(path))
+
+    @field_serializer("geoLocGrp")
+    def _serialize_points(self, value: CoordinatePoints, info):
+        return value.to_json_list(exclude_none=info.exclude_none)
+
+    def to_geolocation_group(self) -> GeoLocationGroup:
+        return self.geoLocGrp.to_geolocation_group()
+
+
+class CoordinateStore:
+    """
+    Loads each coordinate file once and hands out the shared CoordinatePoints.
+
+    A file is re-read only when its mtime or size changes, so the three
+    `<deploymentScale>_cell_coordinates.json` files cost one parse each no
+    matter how many scenario rows refer to them. A converted `.geoc` file next
+    to the JSON is memory-mapped instead of parsed.
+    """
+
+    def __init__(self, root: Union[str, Path] = "."):
+        self.root = Path(root)
+        self._cache: Dict[Path, Tuple[int, int, CoordinatePoints]] = {}
+        self.stats = {"loads": 0, "hits": 0}
+
+    def load(self, filename: Union[str, Path]) -> CoordinatePoints:
+        path = self.root / filename
+        st = os.stat(path)
+        cached = self._cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            self.stats["hits"] += 1
+            return cached[2]
+        if path.suffix == COORD_SUFFIX:
+            points = open_coordinate_file(path)
+        else:
+            print(f"parsing {path}")
+            points = CoordinatePoints(load_cells_coordinate(path))
+        self._cache[path] = (st.st_mtime_ns, st.st_size, points)
+        self.stats["loads"] += 1
+        return points
+
+    def for_scale(self, deployment_scale) -> CoordinatePoints:
+        """Coordinates of `<deploymentScale>_cell_coordinates.json` (enum or plain string)."""
+        scale = getattr(deployment_scale, "value", deployment_scale)
+        return self.load(self._pick(f"{scale}_cell_coordinates"))
+
+    def _pick(self, stem: str) -> str:
+        # Prefer the binary file unless the JSON next to it is newer
+        binary, source = self.root / (stem + COORD_SUFFIX), self.root / (stem + ".json")
+        if binary.exists() and (not source.exists() or binary.stat().st_mtime_ns >= source.stat().st_mtime_ns):
+            return binary.name
+        return source.name
+
+    def report(self) -> str:
+        return f"coordinate store {self.root}: {self.stats['loads']} file loads, {self.stats['hits']} cache hits"
+
+
+if __name__ == "__main__":
+    # Convert JSON layouts to the binary format:
+    #   python -m modules.coordinate_store convert docs/*_cell_coordinates.json
+    # Benchmark: one scenario row per iteration, 3 deployment scales, 10k cells each,
+    # then a 1M-point layout opened from JSON and from the binary format
+    #   python -m modules.coordinate_store [rows] [cells]
+    import sys
+    import time
+    import tempfile
+    import tracemalloc
+
+    if len(sys.argv) > 1 and sys.argv[1] == "convert":
+        for json_path in sys.argv[2:]:
+            out = convert_cells_coordinate(json_path)
+            print(f"{json_path} -> {out} ({len(open_coordinate_file(out))} points)")
+        sys.exit(0)
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    n_cells = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    scales = ["micro", "pico", "macro"]
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            cells = [{"x": float(x), "y": float(y)}
+                     for x, y in zip(rng.uniform(121.4, 121.6, n_cells), rng.uniform(25.0, 25.1, n_cells))]
+            with open(os.path.join(tmp, f"{scale}_cell_coordinates.json"), "w") as f:
+                json.dump({"cellsCoordinate": cells}, f)
+
+        # Previous behaviour: parse the file and build GeoCoordinates for every row
+        start = time.perf_counter()
+        legacy = []
+        for i in range(n_rows):
+            with open(os.path.join(tmp, f"{scales[i % 3]}_cell_coordinates.json")) as f:
+                data = json.load(f)
+            legacy.append([GeoCoordinates(latitude=c["y"], longitude=c["x"]) for c in data["cellsCoordinate"]])
+        print(f"per-row parse: {time.perf_counter() - start:.2f}s for {n_rows} rows x {n_cells} cells")
+
+        store = CoordinateStore(tmp)
+        start = time.perf_counter()
+        shared = [store.for_scale(scales[i % 3]) for i in range(n_rows)]
+        print(f"coordinate store: {time.perf_counter() - start:.3f}s ({store.report()})")
+        print(f"memory: {sum(p.array.nbytes for p in {id(p): p for p in shared}.values()) / 1e6:.2f} MB "
+              f"of arrays shared by {n_rows} rows")
+
+        assert shared[0].to_json_list(exclude_none=True) == [g.model_dump(exclude_none=True) for g in legacy[0]]
+
+        n_big = 1_000_000
+        big_json = os.path.join(tmp, "dense_cell_coordinates.json")
+        with open(big_json, "w") as f:
+            json.dump({"cellsCoordinate": [{"x": float(x), "y": float(y)} for x, y in
+                                           zip(rng.uniform(121.4, 121.6, n_big), rng.uniform(25.0, 25.1, n_big))]}, f)
+        start = time.perf_counter()
+        big_bin = convert_cells_coordinate(big_json)
+        print(f"\nconverted {n_big} points in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(big_json) / 1e6:.0f} MB JSON -> {os.path.getsize(big_bin) / 1e6:.0f} MB)")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        mapped = MappedGeoLocationGroup.from_file(big_bin)
+        open_s = time.perf_counter() - start
+        heap = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"memory-mapped open: {open_s * 1000:.2f} ms, {heap / 1e3:.1f} kB heap peak")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(big_json) as f:
+            data = json.load(f)
+        group = GeoLocationGroup(geoLocGrp=[GeoCoordinates(latitude=c["y"], longitude=c["x"])
+                                            for c in data["cellsCoordinate"]])
+        json_s = time.perf_counter() - start
+        heap = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"JSON -> GeoLocationGroup: {json_s:.2f}s, {heap / 1e6:.0f} MB heap peak")
+
+        assert mapped.model_dump_json(exclude_none=True) == group.model_dump_json(exclude_none=True)
@@ -0,0 +1,268 @@
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from modules.measurement_series import MeasurementSeries
+from modules.test_result import MeasurementsItem, MetricsItem, ResultType, TestCase, TestStatus, Units
+from modules.test_specification import ConditionEnum, ExpectationTargetRequest, TestSpecification
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[np.ndarray], np.ndarray]
+
+# targetUnit spellings that are not Units values themselves
+_UNIT_ALIASES = {"%": Units.PERCENTAGE, "percent": Units.PERCENTAGE, "w": Units.Watt, "watt": Units.Watt,
+                 "ms": Units.MILLISECOND, "s": Units.SECOND, "mbit/s": Units.MBPS, "db": Units.DB, "dbm": Units.DBM}
+
+# Conditions about the set of values seen in a scope rather than about each sample
+_SET_CONDITIONS = {ConditionEnum.IS_ALL_OF, ConditionEnum.IS_NOT_ALL_OF}
+
+
+def range_values(value_range: Any) -> np.ndarray:
+    """targetValueRange as a flat array: 20, "20", [20], [10, 30] and {"min": 10, "max": 30} all work."""
+    if isinstance(value_range, dict):
+        value_range = [value_range.get(k) for k in ("min", "max", "value") if value_range.get(k) is not None]
+    if not isinstance(value_range, (list, tuple)):
+        value_range = [value_range]
+    try:
+        return np.asarray([float(v) for v in value_range], dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.asarray([str(v) for v in value_range], dtype=object)
+
+
+def compile_condition(condition: ConditionEnum, value_range: Any) -> Predicate:
+    """Vectorized per-sample predicate for one ConditionEnum and its targetValueRange."""
+    condition = ConditionEnum(condition)
+    r = range_values(value_range)
+    if len(r) == 0:
+        raise ValueError(f"{condition.value} needs a targetValueRange")
+    first = r[0]
+    if condition in (ConditionEnum.IS_WITHIN_RANGE, ConditionEnum.IS_OUTSIDE_RANGE, ConditionEnum.IS_NOT_WITHIN):
+        if len(r) < 2:
+            raise ValueError(f"{condition.value} needs a [low, high] targetValueRange, got {list(r)}")
+        lo, hi = min(r[0], r[1]), max(r[0], r[1])
+        if condition == ConditionEnum.IS_WITHIN_RANGE:
+            return lambda v: (v >= lo) & (v <= hi)
+        return lambda v: (v < lo) | (v > hi)
+    simple = {
+        ConditionEnum.IS_EQUAL_TO: lambda v: v == first,
+        ConditionEnum.IS_NOT_EQUAL_TO: lambda v: v != first,
+        ConditionEnum.IS_LESS_THAN: lambda v: v < first,
+        ConditionEnum.IS_GREATER_THAN: lambda v: v > first,
+        ConditionEnum.IS_LESS_THAN_OR_EQUAL_TO: lambda v: v <= first,
+        ConditionEnum.IS_EQUAL_TO_OR_LESS_THAN: lambda v: v <= first,
+        ConditionEnum.IS_GREATER_THAN_OR_EQUAL_TO: lambda v: v >= first,
+        ConditionEnum.IS_EQUAL_TO_OR_GREATER_THAN: lambda v: v >= first,
+        ConditionEnum.IS_ONE_OF: lambda v: np.isin(v, r),
+        ConditionEnum.IS_NOT_ONE_OF: lambda v: ~np.isin(v, r),
+        # Per sample these mean "is one of the listed values"; the verdict checks coverage
+        ConditionEnum.IS_ALL_OF: lambda v: np.isin(v, r),
+        ConditionEnum.IS_NOT_ALL_OF: lambda v: np.isin(v, r),
+    }
+    return simple[condition]
+
+
+def target_units(target: ExpectationTargetRequest) -> Units:
+    unit = (target.targetUnit or "").strip()
+    for candidate in (unit, unit.lower()):
+        try:
+            return Units(candidate)
+        except ValueError:
+            pass
+    if unit.lower() in _UNIT_ALIASES:
+        return _UNIT_ALIASES[unit.lower()]
+    if unit:
+        logger.warning(f"Unknown targetUnit {unit!r} for {target.targetName}, reported as count")
+    return Units.COUNT
+
+
+class TargetVerdict(NamedTuple):
+    target: int                # index into the engine's targets
+    scope: str                 # cell / UE identifier the samples belong to
+    samples: int
+    passed: int
+    result: ResultType
+    values: Optional[np.ndarray]
+
+
+class ExpectationEngine:
+    """
+    Evaluates ExpectationTargetRequests over KPI samples.
+
+    KPI data is a long DataFrame with `kpi` (matching targetName), `scope`
+    (cell or UE id) and `value` columns, plus an optional `timestamp`. The
+    samples are sorted once by KPI; each target is then one vectorized
+    predicate over its KPI's contiguous block and a bincount per scope. A scope passes a target when at least `pass_ratio` of its samples
+    satisfy the condition (for IS_ALL_OF / IS_NOT_ALL_OF: when all / not all
+    of the listed values were seen).
+    """
+
+    def __init__(self, targets: Sequence[ExpectationTargetRequest], pass_ratio: float = 1.0):
+        self.targets = list(targets)
+        self.pass_ratio = pass_ratio
+        self.predicates = [compile_condition(t.targetCondition, t.targetValueRange) for t in self.targets]
+        self.units = [target_units(t) for t in self.targets]
+
+    @classmethod
+    def from_specification(cls, spec: TestSpecification, pass_ratio: float = 1.0) -> "ExpectationEngine":
+        return cls(spec.expectationTargets, pass_ratio)
+
+    def evaluate(self, kpis: DataFrame, window: Optional[Tuple[Any, Any]] = None,
+                 keep_values: bool = True) -> List[TargetVerdict]:
+        """Verdict per (target, scope) that has samples, in target order then scope order."""
+        if window is not None and "timestamp" in kpis.columns:
+            start, end = pd.Timestamp(window[0]), pd.Timestamp(window[1])
+            ts = kpis["timestamp"]
+            kpis = kpis[(ts >= start) & (ts <= end)]
+        # A missing kpi or scope would factorize to -1, which bincount and the sorted KPI blocks cannot take
+        complete = kpis["kpi"].notna() & kpis["scope"].notna() & kpis["value"].notna()
+        if not complete.all():
+            logger.warning(f"Dropping {int((~complete).sum())} of {len(kpis)} KPI samples with a missing "
+                           f"kpi, scope or value")
+            kpis = kpis[complete]
+        kpi_codes, kpi_names = pd.factorize(kpis["kpi"], sort=True)
+        scope_codes, scope_names = pd.factorize(kpis["scope"], sort=True)
+        n_scopes = len(scope_names)
+        # One radix sort on the (few) KPI codes makes every KPI a contiguous block
+        order = np.argsort(kpi_codes.astype(np.min_scalar_type(max(len(kpi_names), 1))), kind="stable")
+        kpi_codes = kpi_codes[order]
+        scope_codes = scope_codes[order]
+        values = kpis["value"].to_numpy()[order]
+        bounds = np.searchsorted(kpi_codes, np.arange(len(kpi_names) + 1))
+        kpi_index = {name: i for i, name in enumerate(kpi_names)}
+
+        verdicts = []
+        for t, (target, predicate) in enumerate(zip(self.targets, self.predicates)):
+            k = kpi_index.get(target.targetName)
+            if k is None:
+                logger.warning(f"No samples for target {target.targetName}")
+                continue
+            scopes, block = scope_codes[bounds[k]:bounds[k + 1]], values[bounds[k]:bounds[k + 1]]
+            # Per-scope totals and passes are two bincounts, no groupby
+            counts = np.bincount(scopes, minlength=n_scopes)
+            passed = np.bincount(scopes, weights=predicate(block), minlength=n_scopes).astype(np.int64)
+            present = np.flatnonzero(counts)
+
+            per_scope = None
+            condition = ConditionEnum(target.targetCondition)
+            if keep_values or condition in _SET_CONDITIONS:
+                order = np.argsort(scopes, kind="stable")
+                per_scope = np.split(block[order], np.cumsum(counts)[:-1])
+            if condition in _SET_CONDITIONS:
+                wanted = range_values(target.targetValueRange)
+                ok = np.zeros(n_scopes, dtype=bool)
+                ok[present] = [np.isin(wanted, per_scope[s]).all() for s in present]
+                if condition == ConditionEnum.IS_NOT_ALL_OF:
+                    ok = ~ok
+            else:
+                # Tolerance, not ceil(): 0.55 * 100 is 55.00000000000001, and 55 of 100 must still pass
+                ok = passed >= self.pass_ratio * counts - 1e-9
+            for s in present:
+                verdicts.append(TargetVerdict(
+                    t, str(scope_names[s]), int(counts[s]), int(passed[s]),
+                    ResultType.PASS if ok[s] else ResultType.FAIL,
+                    per_scope[s] if keep_values else None,
+                ))
+        return verdicts
+
+    def metric(self, verdict: TargetVerdict, status: TestStatus = TestStatus.MANDATORY) -> MetricsItem:
+        target = self.targets[verdict.target]
+        condition = ConditionEnum(target.targetCondition).value
+        unit = f" {target.targetUnit}" if target.targetUnit else ""
+        values = verdict.values if verdict.values is not None and len(verdict.values) else \
+            np.asarray([verdict.passed / verdict.samples])
+        if values.dtype == object:
+            values = values.tolist()
+        return MetricsItem(
+            description=f"{target.targetName} {condition} {target.targetValueRange}{unit} "
+                        f"({verdict.passed}/{verdict.samples} samples met)"[:1023],
+            measurements=[MeasurementsItem(name=target.targetName, units=self.units[verdict.target],
+                                           values=values if isinstance(values, list) else MeasurementSeries(values))],
+            status=status,
+            result=verdict.result,
+        )
+
+    def test_cases(self, verdicts: List[TargetVerdict], number: str = "1",
+                   status: TestStatus = TestStatus.MANDATORY) -> List[TestCase]:
+        """One TestCase per scope (numbered `number`.1, .2, ...), FAIL when any of its targets failed."""
+        by_scope: Dict[str, List[TargetVerdict]] = {}
+        for v in verdicts:
+            by_scope.setdefault(v.scope, []).append(v)
+        cases = []
+        for i, (scope, scope_verdicts) in enumerate(by_scope.items(), start=1):
+            metrics = [self.metric(v, status) for v in scope_verdicts]
+            failed = any(m.result == ResultType.FAIL for m in metrics)
+            targets = ", ".join(self.targets[v.target].targetName for v in scope_verdicts)
+            cases.append(TestCase(
+                number=f"{number}.{i}", name=f"Expectations for {scope}",
+                description=f"Expectation targets {targets} evaluated for scope {scope}."[:1023],
+                result=ResultType.FAIL if failed else ResultType.PASS, status=status, metrics=metrics,
+            ))
+        return cases
+
+
+if __name__ == "__main__":
+    # python -m modules.expectation_engine [samples] [scopes]
+    import sys
+    import time
+
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    n_scopes = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = np.random.default_rng(0)
+    kpi_names = np.array(["PEE.AvgPower", "DRB.UEThpDl", "RRU.PrbUsedDl", "CARR.AvgPRBUsage", "QosFlow.PdcpPduVolumeDL"])
+    kpis = pd.DataFrame({
+        "kpi": pd.Categorical.from_codes(rng.integers(0, len(kpi_names), n_samples), categories=kpi_names),
+        "scope": rng.integers(0, n_scopes, n_samples),
+        "value": rng.normal(25.0, 6.0, n_samples),
+    })
+    targets = [
+        ExpectationTargetRequest(targetName="PEE.AvgPower", targetCondition="IS_GREATER_THAN_OR_EQUAL_TO",
+                                 targetValueRange=[20], targetUnit="%", targetScope="SpecificCellGroup"),
+        ExpectationTargetRequest(targetName="DRB.UEThpDl", targetCondition="IS_LESS_THAN_OR_EQUAL_TO",
+                                 targetValueRange=[40], targetUnit="Mbps", targetScope="SpecificUEGroup"),
+        ExpectationTargetRequest(targetName="RRU.PrbUsedDl", targetCondition="IS_WITHIN_RANGE",
+                                 targetValueRange=[5, 45], targetUnit="count"),
+        ExpectationTargetRequest(targetName="CARR.AvgPRBUsage", targetCondition="IS_NOT_WITHIN",
+                                 targetValueRange=[0, 1], targetUnit="%"),
+        ExpectationTargetRequest(targetName="QosFlow.PdcpPduVolumeDL", targetCondition="IS_GREATER_THAN",
+                                 targetValueRange="0", targetUnit="Mbps"),
+    ]
+    engine = ExpectationEngine(targets, pass_ratio=0.9)
+
+    start = time.perf_counter()
+    verdicts = engine.evaluate(kpis, keep_values=False)
+    elapsed = time.perf_counter() - start
+    print(f"{n_samples} samples x {len(targets)} targets over {n_scopes} scopes: {elapsed:.2f}s "
+          f"({n_samples / elapsed / 1e6:.1f} M samples/s), {len(verdicts)} verdicts, "
+          f"{sum(v.result == ResultType.FAIL for v in verdicts)} FAIL")
+
+    # Reference: per-sample Python evaluation, on a slice and scaled up
+    ops = {"IS_GREATER_THAN_OR_EQUAL_TO": lambda v, r: v >= r[0], "IS_LESS_THAN_OR_EQUAL_TO": lambda v, r: v <= r[0],
+           "IS_WITHIN_RANGE": lambda v, r: r[0] <= v <= r[1], "IS_NOT_WITHIN": lambda v, r: not r[0] <= v <= r[1],
+           "IS_GREATER_THAN": lambda v, r: v > float(r)}
+    by_name = {t.targetName: t for t in targets}
+    n_loop = min(n_samples, 500_000)
+    start = time.perf_counter()
+    tally = {}
+    for kpi, scope, value in zip(kpis["kpi"][:n_loop], kpis["scope"][:n_loop], kpis["value"][:n_loop]):
+        target = by_name[kpi]
+        ok = ops[target.targetCondition.value](value, target.targetValueRange)
+        seen = tally.setdefault((kpi, scope), [0, 0])
+        seen[0] += 1
+        seen[1] += ok
+    loop_s = (time.perf_counter() - start) * n_samples / n_loop
+    print(f"per-sample Python loop: ~{loop_s:.1f}s ({n_samples / loop_s / 1e6:.2f} M samples/s)")
+
+    start = time.perf_counter()
+    small = kpis[kpis["scope"] < 5]
+    cases = engine.test_cases(engine.evaluate(small))
+    print(f"{len(cases)} test cases built in {time.perf_counter() - start:.2f}s; first: {cases[0].number} "
+          f"{cases[0].result.value}, {len(cases[0].metrics)} metrics")
+
+    # Rows with a missing kpi, scope or value are dropped (and logged), not fatal
+    gappy = small.head(1000).astype({"kpi": object, "scope": object})
+    gappy.iloc[::50, 0], gappy.iloc[1::50, 1], gappy.iloc[2::50, 2] = None, None, np.nan
+    assert sum(v.samples for v in engine.evaluate(gappy)) <= len(gappy) - 60
@@ -0,0 +1,396 @@
+import json
+import time
+import asyncio
+import logging
+import datetime
+from collections import deque
+from typing import (Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence,
+                    Tuple, Union)
+
+from modules.expectation_engine import range_values
+from modules.test_result import ResultType
+from modules.test_specification import ConditionEnum, ExpectationTargetRequest, TestSpecification, TimeWindowValue
+
+logger = logging.getLogger(__name__)
+
+Timestamp = Union[float, datetime.datetime]
+
+
+class KpiSample(NamedTuple):
+    timestamp: float  # seconds since the epoch
+    kpi: str          # matches ExpectationTargetRequest.targetName
+    scope: str        # cell / UE identifier
+    value: Any
+
+
+class VerdictChange(NamedTuple):
+    target: int                       # index into the monitor's targets
+    target_name: str
+    scope: str
+    previous: Optional[ResultType]    # None until the scope had min_samples samples
+    current: ResultType
+    timestamp: float
+    samples: int                      # samples in the window when the verdict changed
+    passed: int
+
+
+def _seconds(ts: Timestamp) -> float:
+    return ts.timestamp() if isinstance(ts, datetime.datetime) else float(ts)
+
+
+def scalar_condition(condition: ConditionEnum, value_range: Any) -> Callable[[Any], bool]:
+    """Per-sample predicate on plain Python values, the scalar twin of expectation_engine.compile_condition()."""
+    condition = ConditionEnum(condition)
+    r = range_values(value_range).tolist()
+    if not r:
+        raise ValueError(f"{condition.value} needs a targetValueRange")
+    first = r[0]
+    if condition in (ConditionEnum.IS_WITHIN_RANGE, ConditionEnum.IS_OUTSIDE_RANGE, ConditionEnum.IS_NOT_WITHIN):
+        if len(r) < 2:
+            raise ValueError(f"{condition.value} needs a [low, high] targetValueRange, got {r}")
+        lo, hi = min(r[0], r[1]), max(r[0], r[1])
+        if condition == ConditionEnum.IS_WITHIN_RANGE:
+            return lambda v: lo <= v <= hi
+        return lambda v: not lo <= v <= hi
+    members = frozenset(r)
+    return {
+        ConditionEnum.IS_EQUAL_TO: lambda v: v == first,
+        ConditionEnum.IS_NOT_EQUAL_TO: lambda v: v != first,
+        ConditionEnum.IS_LESS_THAN: lambda v: v < first,
+        ConditionEnum.IS_GREATER_THAN: lambda v: v > first,
+        ConditionEnum.IS_LESS_THAN_OR_EQUAL_TO: lambda v: v <= first,
+        ConditionEnum.IS_EQUAL_TO_OR_LESS_THAN: lambda v: v <= first,
+        ConditionEnum.IS_GREATER_THAN_OR_EQUAL_TO: lambda v: v >= first,
+        ConditionEnum.IS_EQUAL_TO_OR_GREATER_THAN: lambda v: v >= first,
+        ConditionEnum.IS_ONE_OF: lambda v: v in members,
+        ConditionEnum.IS_NOT_ONE_OF: lambda v: v not in members,
+        ConditionEnum.IS_ALL_OF: lambda v: v in members,
+        ConditionEnum.IS_NOT_ALL_OF: lambda v: v in members,
+    }[condition]
+
+
+class _Window:
+    """Sliding time window for one (target, scope): the samples and running pass/member counts."""
+    __slots__ = ("samples", "passed", "members", "covered", "verdict")
+
+    def __init__(self):
+        self.samples: deque = deque()          # (timestamp, ok, value)
+        self.passed = 0
+        self.members: Optional[Dict[Any, int]] = None  # listed value -> count in window (IS_ALL_OF / IS_NOT_ALL_OF)
+        self.covered = 0                        # listed values with a non-zero count
+        self.verdict: Optional[ResultType] = None
+
+
+class ExpectationMonitor:
+    """
+    Online PASS/FAIL for ExpectationTargetRequests over a live KPI stream.
+
+    Each (target, scope) keeps a sliding window of the last `window` seconds
+    with running counts, so a sample costs O(1) amortized however long the
+    test runs: it is added, expired samples drop off the front, and the
+    verdict is re-derived from the counts. The verdict rules are those of
+    ExpectationEngine (pass_ratio of the samples, or coverage of the listed
+    values for IS_ALL_OF / IS_NOT_ALL_OF). Callbacks are called with a
+    VerdictChange as soon as a verdict flips; samples outside the
+    targetAssuranceTime are ignored.
+    """
+
+    def __init__(self, targets: Sequence[ExpectationTargetRequest], window: float = 60.0, pass_ratio: float = 1.0,
+                 min_samples: int = 1, assurance_time: Optional[Tuple[Timestamp, Timestamp]] = None):
+        self.targets = list(targets)
+        self.window = window
+        self.pass_ratio = pass_ratio
+        self.min_samples = min_samples
+        self.assurance_time = None if assurance_time is None else \
+            (_seconds(assurance_time[0]), _seconds(assurance_time[1]))
+        self.predicates = [scalar_condition(t.targetCondition, t.targetValueRange) for t in self.targets]
+        self.wanted = [frozenset(range_values(t.targetValueRange).tolist())
+                       if ConditionEnum(t.targetCondition) in (ConditionEnum.IS_ALL_OF, ConditionEnum.IS_NOT_ALL_OF)
+                       else None for t in self.targets]
+        self._by_kpi: Dict[str, List[int]] = {}
+        for i, t in enumerate(self.targets):
+            self._by_kpi.setdefault(t.targetName, []).append(i)
+        self._windows: Dict[Tuple[int, str], _Window] = {}
+        self._callbacks: List[Callable[[VerdictChange], None]] = []
+        self.samples_seen = 0
+        self.samples_ignored = 0
+        self.samples_rejected = 0  # values the conditions could not be applied to
+
+    @classmethod
+    def from_specification(cls, spec: TestSpecification, window: float = 60.0, **kwargs) -> "ExpectationMonitor":
+        """Monitor for a spec's targets, limited to its targetAssuranceTime when it has one."""
+        if "assurance_time" not in kwargs:
+            kwargs["assurance_time"] = assurance_time(spec)
+        return cls(spec.expectationTargets, window, **kwargs)
+
+    def subscribe(self, callback: Callable[[VerdictChange], None]) -> Callable[[VerdictChange], None]:
+        self._callbacks.append(callback)
+        return callback
+
+    def on_sample(self, timestamp: Timestamp, kpi: str, scope: str, value: Any) -> List[VerdictChange]:
+        """Add one sample; returns (and publishes) the verdict changes it caused."""
+        indexes = self._by_kpi.get(kpi)
+        ts = _seconds(timestamp)
+        if indexes is None or (self.assurance_time is not None
+                               and not self.assurance_time[0] <= ts <= self.assurance_time[1]):
+            self.samples_ignored += 1
+            return []
+        try:
+            oks = [self.predicates[i](value) for i in indexes]
+        except (TypeError, ValueError) as e:
+            # One malformed value must not end a live feed
+            self.samples_rejected += 1
+            logger.warning(f"Skipping {kpi} sample for {scope} with value {value!r}: {e}")
+            return []
+        self.samples_seen += 1
+        changes = []
+        for i, ok in zip(indexes, oks):
+            w = self._windows.get((i, scope))
+            if w is None:
+                w = self._windows[(i, scope)] = _Window()
+                if self.wanted[i] is not None:
+                    w.members = {}
+            w.samples.append((ts, ok, value))
+            w.passed += ok
+            if w.members is not None and ok:
+                self._count_member(w, value, 1)
+            self._expire(w, ts - self.window)
+            verdict = self._verdict(i, w)
+            if verdict is not None and verdict != w.verdict:
+                change = VerdictChange(i, self.targets[i].targetName, scope, w.verdict, verdict, ts,
+                                       len(w.samples), w.passed)
+                w.verdict = verdict
+                changes.append(change)
+        for change in changes:
+            self._publish(change)
+        return changes
+
+    def advance(self, timestamp: Timestamp) -> List[VerdictChange]:
+        """Expire every window up to `timestamp` (e.g. on a clock tick when KPIs stop arriving)."""
+        ts = _seconds(timestamp)
+        changes = []
+        for (i, scope), w in self._windows.items():
+            self._expire(w, ts - self.window)
+            verdict = self._verdict(i, w)
+            if verdict is not None and verdict != w.verdict:
+                changes.append(VerdictChange(i, self.targets[i].targetName, scope, w.verdict, verdict, ts,
+                                             len(w.samples), w.passed))
+                w.verdict = verdict
+        for change in changes:
+            self._publish(change)
+        return changes
+
+    @staticmethod
+    def _count_member(w: _Window, value, step: int):
+        count = w.members.get(value, 0) + step
+        if count == 0:
+            del w.members[value]
+            w.covered -= 1
+        else:
+            if count == 1 and step == 1:
+                w.covered += 1
+            w.members[value] = count
+
+    def _expire(self, w: _Window, cutoff: float):
+        samples = w.samples
+        while samples and samples[0][0] <= cutoff:
+            _, ok, value = samples.popleft()
+            w.passed -= ok
+            if w.members is not None and ok:
+                self._count_member(w, value, -1)
+
+    def _verdict(self, i: int, w: _Window) -> Optional[ResultType]:
+        n = len(w.samples)
+        if n < self.min_samples:
+            # Too little data left in the window: keep the last verdict
+            return None
+        wanted = self.wanted[i]
+        if wanted is not None:
+            ok = w.covered == len(wanted)
+            if self.targets[i].targetCondition == ConditionEnum.IS_NOT_ALL_OF:
+                ok = not ok
+        else:
+            ok = w.passed >= self.pass_ratio * n - 1e-9  # not ceil(): 0.55 * 100 is 55.00000000000001
+        return ResultType.PASS if ok else ResultType.FAIL
+
+    def _publish(self, change: VerdictChange):
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Verdict callback {callback!r} failed: {e}")
+
+    def verdicts(self) -> Dict[Tuple[str, str], Optional[ResultType]]:
+        """Current verdict per (targetName, scope); None while a scope has too few samples."""
+        return {(self.targets[i].targetName, scope): w.verdict for (i, scope), w in self._windows.items()}
+
+    def feed(self, samples: Iterable[KpiSample]) -> int:
+        """Consume samples from a (blocking) iterator, e.g. tail_kpi_file(); returns how many were read."""
+        n = 0
+        for sample in samples:
+            self.on_sample(*sample)
+            n += 1
+        return n
+
+    async def run(self, samples: AsyncIterator[KpiSample]) -> int:
+        """Consume samples from an async iterator, e.g. a KPI subscription or replay()."""
+        n = 0
+        async for sample in samples:
+            self.on_sample(*sample)
+            n += 1
+        return n
+
+
+def assurance_time(spec: TestSpecification) -> Optional[Tuple[float, float]]:
+    """(start, end) seconds from a spec's targetAssuranceTime field or its TargetAssuranceTime context."""
+    value = getattr(spec, "targetAssuranceTime", None)
+    if value is None:
+        for fragment in spec.expectationObject:
+            for context in fragment.objectContexts or []:
+                if context.contextAttribute == "TargetAssuranceTime" and context.contextValueRange:
+                    value = context.contextValueRange[0]
+    if value is None:
+        return None
+    window = value if isinstance(value, TimeWindowValue) else TimeWindowValue.model_validate(value)
+    return _seconds(window.startTime), _seconds(window.endTime)
+
+
+def parse_kpi_line(line: str, header: Optional[List[str]] = None) -> Optional[KpiSample]:
+    """One JSON-lines object or CSV row (timestamp,kpi,scope,value, or in `header` order) as a KpiSample."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        row = json.loads(line)
+    else:
+        row = dict(zip(header or KpiSample._fields, line.split(",")))
+        try:
+            row["value"] = float(row["value"])
+        except ValueError:
+            pass
+    ts = row["timestamp"]
+    if isinstance(ts, str):
+        try:
+            ts = float(ts)
+        except ValueError:
+            ts = datetime.datetime.fromisoformat(ts).timestamp()
+    return KpiSample(float(ts), row["kpi"], str(row["scope"]), row["value"])
+
+
+def tail_kpi_file(path: str, follow: bool = True, poll_interval: float = 0.5,
+                  stop: Optional[Callable[[], bool]] = None) -> Iterator[KpiSample]:
+    """
+    KPI samples appended to a JSON-lines or CSV file, like `tail -f`.
+
+    A CSV header line (one containing "kpi") sets the column order. With
+    follow=False it stops at the current end of file; otherwise it waits for
+    more lines until `stop()` returns True.
+    """
+    header = None
+    with open(path, "r", encoding="utf-8") as f:
+        partial = ""
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow or (stop is not None and stop()):
+                    # Stopping: a last line without a trailing newline is complete after all
+                    line, partial = partial, ""
+                    if not line.strip():
+                        break
+                else:
+                    time.sleep(poll_interval)
+                    continue
+            elif not line.endswith("\n"):
+                partial += line  # writer is mid-line
+                continue
+            else:
+                line, partial = partial + line, ""
+            if header is None and not line.lstrip().startswith("{") and "kpi" in line:
+                header = [h.strip() for h in line.split(",")]
+                continue
+            sample = parse_kpi_line(line, header)
+            if sample is not None:
+                yield sample
+
+
+async def replay(samples: Iterable[KpiSample], speed: Optional[float] = None) -> AsyncIterator[KpiSample]:
+    """Replay recorded samples as an async stream; `speed` paces them (1.0 = real time, None = no waiting)."""
+    previous = None
+    for sample in samples:
+        if speed and previous is not None and sample.timestamp > previous:
+            await asyncio.sleep((sample.timestamp - previous) / speed)
+        previous = sample.timestamp
+        yield sample
+        if not speed:
+            await asyncio.sleep(0)  # let other tasks run between samples
+
+
+if __name__ == "__main__":
+    # python -m modules.expectation_monitor [samples]
+    import os
+    import sys
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    from modules.expectation_engine import ExpectationEngine
+
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    targets = [
+        ExpectationTargetRequest(targetName="PEE.AvgPower", targetCondition="IS_LESS_THAN_OR_EQUAL_TO",
+                                 targetValueRange=[40], targetUnit="W"),
+        ExpectationTargetRequest(targetName="DRB.UEThpDl", targetCondition="IS_GREATER_THAN",
+                                 targetValueRange=[10], targetUnit="Mbps"),
+    ]
+    rng = np.random.default_rng(0)
+    n_scopes = 100
+    t0 = datetime.datetime(2025, 1, 1).timestamp()
+    # Power drifts up over the run, so cells flip from PASS to FAIL part way through
+    kpi = rng.integers(0, 2, n_samples)
+    scope = rng.integers(0, n_scopes, n_samples)
+    drift = np.linspace(0, 15, n_samples)
+    value = np.where(kpi == 0, rng.normal(30, 3, n_samples) + drift, rng.normal(25, 5, n_samples))
+    stream = [KpiSample(t0 + i * 0.01, targets[k].targetName, f"cell-{s}", v)
+              for i, (k, s, v) in enumerate(zip(kpi.tolist(), scope.tolist(), value.tolist()))]
+
+    monitor = ExpectationMonitor(targets, window=60.0, pass_ratio=0.95, min_samples=20)
+    changes = []
+    monitor.subscribe(changes.append)
+    start = time.perf_counter()
+    monitor.feed(stream)
+    elapsed = time.perf_counter() - start
+    print(f"{n_samples} samples, {len(targets)} targets x {n_scopes} scopes, 60s window: {elapsed:.2f}s "
+          f"({elapsed / n_samples * 1e6:.2f} us/sample), {len(changes)} verdict changes")
+    first_fail = next(c for c in changes if c.current == ResultType.FAIL)
+    print(f"first FAIL: {first_fail.target_name} on {first_fail.scope} after "
+          f"{first_fail.timestamp - t0:.0f}s of {stream[-1].timestamp - t0:.0f}s")
+
+    # The final windowed verdicts agree with a batch evaluation of the last window
+    last = pd.DataFrame([s for s in stream if s.timestamp > stream[-1].timestamp - 60.0])
+    batch = ExpectationEngine(targets, pass_ratio=0.95).evaluate(last, keep_values=False)
+    online = monitor.verdicts()
+    assert all(online[(targets[v.target].targetName, v.scope)] == v.result for v in batch), "online != batch"
+    print(f"final verdicts match the batch engine on the last window ({len(batch)} target/scope pairs)")
+
+    # Replay through a file tail and through an async stream
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kpis.csv")
+        with open(path, "w") as f:
+            f.write("timestamp,kpi,scope,value\n")
+            for s in stream[:50_000]:
+                f.write(f"{s.timestamp},{s.kpi},{s.scope},{s.value}\n")
+        tail_monitor = ExpectationMonitor(targets, window=60.0, pass_ratio=0.95, min_samples=20)
+        start = time.perf_counter()
+        read = tail_monitor.feed(tail_kpi_file(path, follow=False))
+        print(f"file tail: {read} samples in {time.perf_counter() - start:.2f}s")
+
+    async def main():
+        async_monitor = ExpectationMonitor(targets, window=60.0, pass_ratio=0.95, min_samples=20)
+        flips = []
+        async_monitor.subscribe(flips.append)
+        start = time.perf_counter()
+        read = await async_monitor.run(replay(stream[:50_000]))
+        print(f"async replay: {read} samples in {time.perf_counter() - start:.2f}s, {len(flips)} verdict changes")
+
+    asyncio.run(main())
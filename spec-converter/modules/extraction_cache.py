@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+def file_digest(path) -> str:
+    """SHA-256 of the file contents, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of camelot tables, one entry per (PDF content, page, settings).
+
+    Each entry is a compressed .npz holding the page's tables as fixed-width
+    string arrays (an empty archive records a page without tables, so it is not
+    re-extracted either). Entries are evicted least-recently-used once the
+    cache grows past `max_bytes`; recency is the file mtime, which is bumped on
+    every hit so several worker processes can share one cache directory.
+    """
+
+    def __init__(self, root, max_bytes: int = 512 * 1024 * 1024, settings: Optional[Dict] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.settings = settings or {}
+        self._settings_key = hashlib.sha256(json.dumps(self.settings, sort_keys=True).encode()).hexdigest()[:16]
+        self._digests: Dict[tuple, str] = {}
+        self._size = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def __getstate__(self):
+        # Worker processes get a fresh view of the directory and their own counters
+        state = self.__dict__.copy()
+        state["_size"] = None
+        state["stats"] = dict.fromkeys(self.stats, 0)
+        return state
+
+    def digest(self, pdf_file) -> str:
+        st = os.stat(pdf_file)
+        key = (str(pdf_file), st.st_size, st.st_mtime_ns)
+        if key not in self._digests:
+            self._digests[key] = file_digest(pdf_file)
+        return self._digests[key]
+
+    def _path(self, digest: str, page: int) -> Path:
+        return self.root / digest[:2] / f"{digest}-p{page}-{self._settings_key}.npz"
+
+    def get(self, digest: str, page: int) -> Optional[List[DataFrame]]:
+        path = self._path(digest, page)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                tables = [pd.DataFrame(archive[f"t{i}"].astype(object)) for i in range(len(archive.files))]
+            os.utime(path)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.stats["misses"] += 1
+            return None
+        for table_df in tables:
+            table_df.attrs['page'] = page
+        self.stats["hits"] += 1
+        return tables
+
+    def put(self, digest: str, page: int, tables: List[DataFrame]):
+        path = self._path(digest, page)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **{f"t{i}": t.to_numpy(dtype=str) for i, t in enumerate(tables)})
+        os.replace(tmp, path)
+        self.stats["stores"] += 1
+        self._grow(path.stat().st_size)
+
+    def _entries(self):
+        return [p for p in self.root.glob("*/*.npz")]
+
+    def _sizes(self) -> List[int]:
+        # Another process may evict an entry between the glob and the stat
+        sizes = []
+        for p in self._entries():
+            try:
+                sizes.append(p.stat().st_size)
+            except FileNotFoundError:
+                continue
+        return sizes
+
+    def _grow(self, nbytes: int):
+        if self._size is None:
+            self._size = sum(self._sizes())
+        else:
+            self._size += nbytes
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._size <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
+            self.stats["evictions"] += 1
+
+    def merge_stats(self, stats: Dict[str, int]):
+        for name, value in stats.items():
+            self.stats[name] += value
+
+    def report(self) -> str:
+        entries = self._sizes()
+        size = sum(entries)
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        return (f"extraction cache {self.root}: {len(entries)} pages, "
+                f"{size / 1e6:.2f}/{self.max_bytes / 1e6:.2f} MB, "
+                f"hits={self.stats['hits']} misses={self.stats['misses']} ({hit_rate:.0%} hit rate), "
+                f"stores={self.stats['stores']} evictions={self.stats['evictions']}")
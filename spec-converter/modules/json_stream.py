@@ -0,0 +1,133 @@
+import json
+from typing import Any, Iterable, Iterator, List, Optional
+
+from modules.configuration import ConfigurationParameters
+
+_WHITESPACE = " \t\r\n"
+# Characters allowed outside strings once inside a JSON value: structure plus the
+# characters of numbers and the true/false/null literals
+_STRUCTURAL = set("{}[]:,") | set(_WHITESPACE) | set("0123456789+-.eE") | set("truefalsn")
+
+
+class JsonStreamError(ValueError):
+    """Raised as soon as the streamed text can no longer be valid JSON."""
+
+
+class IncrementalJsonParser:
+    """
+    Parses JSON text fed in arbitrary chunks, returning values as soon as they close.
+
+    A top-level object is returned when its closing brace arrives; the elements
+    of a top-level array are returned one by one as each of them closes. Text
+    outside top-level values (a ```json fence, a sentence before or after the
+    JSON) is skipped, and several top-level values in a row are all returned.
+    Mismatched brackets or stray characters inside a value raise
+    JsonStreamError immediately, without waiting for the end of the stream.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+        self.root: Optional[str] = None
+        self.roots_closed = 0
+
+    def _load(self, text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JsonStreamError(f"Malformed JSON value {text[:80]!r}: {e}") from e
+
+    def feed(self, text: str) -> List[Any]:
+        self._buf += text
+        buf = self._buf
+        out = []
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if not self._stack:
+                # Between top-level values: skip fences and prose until JSON starts
+                if ch in "{[":
+                    self.root = ch
+                    self._stack.append(ch)
+                    self._start = i if ch == "{" else None
+                i += 1
+                continue
+
+            in_array_root = self.root == "[" and len(self._stack) == 1
+            if in_array_root and self._start is None and ch not in _WHITESPACE + ",]":
+                self._start = i
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+            elif ch in "}]":
+                opener = self._stack.pop()
+                if (opener, ch) not in (("{", "}"), ("[", "]")):
+                    raise JsonStreamError(f"Unexpected {ch!r} closing {opener!r} at offset {i}")
+                if not self._stack:
+                    if self.root == "{":
+                        out.append(self._load(buf[self._start:i + 1]))
+                    elif self._start is not None:
+                        out.append(self._load(buf[self._start:i].strip()))
+                    self._start = None
+                    self.roots_closed += 1
+                elif self.root == "[" and len(self._stack) == 1 and self._start is not None:
+                    out.append(self._load(buf[self._start:i + 1]))
+                    self._start = None
+            elif ch == "," and in_array_root and self._start is not None:
+                out.append(self._load(buf[self._start:i].strip()))
+                self._start = None
+            elif ch not in _STRUCTURAL:
+                raise JsonStreamError(f"Unexpected {ch!r} inside JSON at offset {i}")
+            i += 1
+
+        # Keep only the text of the value still being parsed
+        keep_from = self._start if self._start is not None else i
+        self._buf = buf[keep_from:]
+        self._pos = i - keep_from
+        if self._start is not None:
+            self._start = 0
+        return out
+
+    def finish(self):
+        """Check that the stream did not stop in the middle of a value."""
+        if self._stack or self._in_string:
+            raise JsonStreamError("JSON stream ended inside an unterminated value")
+        if self.roots_closed == 0:
+            raise JsonStreamError("JSON stream contained no JSON value")
+
+
+def iter_json_values(chunks: Iterable[str]) -> Iterator[Any]:
+    parser = IncrementalJsonParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.finish()
+
+
+def iter_configuration_parameters(chunks: Iterable[str]) -> Iterator[ConfigurationParameters]:
+    """
+    Yield validated ConfigurationParameters as each object in the streamed answer closes.
+
+    Both a single object and an array of objects are accepted. Malformed JSON
+    raises JsonStreamError and an invalid object raises pydantic's
+    ValidationError, so a caller can abort the generation right away.
+    """
+    for value in iter_json_values(chunks):
+        if not isinstance(value, dict):
+            raise JsonStreamError(f"Expected a JSON object, got {type(value).__name__}")
+        yield ConfigurationParameters.model_validate(value)
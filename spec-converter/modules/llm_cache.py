@@ -0,0 +1,103 @@
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Any, Optional
+
+
+def _normalize(value):
+    """Canonical form of a row or schema: JSON strings parsed, strings stripped, keys sorted on dump."""
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                return _normalize(json.loads(stripped))
+            except ValueError:
+                pass
+        return stripped
+    if isinstance(value, dict):
+        return {str(k).strip(): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def mapping_key(row, json_schema, model: str, temperature: float) -> str:
+    payload = json.dumps([_normalize(row), _normalize(json_schema), model, temperature],
+                         sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent memo of LLM row mappings, stored in a SQLite file.
+
+    Entries are keyed on a hash of the normalized (row, schema, model,
+    temperature), expire `ttl` seconds after they were written (None keeps them
+    forever) and, once more than `max_entries` are stored, the least recently
+    used ones are dropped.
+    """
+
+    def __init__(self, path, ttl: Optional[float] = 30 * 24 * 3600, max_entries: int = 100_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        value, created = row
+        if self.ttl is not None and created + self.ttl < now:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        self.stats["hits"] += 1
+        return json.loads(value)
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, now),
+        )
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            excess = count - self.max_entries
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            self.stats["evictions"] += excess
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def report(self) -> str:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        return (f"LLM response cache {self.path}: {len(self)} entries, "
+                f"hits={self.stats['hits']} misses={self.stats['misses']} ({hit_rate:.0%} hit rate), "
+                f"expired={self.stats['expired']} evictions={self.stats['evictions']}")
@@ -0,0 +1,259 @@
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from modules.llm_cache import LLMResponseCache, mapping_key
+from modules.schema_slicer import SchemaSlicer
+
+DEFAULT_BASE_URL = "https://integrate.api.nvidia.com/v1"
+DEFAULT_MODEL = "meta/llama-3.3-70b-instruct"
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_prompt(content: str, json_schema) -> str:
+    return f"""You are a helpful assistant that transforms tabular data into JSON format based on a provided JSON schema.
+
+    Here is the tabular data:
+    {content}
+
+
+    And here is the JSON schema:
+    {json_schema}
+    Instructions:
+    1. Map the table keys stricly to the JSON schema properties.
+    2. Only filled parameters in JSON schema that has context provided from tabular data.
+    3. Return the result as pure JSON. Do not include any additional text or explanations."""
+
+
+def build_batch_prompt(contents: List[str], json_schema) -> str:
+    rows = "\n".join(f"    Row {i}: {content}" for i, content in enumerate(contents))
+    return f"""You are a helpful assistant that transforms tabular data into JSON format based on a provided JSON schema.
+
+    Here are {len(contents)} rows of tabular data, one per line:
+{rows}
+
+
+    And here is the JSON schema:
+    {json_schema}
+    Instructions:
+    1. Map each row's table keys stricly to the JSON schema properties.
+    2. Only filled parameters in JSON schema that has context provided from tabular data.
+    3. Return one JSON object whose keys are the row numbers ("0", "1", ...) and whose values are the mapped rows.
+    4. Return the result as pure JSON. Do not include any additional text or explanations."""
+
+
+def parse_json_response(text: str):
+    """Parse a model answer, tolerating a surrounding ```json fence."""
+    return json.loads(_FENCE.sub("", text.strip()))
+
+
+def split_batch_response(text: str, n_rows: int) -> List[Optional[Dict[str, Any]]]:
+    """Split a packed answer back into per-row objects; rows the model skipped come back as None."""
+    parsed = parse_json_response(text)
+    if isinstance(parsed, list):
+        parsed = {str(i): item for i, item in enumerate(parsed)}
+    if not isinstance(parsed, dict):
+        raise ValueError(f"Expected a JSON object keyed by row number, got {type(parsed).__name__}")
+    return [parsed.get(str(i)) for i in range(n_rows)]
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class LLMMapper:
+    """
+    Maps table rows to schema-shaped JSON objects with concurrent LLM requests.
+
+    One AsyncOpenAI client is shared by every request. At most `concurrency`
+    requests are in flight, request starts are limited to `requests_per_second`
+    by a token bucket, and transient failures (connection errors, timeouts,
+    429 and 5xx answers, unparsable JSON) are retried with exponential backoff
+    and jitter. With rows_per_prompt > 1, rows are packed into one prompt and
+    the answer is split back per row; rows missing from a packed answer are
+    retried on their own. Rows found in `cache` are answered without a request,
+    and with a `schema_slicer` each prompt carries only the schema properties
+    its rows appear to refer to.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: str = "",
+                 model: str = DEFAULT_MODEL, temperature: float = 0.1, top_p: float = 0.7,
+                 max_tokens: int = 1024, concurrency: int = 8, requests_per_second: float = 10.0,
+                 max_retries: int = 5, backoff: float = 0.5, rows_per_prompt: int = 1,
+                 client: Optional[AsyncOpenAI] = None, cache: Optional[LLMResponseCache] = None,
+                 schema_slicer: Optional[SchemaSlicer] = None):
+        # Retries are handled here so that they go through the rate limiter too
+        self.client = client or AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+        self.model = model
+        self.temperature = temperature
+        self.top_p = top_p
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rows_per_prompt = rows_per_prompt
+        self.cache = cache
+        self.schema_slicer = schema_slicer
+        self.stats = {"rows": 0, "cached_rows": 0, "requests": 0, "retries": 0, "failed_rows": 0}
+        self._loop = None
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        completion = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            top_p=self.top_p,
+            max_tokens=max_tokens,
+        )
+        self.stats["requests"] += 1
+        return completion.choices[0].message.content or ""
+
+    async def _with_retries(self, prompt: str, max_tokens: int, parse):
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._slots:
+                    text = await self._complete(prompt, max_tokens)
+                return parse(text)
+            except (APIConnectionError, APITimeoutError, RateLimitError, ValueError) as e:
+                error = e
+            except APIStatusError as e:
+                if e.status_code < 500:
+                    raise
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            self.stats["retries"] += 1
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            logging.warning(f"LLM request failed ({error}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _schema_for(self, contents: List[str], json_schema):
+        if self.schema_slicer is None:
+            return json_schema
+        return self.schema_slicer.slice_for(json_schema, [json.loads(content) for content in contents])
+
+    async def _map_one(self, content: str, json_schema):
+        prompt = build_prompt(content, self._schema_for([content], json_schema))
+        return await self._with_retries(prompt, self.max_tokens, parse_json_response)
+
+    async def _map_batch(self, contents: List[str], json_schema) -> List[Optional[Dict[str, Any]]]:
+        if len(contents) == 1:
+            return [await self._map_one(contents[0], json_schema)]
+        results = await self._with_retries(
+            build_batch_prompt(contents, self._schema_for(contents, json_schema)),
+            self.max_tokens * len(contents),
+            lambda text: split_batch_response(text, len(contents)),
+        )
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logging.warning(f"{len(missing)} of {len(contents)} packed rows missing from the answer, mapping them one by one")
+            singles = await asyncio.gather(*(self._map_one(contents[i], json_schema) for i in missing))
+            for i, result in zip(missing, singles):
+                results[i] = result
+        return results
+
+    async def _map_batch_isolated(self, contents: List[str], json_schema):
+        try:
+            return await self._map_batch(contents, json_schema)
+        except Exception as e:
+            logging.error(f"Failed to map {len(contents)} row(s): {e}")
+            self.stats["failed_rows"] += len(contents)
+            return [None] * len(contents)
+
+    async def map_rows(self, rows: List[Dict[str, Any]], json_schema) -> List[Optional[Dict[str, Any]]]:
+        """Map every row, returning results in input order (None for rows that failed)."""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(self.requests_per_second)
+        self.stats["rows"] += len(rows)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        keys = [None] * len(rows)
+        pending = list(range(len(rows)))
+        if self.cache is not None:
+            keys = [mapping_key(row, json_schema, self.model, self.temperature) for row in rows]
+            pending = []
+            for i, key in enumerate(keys):
+                results[i] = self.cache.get(key)
+                if results[i] is None:
+                    pending.append(i)
+            self.stats["cached_rows"] += len(rows) - len(pending)
+
+        contents = [json.dumps(rows[i]) for i in pending]
+        size = max(1, self.rows_per_prompt)
+        batches = [contents[i:i + size] for i in range(0, len(contents), size)]
+        mapped = await asyncio.gather(*(self._map_batch_isolated(batch, json_schema) for batch in batches))
+
+        for i, result in zip(pending, (result for batch in mapped for result in batch)):
+            results[i] = result
+            if self.cache is not None and result is not None:
+                self.cache.put(keys[i], result)
+        return results
+
+    def map_rows_sync(self, rows: List[Dict[str, Any]], json_schema) -> List[Optional[Dict[str, Any]]]:
+        # The shared client's connection pool is bound to one event loop, keep reusing it
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.map_rows(rows, json_schema))
+
+    def close(self):
+        """Close the shared client (and the event loop used by map_rows_sync)."""
+        if self._loop is None:
+            asyncio.run(self.client.close())
+            return
+        self._loop.run_until_complete(self.client.close())
+        self._loop.close()
+        self._loop = None
+
+
+if __name__ == "__main__":
+    # Offline smoke run against the stub server:
+    #   python -m modules.llm_mapper
+    from modules.llm_stub_server import start_stub_server
+
+    import tempfile
+
+    server, base_url = start_stub_server(latency=0.05, error_rate=0.1)
+    rows = [{"Parameter": f"Band {i}", "Value": f"n{78 + i % 2}"} for i in range(400)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(f"{tmp}/responses.sqlite")
+        # The last run repeats the first one and is answered from the cache
+        for rows_per_prompt in (1, 10, 1):
+            mapper = LLMMapper(base_url=base_url, api_key="stub", concurrency=32,
+                               requests_per_second=500, backoff=0.01, rows_per_prompt=rows_per_prompt,
+                               cache=cache if rows_per_prompt == 1 else None)
+            start = time.perf_counter()
+            results = mapper.map_rows_sync(rows, json_schema="{}")
+            elapsed = time.perf_counter() - start
+            assert results == rows
+            print(f"rows_per_prompt={rows_per_prompt}: {len(rows)} rows in {elapsed:.2f}s {mapper.stats}")
+            mapper.close()
+        print(cache.report())
+        cache.close()
+    server.shutdown()
@@ -0,0 +1,112 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+# Offline stand-in for an OpenAI-compatible /v1/chat/completions endpoint.
+# It "maps" each row by echoing the row object back, which is enough to
+# exercise prompt packing, concurrency, retries and streaming without a model.
+
+_ROW = re.compile(r"^\s*Row (\d+): (\{.*\})\s*$", re.MULTILINE)
+_SINGLE = re.compile(r"Here is the tabular data:\s*(\{.*?\})\s*And here is the JSON schema:", re.DOTALL)
+
+
+def stub_answer(prompt: str) -> str:
+    rows = _ROW.findall(prompt)
+    if rows:
+        return json.dumps({index: json.loads(row) for index, row in rows})
+    single = _SINGLE.search(prompt)
+    return "```json\n" + (single.group(1) if single else "{}") + "\n```"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            status = random.choice([429, 500, 503])
+            self._send_json(status, {"error": {"message": "injected failure", "code": status}})
+            return
+
+        prompt = body["messages"][-1]["content"]
+        answer = stub_answer(prompt)
+        if body.get("stream"):
+            self._stream(body, answer)
+            return
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": answer}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(answer) // 4,
+                      "total_tokens": (len(prompt) + len(answer)) // 4},
+        })
+
+    def _stream(self, body: dict, answer: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for start in range(0, len(answer), 8):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": None,
+                             "delta": {"content": answer[start:start + 8]}}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                      error_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub on a background thread and return (server, base_url)."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"latency": latency, "error_rate": error_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of artificial latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.latency, args.error_rate)
+    print(f"stub LLM listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,264 @@
+import os
+from pathlib import Path
+from typing import Annotated, Any, List, Optional, Union
+
+import numpy as np
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import PydanticCustomError, core_schema
+
+# Below this many values the plain list is kept; the array only pays off for series
+MIN_SERIES_LENGTH = 32
+
+_DTYPES = {frozenset([float]): np.float64, frozenset([int]): np.int64, frozenset([bool]): np.bool_}
+
+
+class MeasurementSeries:
+    """
+    Homogeneous numeric measurement values held in one read-only NumPy array.
+
+    Used for MeasurementsItem.values: a list of only floats, only ints or only
+    bools is checked with a single type scan and stored as float64 / int64 /
+    bool, instead of validating every element through the int/float/str/bool
+    union. It dumps to exactly the JSON the list would, and otherwise behaves
+    like a read-only list.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        array = np.asarray(array)
+        if array.ndim != 1 or array.dtype.kind not in "biuf":
+            raise ValueError(f"Expected a 1-D numeric or boolean array, got {array.dtype} with shape {array.shape}")
+        if array.dtype.kind == "u":
+            array = array.astype(np.int64)
+        if array.flags.writeable:
+            array = array.copy()
+            array.flags.writeable = False
+        self.array = array
+
+    @classmethod
+    def from_values(cls, values) -> "MeasurementSeries":
+        """Array-backed series for a homogeneous list, or None when the list has mixed/other types."""
+        dtype = _DTYPES.get(frozenset(map(type, values)))
+        if dtype is None:
+            return None
+        try:
+            return cls(np.array(values, dtype=dtype))
+        except OverflowError:
+            return None  # ints beyond int64 stay a list
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+    def __getitem__(self, i):
+        item = self.array[i]
+        return item.tolist()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MeasurementSeries):
+            return self.array.dtype == other.array.dtype and np.array_equal(self.array, other.array)
+        if isinstance(other, (list, tuple)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MeasurementSeries({len(self)} x {self.array.dtype})"
+
+    def tolist(self) -> List[Union[int, float, bool]]:
+        return self.array.tolist()
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write the values as a .npy file (via a temp file, so a series memory-mapped from `path` survives)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self.array, allow_pickle=False)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "MeasurementSeries":
+        return cls(np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False))
+
+
+class _MeasurementValuesSchema:
+    """Pydantic schema for MeasurementValues: series when homogeneous and long, the plain list otherwise."""
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        list_schema = handler.generate_schema(List[Union[int, float, str, bool]])
+
+        def validate(value, validate_list):
+            if isinstance(value, MeasurementSeries):
+                series = value
+            elif isinstance(value, np.ndarray):
+                try:
+                    series = MeasurementSeries(value)
+                except ValueError as e:
+                    raise PydanticCustomError("measurement_array", str(e))
+            elif isinstance(value, list) and len(value) >= MIN_SERIES_LENGTH:
+                series = MeasurementSeries.from_values(value) or validate_list(value)
+            else:
+                series = validate_list(value)
+            # min_items=1 on the field is not applied to a custom schema, so check it here
+            if len(series) == 0:
+                raise PydanticCustomError("too_short", "List should have at least 1 item after validation, not 0")
+            return series
+
+        def serialize(value):
+            return value.tolist() if isinstance(value, MeasurementSeries) else value
+
+        return core_schema.no_info_wrap_validator_function(
+            validate, list_schema,
+            serialization=core_schema.plain_serializer_function_ser_schema(serialize, when_used="always"),
+        )
+
+    def __get_pydantic_json_schema__(self, schema, handler):
+        # Documented as the plain list it serializes to, with the min_items=1 that validate() enforces
+        json_schema = handler(schema["schema"])
+        json_schema["minItems"] = 1
+        return json_schema
+
+
+MeasurementValues = Annotated[Union[MeasurementSeries, List[Union[int, float, str, bool]]], _MeasurementValuesSchema()]
+
+
+_SPILL_NOTE = " [values spilled: min/mean/max of {n} samples, see artifact {path}]"
+
+
+def _case_measurements(case) -> list:
+    found = list(case.measurements or [])
+    for metric in case.metrics:
+        found.extend(metric.measurements)
+    return found
+
+
+def _spill_path(case, index: int) -> str:
+    """Artifact path of the index-th measurement of a case (in _case_measurements order)."""
+    return (Path("measurements") / case.number / f"{index}.npy").as_posix()
+
+
+def spill_measurements(case, root: Union[str, Path], min_values: int = 10_000) -> int:
+    """
+    Move the long series of a TestCase out to .npy artifacts under `root` (the results archive root).
+
+    Each spilled measurement keeps [min, mean, max] as its values and gets a
+    new ArtifactsItem on the case at a path derived from its position in the
+    case, which is what restore_measurements() matches on; the note appended
+    to the description is only for readers. Returns how many were spilled.
+    """
+    from modules.test_result import ArtifactsItem
+
+    root = Path(root)
+    spilled = 0
+    for i, m in enumerate(_case_measurements(case)):
+        values = m.values
+        if not isinstance(values, MeasurementSeries) or len(values) < min_values:
+            continue
+        rel = _spill_path(case, i)
+        values.save(root / rel)
+        data = values.array.astype(np.float64)
+        m.values = MeasurementSeries(np.array([data.min(), data.mean(), data.max()]))
+        m.description = ((m.description or "") + _SPILL_NOTE.format(n=len(values), path=rel))[:1023]
+        case.artifacts = (case.artifacts or []) + [ArtifactsItem(
+            name=f"{m.name} values", path=rel,
+            description=f"All {len(values)} values of measurement '{m.name}' in {m.units.value}, as a NumPy .npy array.",
+        )]
+        spilled += 1
+    return spilled
+
+
+def _strip_spill_note(description: Optional[str], note: str) -> Optional[str]:
+    """The description before `note` was appended, also when the 1023-character cut fell inside the note."""
+    description = description or ""
+    for start in range(max(0, len(description) - len(note)), len(description) + 1):
+        if note.startswith(description[start:]) and (start == len(description) or len(description) == 1023
+                                                       or description.endswith(note)):
+            return description[:start] or None
+    return description or None
+
+
+def restore_measurements(case, root: Union[str, Path], mmap: bool = True) -> int:
+    """Load spilled series back into their measurements (memory-mapped by default)."""
+    root = Path(root)
+    artifacts = {a.path: a for a in case.artifacts or []}
+    restored = 0
+    for i, m in enumerate(_case_measurements(case)):
+        path = _spill_path(case, i)
+        if path not in artifacts:
+            continue
+        m.values = MeasurementSeries.load(root / path, mmap=mmap)
+        m.description = _strip_spill_note(m.description, _SPILL_NOTE.format(n=len(m.values), path=path))
+        del artifacts[path]
+        restored += 1
+    case.artifacts = list(artifacts.values()) or None
+    return restored
+
+
+if __name__ == "__main__":
+    # python -m modules.measurement_series [samples]
+    import sys
+    import time
+    import tempfile
+    import tracemalloc
+    from pydantic import BaseModel, Field
+
+    from modules.test_result import MeasurementsItem, TestCase
+    # The models use the imported module's classes, not this __main__ copy
+    from modules.measurement_series import spill_measurements, restore_measurements
+
+    class ListMeasurement(BaseModel):
+        values: List[Union[int, float, str, bool]] = Field(..., min_length=1)
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 86_400  # 1 Hz over 24 hours
+    trace = (np.random.default_rng(0).gamma(4.0, 25.0, n)).round(3)
+    as_list = trace.tolist()
+
+    def timed(fn, repeat=10):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn()
+        return result, (time.perf_counter() - start) / repeat
+
+    def heap(fn):
+        tracemalloc.start()
+        result = fn()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+
+    old, old_s = timed(lambda: ListMeasurement(values=as_list))
+    new, new_s = timed(lambda: MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=as_list))
+    arr, arr_s = timed(lambda: MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=trace))
+    print(f"{n} float samples")
+    print(f"validate list through the union:  {old_s * 1000:7.2f} ms")
+    print(f"validate list into a series:      {new_s * 1000:7.2f} ms")
+    print(f"validate ndarray into a series:   {arr_s * 1000:7.2f} ms")
+    _, old_heap = heap(lambda: ListMeasurement(values=trace.tolist()))
+    _, new_heap = heap(lambda: MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=trace))
+    print(f"heap: list {old_heap / 1e6:.2f} MB, series {new_heap / 1e6:.2f} MB")
+
+    assert new.model_dump_json().split('"values":')[1].split("]")[0] == \
+        old.model_dump_json().split('"values":')[1].split("]")[0], "JSON differs from the list path"
+    assert MeasurementsItem.model_json_schema()["properties"]["values"]["minItems"] == 1
+
+    case = TestCase(number="1.1", name="Soak", description="24h throughput", result="PASS", status="mandatory",
+                    metrics=[{"description": "DRB.UEThpDl above target", "status": "mandatory", "result": "PASS",
+                              "measurements": [new]}])
+    before = len(case.model_dump_json())
+    with tempfile.TemporaryDirectory() as tmp:
+        spill_measurements(case, tmp)
+        print(f"spilled: case JSON {before / 1e3:.0f} kB -> {len(case.model_dump_json()) / 1e3:.1f} kB, "
+              f"artifact {case.artifacts[0].path}")
+        restore_measurements(case, tmp)
+        assert case.metrics[0].measurements[0].values == new.values and case.artifacts is None
+
+        # Descriptions long enough to cut the spill note (anywhere, even inside its marker) still restore
+        for length in (1000, 1005, 1015, 1022, 1023):
+            new.description = "x" * length
+            spill_measurements(case, tmp)
+            assert restore_measurements(case, tmp) == 1 and case.artifacts is None
+            assert case.metrics[0].measurements[0].description == "x" * length, length
@@ -0,0 +1,238 @@
+import os
+import logging
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import camelot
+from pandas import DataFrame, Series
+from pypdf import PdfReader
+
+from modules.table_assembler import TableAssembler
+from modules.extraction_cache import ExtractionCache
+
+
+class IngestResult(NamedTuple):
+    """Outcome of ingesting one PDF. Exactly one of df / error is set."""
+    pdf_file: Path
+    df: Optional[DataFrame]
+    error: Optional[str]
+
+
+class TableChunk(NamedTuple):
+    """Header-aligned rows extracted from pages first_page..last_page of one PDF."""
+    pdf_file: Path
+    first_page: int
+    last_page: int
+    df: DataFrame
+    header: Optional[Series]
+
+
+def count_pages(pdf_file) -> int:
+    return len(PdfReader(str(pdf_file)).pages)
+
+
+def page_ranges(n_pages: int, pages_per_shard: int, start_page: int = 1) -> List[Tuple[int, int]]:
+    """Split start_page..n_pages into inclusive (first, last) page ranges."""
+    return [(start, min(start + pages_per_shard - 1, n_pages))
+            for start in range(start_page, n_pages + 1, pages_per_shard)]
+
+
+def page_shards(n_pages: int, pages_per_shard: int, start_page: int = 1) -> List[str]:
+    """Split start_page..n_pages into camelot page strings, e.g. ['1-50', '51-100', '101-120']."""
+    return [f"{first}-{last}" if last > first else str(first)
+            for first, last in page_ranges(n_pages, pages_per_shard, start_page)]
+
+
+def expand_pages(pages: str, n_pages: int) -> List[int]:
+    """Turn a camelot page string such as '1,3-5,10-end' or 'all' into page numbers."""
+    if pages == 'all':
+        return list(range(1, n_pages + 1))
+    numbers = []
+    for part in pages.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            last = n_pages if last == 'end' else int(last)
+            numbers.extend(range(int(first), last + 1))
+        else:
+            numbers.append(int(part))
+    return numbers
+
+
+def read_tables(pdf_file, pages: str = 'all', cache: Optional[ExtractionCache] = None,
+                digest: Optional[str] = None) -> List[DataFrame]:
+    """
+    Run camelot lattice extraction over `pages` and return the raw table frames.
+
+    The page each table was found on is kept in `df.attrs['page']`. With a
+    cache, pages already extracted from identical PDF content are served from
+    it and only the remaining pages go through camelot; pass the file's
+    `digest` when it is already known to skip hashing the PDF again.
+    """
+    if cache is None:
+        return _camelot_tables(pdf_file, pages)
+
+    digest = digest or cache.digest(pdf_file)
+    needs_count = pages == 'all' or 'end' in pages
+    page_numbers = expand_pages(pages, count_pages(pdf_file) if needs_count else 0)
+    by_page = {}
+    missing = []
+    for page in page_numbers:
+        cached = cache.get(digest, page)
+        if cached is None:
+            missing.append(page)
+        else:
+            by_page[page] = cached
+
+    if missing:
+        extracted = {page: [] for page in missing}
+        for table_df in _camelot_tables(pdf_file, ','.join(map(str, missing))):
+            extracted[table_df.attrs['page']].append(table_df)
+        for page, tables in extracted.items():
+            cache.put(digest, page, tables)
+        by_page.update(extracted)
+
+    return [table_df for page in page_numbers for table_df in by_page[page]]
+
+
+def _camelot_tables(pdf_file, pages: str) -> List[DataFrame]:
+    tables = camelot.read_pdf(str(pdf_file), flavor='lattice', pages=pages)
+    frames = []
+    for table in tables:
+        table_df = table.df.reset_index(drop=True)
+        table_df.attrs['page'] = int(table.page)
+        frames.append(table_df)
+    return frames
+
+
+def _read_shard(pdf_file, pages: str, cache: Optional[ExtractionCache], digest: Optional[str] = None):
+    # Runs in a worker process; the cache counters travel back with the tables
+    tables = read_tables(pdf_file, pages, cache, digest)
+    return tables, (cache.stats if cache is not None else None)
+
+
+def camelot_settings() -> dict:
+    """Extraction settings that, together with the PDF content and page, key the cache."""
+    return {"flavor": "lattice", "camelot": camelot.__version__}
+
+
+def combine_tables(tables: List[DataFrame], name: str) -> DataFrame:
+    """Merge the tables of one document under the header row of the first table."""
+    assembler = TableAssembler(name)
+    assembler.extend(tables)
+    return assembler.build()
+
+
+def iter_table_chunks(pdf_file, pages_per_shard: int = 20, start_page: int = 1,
+                      header: Optional[Series] = None,
+                      cache: Optional[ExtractionCache] = None) -> Iterator[TableChunk]:
+    """
+    Extract `pdf_file` shard by shard, yielding merged rows after every shard.
+
+    Only one shard's tables are held in memory at a time, and every shard
+    yields a chunk, with no rows when it has no tables. To resume an
+    interrupted run, pass start_page=chunk.last_page + 1 and header=chunk.header
+    from the last chunk that was consumed. Extraction errors propagate to the
+    caller after every preceding chunk has been yielded.
+    """
+    pdf_file = Path(pdf_file)
+    try:
+        ranges = page_ranges(count_pages(pdf_file), pages_per_shard, start_page)
+    except Exception as e:
+        logging.warning(f"Could not count pages of {pdf_file.name}: {e}")
+        ranges = [(start_page, None)]
+
+    for first, last in ranges:
+        pages = f"{first}-{'end' if last is None else last}"
+        tables = read_tables(pdf_file, pages=pages, cache=cache)
+        # A shard without tables still yields an (empty) chunk, so consumers can record its pages as done
+        assembler = TableAssembler(pdf_file.name, header)
+        assembler.extend(tables)
+        df, header = assembler.build(), assembler.header
+        if last is None:
+            last = max((t.attrs['page'] for t in tables), default=first)
+        yield TableChunk(pdf_file, first, last, df, header)
+
+
+def _plan_shards(pdf_file: Path, pages_per_shard: Optional[int]) -> List[str]:
+    if not pages_per_shard:
+        return ['all']
+    try:
+        return page_shards(count_pages(pdf_file), pages_per_shard)
+    except Exception as e:
+        # Fall back to a single shard and let camelot report the real problem
+        logging.warning(f"Could not count pages of {pdf_file.name}: {e}")
+        return ['all']
+
+
+def _finish(pdf_file: Path, shard_tables: List[List[DataFrame]]) -> IngestResult:
+    tables = [t for shard in shard_tables for t in shard]
+    if len(tables) == 0:
+        print(f"No tables detected in {pdf_file.name}")
+        logging.warning(f"No tables detected in {pdf_file.name}")
+        return IngestResult(pdf_file, None, "no tables detected")
+    return IngestResult(pdf_file, combine_tables(tables, pdf_file.name), None)
+
+
+def ingest_pdfs(pdf_files: Iterable[Path], workers: Optional[int] = None,
+                pages_per_shard: Optional[int] = None,
+                cache: Optional[ExtractionCache] = None) -> Iterator[IngestResult]:
+    """
+    Extract and combine the tables of many PDFs on a process pool.
+
+    Every PDF is split into page shards of `pages_per_shard` pages (or read whole
+    when it is None) and each shard is extracted in a worker process. Results are
+    yielded in the order of `pdf_files` as soon as a file and all files before it
+    are done. A failure in one file is reported in its IngestResult and does not
+    affect the others. Workers share `cache`, and their hit/miss counters are
+    merged back into it.
+    """
+    pdf_files = [Path(p) for p in pdf_files]
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        shard_results = []
+        errors: List[Optional[str]] = [None] * len(pdf_files)
+        remaining = []
+        for idx, pdf_file in enumerate(pdf_files):
+            shards = _plan_shards(pdf_file, pages_per_shard)
+            shard_results.append([None] * len(shards))
+            remaining.append(len(shards))
+            # Hash the PDF once here rather than once per shard in the workers
+            digest = None
+            if cache is not None:
+                try:
+                    digest = cache.digest(pdf_file)
+                except OSError:
+                    pass  # the shards report the real problem
+            for s, pages in enumerate(shards):
+                futures[pool.submit(_read_shard, pdf_file, pages, cache, digest)] = (idx, s)
+
+        next_idx = 0
+        try:
+            for future in as_completed(list(futures)):
+                idx, s = futures.pop(future)
+                try:
+                    shard_results[idx][s], stats = future.result()
+                    if cache is not None:
+                        cache.merge_stats(stats)
+                except Exception as e:
+                    if errors[idx] is None:
+                        print(f"Failed to read PDF {pdf_files[idx].name}: {e}")
+                        logging.error(f"Failed to read PDF {pdf_files[idx].name}: {e}")
+                        errors[idx] = str(e)
+                remaining[idx] -= 1
+
+                # Release every file whose predecessors have all been released
+                while next_idx < len(pdf_files) and remaining[next_idx] == 0:
+                    if errors[next_idx] is not None:
+                        yield IngestResult(pdf_files[next_idx], None, errors[next_idx])
+                    else:
+                        yield _finish(pdf_files[next_idx], shard_results[next_idx])
+                    shard_results[next_idx] = None
+                    next_idx += 1
+        finally:
+            # Stop queued shards if the caller abandoned the generator early
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,358 @@
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.report_delta import JSON_PATCH, MERGE_PATCH, json_patch, merge_patch
+from modules.report_serializer import ReportSerializer, compress, get_report_serializer
+from modules.test_report import TestReport
+
+DEFAULT_BASE_URL = "http://192.168.8.111:8000/ProvMnS/v1alpha1"
+
+# Answers worth another attempt; the PUT is keyed on testId so repeating it is safe
+_RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ProvMnSError(RuntimeError):
+    """Raised when a ProvMnS request fails for good."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadResult(NamedTuple):
+    test_id: str
+    status_code: Optional[int]   # None when no answer came back
+    attempts: int                # 0 when skipped as already uploaded
+    seconds: float
+    bytes_sent: int
+    error: Optional[str] = None
+    method: str = "PUT"          # PUT, PATCH, or SKIP when nothing was sent
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an unsorted list, 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+class ClientMetrics:
+    """Thread-safe upload counters and per-request latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"uploads": 0, "requests": 0, "retries": 0, "failures": 0, "skipped": 0, "bytes_sent": 0,
+                           "patches": 0, "patch_fallbacks": 0}
+            self.latencies: List[float] = []
+            self.started = time.perf_counter()
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self.counts[key] += value
+
+    def latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            return dict(self.counts,
+                        p50_ms=round(percentile(self.latencies, 50) * 1000, 2),
+                        p99_ms=round(percentile(self.latencies, 99) * 1000, 2),
+                        reports_per_s=round(self.counts["uploads"] / elapsed, 1) if elapsed else 0.0,
+                        mb_per_s=round(self.counts["bytes_sent"] / 1e6 / elapsed, 2) if elapsed else 0.0)
+
+
+class _Published(NamedTuple):
+    doc: Dict[str, Any]        # its dumped JSON document, the baseline the next delta is computed from
+    etag: Optional[str]        # the server's version of that document
+    size: int                  # uncompressed size of the last full upload
+
+
+class ProvMnSClient:
+    """
+    Publishes TestReports to a ProvMnS SubNetwork endpoint (PUT/GET {base_url}/SubNetwork/{testId}).
+
+    One requests.Session with a keep-alive pool of `pool_size` connections is
+    shared by every call, every request has a timeout, and connection errors,
+    timeouts, 429 and 5xx answers are retried with exponential backoff and
+    jitter. A PUT replaces the report stored under its testId, so a retry can
+    never duplicate anything; a report whose body is unchanged since its last
+    acknowledged upload is not sent again. Bodies come from the shared
+    ReportSerializer: a frozen report is encoded once for all its uploads,
+    others once per upload, and retries reuse those bytes.
+    upload_many() / upload_many_async() keep at most `concurrency` uploads in
+    flight over the same pool.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, auth: Optional[Tuple[str, str]] = None,
+                 timeout: Tuple[float, float] = (3.05, 30.0), pool_size: int = 16, max_retries: int = 3,
+                 backoff: float = 0.2, encoding: str = "json", compression: Optional[str] = "gzip",
+                 serializer: Optional[ReportSerializer] = None, session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.encoding = encoding
+        self.compression = compression
+        self.serializer = serializer or get_report_serializer()
+        self.session = session or requests.Session()
+        # Retries are handled here, with backoff and metrics, not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if auth is not None:
+            self.session.auth = auth
+        self.metrics = ClientMetrics()
+        self._acked: Dict[str, bytes] = {}  # testId -> digest of the last body the server accepted
+        self._acked_lock = threading.Lock()
+        self._published: Dict[str, _Published] = {}  # baselines for publish()
+        self._etags: Dict[str, Optional[str]] = {}
+
+    def url(self, test_id: str) -> str:
+        return f"{self.base_url}/SubNetwork/{test_id}"
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send with retries; returns the final response, or raises ProvMnSError."""
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                error, status = None, response.status_code
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error, status = None, e, None
+            self.metrics.add(requests=1)
+            self.metrics.latency(time.perf_counter() - start)
+            if response is not None and status not in _RETRY_STATUSES:
+                response.attempts = attempt + 1
+                return response
+            if attempt == self.max_retries:
+                detail = error or f"HTTP {status}: {response.text[:200]}"
+                raise ProvMnSError(f"{method} {url} failed after {attempt + 1} attempt(s): {detail}", status)
+            self.metrics.add(retries=1)
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            logging.warning(f"{method} {url} failed ({error or status}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def put_report(self, report: TestReport, test_id: Optional[str] = None, force: bool = False) -> UploadResult:
+        """Upload one report under its testId; never raises, the outcome is in the UploadResult."""
+        test_id = test_id or report.testMetadata.testId
+        start = time.perf_counter()
+        # Frozen reports (TestReport.freeze()) reuse their cached body; anything else is encoded afresh,
+        # so the digest always reflects the current content
+        body, headers = self.serializer.body(report, self.encoding, self.compression)
+        return self._put(test_id, body, headers, force, start)
+
+    def _put(self, test_id: str, body: bytes, headers: Dict[str, str], force: bool, start: float) -> UploadResult:
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        with self._acked_lock:
+            unchanged = not force and self._acked.get(test_id) == digest
+        if unchanged:
+            self.metrics.add(skipped=1)
+            return UploadResult(test_id, None, 0, time.perf_counter() - start, 0, method="SKIP")
+        try:
+            response = self._request("PUT", self.url(test_id), data=body, headers=headers)
+        except ProvMnSError as e:
+            # Every attempt sent the body, whether or not an answer came back
+            sent = len(body) * (self.max_retries + 1)
+            self.metrics.add(failures=1, bytes_sent=sent)
+            logging.error(str(e))
+            return UploadResult(test_id, e.status_code, self.max_retries + 1, time.perf_counter() - start, sent,
+                                str(e))
+        sent = len(body) * response.attempts
+        if not response.ok:
+            self.metrics.add(failures=1, bytes_sent=sent)
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            logging.error(f"PUT {self.url(test_id)} rejected: {error}")
+            return UploadResult(test_id, response.status_code, response.attempts, time.perf_counter() - start,
+                                sent, error)
+        with self._acked_lock:
+            self._acked[test_id] = digest
+        self._etags[test_id] = response.headers.get("ETag")
+        self.metrics.add(uploads=1, bytes_sent=sent)
+        return UploadResult(test_id, response.status_code, response.attempts, time.perf_counter() - start, sent)
+
+    def publish(self, report: TestReport, test_id: Optional[str] = None, patch_format: str = "json-patch",
+                max_patch_ratio: float = 0.5) -> UploadResult:
+        """
+        Upload a report that is updated over time, sending only what changed since its last publish.
+
+        The first publish is a full PUT and keeps the dumped document as the
+        baseline. Later calls diff the current report against it and send a
+        PATCH (JSON Patch, or merge patch with patch_format="merge-patch")
+        with If-Match set to the baseline's ETag, so a retried or stale patch
+        can never be applied twice. It falls back to a full PUT when the
+        patch would be larger than `max_patch_ratio` of the last full body
+        (both uncompressed),
+        or the server cannot apply it (404/409/412/415). The report is dumped
+        and diffed on every call, so in-place edits of nested objects are
+        published too; an empty delta is skipped.
+        """
+        test_id = test_id or report.testMetadata.testId
+        start = time.perf_counter()
+        base = self._published.get(test_id)
+        doc = report.model_dump(mode="json", exclude_none=True)
+        if base is None or base.etag is None:
+            return self._publish_full(report, test_id, doc, start)
+
+        if patch_format == "merge-patch":
+            delta, content_type = merge_patch(base.doc, doc), MERGE_PATCH
+        else:
+            delta, content_type = json_patch(base.doc, doc), JSON_PATCH
+        if not delta:
+            self.metrics.add(skipped=1)
+            return UploadResult(test_id, None, 0, time.perf_counter() - start, 0, method="SKIP")
+        body = json.dumps(delta, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(body) > max_patch_ratio * base.size:
+            return self._publish_full(report, test_id, doc, start)
+        body = compress(body, self.compression)
+
+        headers = {"Content-Type": content_type, "If-Match": base.etag}
+        if self.compression is not None:
+            headers["Content-Encoding"] = self.compression
+        try:
+            response = self._request("PATCH", self.url(test_id), data=body, headers=headers)
+        except ProvMnSError as e:
+            # Retries are exhausted; whether the last one landed is unknown, so start over with a PUT next time
+            self._published.pop(test_id, None)
+            sent = len(body) * (self.max_retries + 1)
+            self.metrics.add(failures=1, bytes_sent=sent)
+            logging.error(str(e))
+            return UploadResult(test_id, e.status_code, self.max_retries + 1, time.perf_counter() - start, sent,
+                                str(e), "PATCH")
+        sent = len(body) * response.attempts
+        if response.status_code in (404, 409, 412, 415):
+            logging.warning(f"PATCH {self.url(test_id)} answered {response.status_code}, sending the full report")
+            self.metrics.add(patch_fallbacks=1, bytes_sent=sent)
+            return self._publish_full(report, test_id, doc, start)
+        if not response.ok:
+            self.metrics.add(failures=1, bytes_sent=sent)
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            logging.error(f"PATCH {self.url(test_id)} rejected: {error}")
+            return UploadResult(test_id, response.status_code, response.attempts, time.perf_counter() - start,
+                                sent, error, "PATCH")
+        self._published[test_id] = _Published(doc, response.headers.get("ETag"), base.size)
+        self.metrics.add(uploads=1, patches=1, bytes_sent=sent)
+        return UploadResult(test_id, response.status_code, response.attempts, time.perf_counter() - start, sent,
+                            method="PATCH")
+
+    def _publish_full(self, report: TestReport, test_id: str, doc, start: float) -> UploadResult:
+        # One encode serves both the PUT body and the size later patches are weighed against
+        raw = self.serializer.encode(report, self.encoding)
+        body = compress(raw, self.compression, self.serializer.levels.get(self.compression))
+        result = self._put(test_id, body, self.serializer.headers(self.encoding, self.compression), True, start)
+        if result.ok:
+            self._published[test_id] = _Published(doc, self._etags.get(test_id), len(raw))
+        else:
+            self._published.pop(test_id, None)
+        return result._replace(seconds=time.perf_counter() - start)
+
+    def get_report(self, test_id: str, as_model: bool = False):
+        """The stored report as parsed JSON (or a TestReport); None when the server has none."""
+        response = self._request("GET", self.url(test_id))
+        if response.status_code == 404:
+            return None
+        if not response.ok:
+            raise ProvMnSError(f"GET {self.url(test_id)}: HTTP {response.status_code}", response.status_code)
+        return TestReport.model_validate_json(response.content) if as_model else response.json()
+
+    def upload_many(self, reports: Iterable[TestReport], concurrency: int = 8) -> List[UploadResult]:
+        """Upload reports with at most `concurrency` in flight; results are in input order."""
+        results: List[UploadResult] = []
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for report in reports:
+                # Bounded submission: a generator of reports is only pulled as slots free up
+                if len(in_flight) >= concurrency:
+                    results.append(in_flight.popleft().result())
+                in_flight.append(pool.submit(self.put_report, report))
+            while in_flight:
+                results.append(in_flight.popleft().result())
+        return results
+
+    async def upload_many_async(self, reports: Iterable[TestReport], concurrency: int = 8) -> List[UploadResult]:
+        """upload_many() for asyncio callers; the blocking requests run on a private thread pool."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            async def upload(report):
+                async with slots:
+                    return await loop.run_in_executor(pool, self.put_report, report)
+            return await asyncio.gather(*(upload(report) for report in reports))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    # python -m modules.provmns_client [reports]
+    import sys
+
+    from modules.provmns_server import start_provmns_server
+    from modules.provmns_loadgen import synthetic_reports
+
+    logging.basicConfig(level=logging.ERROR)
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    reports = list(synthetic_reports(n_reports, cases_per_report=2))
+    for report in reports:
+        report.freeze()  # finished reports: every run below reuses the encoded bodies
+
+    # Before: one unpooled, blocking requests.put per report, no retry
+    server, base_url = start_provmns_server(latency=0.005)
+    serializer = get_report_serializer()
+    start = time.perf_counter()
+    for report in reports[:50]:
+        body, headers = serializer.body(report, "json", "gzip")
+        requests.put(f"{base_url}/SubNetwork/{report.testMetadata.testId}", data=body, headers=headers)
+    before = (time.perf_counter() - start) / 50
+    print(f"requests.put per report (no pooling, no retry): {1 / before:.0f} reports/s")
+    server.shutdown()
+
+    for concurrency, error_rate in ((1, 0.0), (8, 0.1), (32, 0.1)):
+        server, base_url = start_provmns_server(latency=0.005, error_rate=error_rate)
+        with ProvMnSClient(base_url, backoff=0.01, pool_size=concurrency) as client:
+            results = client.upload_many(reports, concurrency=concurrency)
+            assert all(r.ok for r in results) and len(server.store) == n_reports
+            print(f"pooled client, concurrency {concurrency:2}, {error_rate:.0%} errors: {client.metrics.report()}")
+        server.shutdown()
+
+    server, base_url = start_provmns_server(latency=0.005, error_rate=0.1)
+    with ProvMnSClient(base_url, backoff=0.01) as client:
+        results = asyncio.run(client.upload_many_async(reports, concurrency=16))
+        again = client.upload_many(reports, concurrency=16)
+        print(f"async mode: {sum(r.ok for r in results)} uploaded; re-upload of unchanged reports skipped "
+              f"{sum(r.attempts == 0 for r in again)}; {client.metrics.report()}")
+        print(f"serializer: {serializer.stats}")
+        fetched = client.get_report(reports[0].testMetadata.testId, as_model=True)
+        assert fetched.testMetadata.testId == reports[0].testMetadata.testId
+        assert client.get_report("missing") is None
+    server.shutdown()
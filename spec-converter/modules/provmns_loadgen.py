@@ -0,0 +1,91 @@
+import time
+import logging
+import argparse
+import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from modules.provmns_client import ProvMnSClient, percentile
+from modules.test_metadata import TestMetadata, TestType
+from modules.test_report import TestReport
+from modules.test_result import TestCase
+from modules.test_specification import TestSpecification
+
+# Load generator for a ProvMnS endpoint: pushes synthetic TestReports through
+# ProvMnSClient and reports latency percentiles and throughput.
+
+_SPEC = TestSpecification(expectationVerb="EXPECT", expectationObject=[{"objectType": "RAN_SUBNETWORK"}],
+                          expectationTargets=[{"targetName": "PEE.AvgPower", "targetCondition": "IS_LESS_THAN",
+                                               "targetValueRange": [20], "targetUnit": "W"}])
+
+
+def synthetic_reports(n: int, cases_per_report: int = 10, values_per_case: int = 20) -> Iterator[TestReport]:
+    """`n` distinct reports (own testId each), built lazily so large runs stay flat in memory."""
+    for i in range(n):
+        cases = [
+            TestCase(
+                number=f"1.{c + 1}", name=f"Energy saving check {c}", description="Cell power under the target.",
+                result="PASS" if (i + c) % 7 else "FAIL", status="mandatory",
+                metrics=[{"description": "PEE.AvgPower below target", "status": "mandatory", "result": "PASS",
+                          "measurements": [{"name": "PEE.AvgPower", "units": "W",
+                                            "values": [round(15 + (i * c + k) % 13 * 0.37, 3)
+                                                       for k in range(values_per_case)]}]}],
+            )
+            for c in range(cases_per_report)
+        ]
+        yield TestReport(
+            testMetadata=TestMetadata(startDate=datetime.datetime(2025, 1, 1), dutName=f"Energy saving rApp {i}",
+                                      testType=TestType.FUNCTIONAL),
+            testSpecifications=[_SPEC],
+            testResults=cases or None,
+        )
+
+
+def run_load(base_url: str, n_reports: int = 1000, concurrency: int = 16, cases_per_report: int = 10,
+             compression: Optional[str] = "gzip", **client_options) -> Dict[str, Any]:
+    """Upload `n_reports` synthetic reports; returns the client metrics plus end-to-end upload percentiles."""
+    with ProvMnSClient(base_url, pool_size=concurrency, compression=compression, **client_options) as client:
+        start = time.perf_counter()
+        results = client.upload_many(synthetic_reports(n_reports, cases_per_report), concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+        uploads = [r.seconds for r in results if r.ok]
+        report = client.metrics.report()
+    report.update(
+        concurrency=concurrency,
+        seconds=round(elapsed, 2),
+        upload_p50_ms=round(percentile(uploads, 50) * 1000, 2),
+        upload_p99_ms=round(percentile(uploads, 99) * 1000, 2),
+        reports_per_s=round(len(uploads) / elapsed, 1),
+    )
+    return report
+
+
+if __name__ == "__main__":
+    # python -m modules.provmns_loadgen [--url URL] [--reports N] [--concurrency 1,8,32]
+    from modules.provmns_server import start_provmns_server
+
+    parser = argparse.ArgumentParser(description="Load generator for a ProvMnS SubNetwork endpoint")
+    parser.add_argument("--url", help="ProvMnS base URL; omit to start a local stand-in server")
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated in-flight limits to run")
+    parser.add_argument("--cases", type=int, default=10, help="test cases per synthetic report")
+    parser.add_argument("--latency", type=float, default=0.005, help="stand-in latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.005, help="stand-in extra random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="stand-in share of 429/5xx answers")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_provmns_server(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+        print(f"stand-in at {base_url}: latency {args.latency * 1000:.0f}ms + up to {args.jitter * 1000:.0f}ms, "
+              f"error rate {args.error_rate:.0%}")
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        result = run_load(base_url, args.reports, concurrency, args.cases, backoff=0.01)
+        print(f"concurrency {concurrency:3}: {result['reports_per_s']:7.1f} reports/s  "
+              f"upload p50 {result['upload_p50_ms']:6.1f} ms  p99 {result['upload_p99_ms']:6.1f} ms  "
+              f"retries {result['retries']}  failures {result['failures']}  "
+              f"({result['mb_per_s']} MB/s on the wire)")
+    if server is not None:
+        print(f"server: {len(server.store)} reports stored, {server.store.counts}")
+        server.shutdown()
@@ -0,0 +1,247 @@
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from modules.report_delta import JSON_PATCH, MERGE_PATCH, PatchConflict, apply_merge_patch, apply_patch
+
+# Offline stand-in for the ProvMnS SubNetwork endpoint that config_mapper
+# uploads to. Reports are kept in memory, keyed on testId, updated by PUT or
+# by a JSON Patch / Merge Patch, and the server can add latency and fail a
+# share of requests to exercise client retries.
+
+PREFIX = "/ProvMnS/v1alpha1/SubNetwork/"
+
+
+class ReportStore:
+    """
+    Thread-safe in-memory testId -> report, with a version per testId (sent as the ETag).
+
+    A report is kept as its parsed document plus the bytes last sent for it:
+    PATCHes change the document in place and GET serializes it again only
+    when it was patched since, so an update costs the server the size of its
+    delta rather than a parse of the whole report.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reports: Dict[str, list] = {}  # testId -> [bytes or None, doc, version]
+        self.counts = {"PUT": 0, "GET": 0, "PATCH": 0, "DELETE": 0, "injected_errors": 0, "bytes_received": 0,
+                       "patch_conflicts": 0, "parse_seconds": 0.0}
+
+    def count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counts[key] += n
+
+    def put(self, test_id: str, data: bytes, doc) -> Tuple[bool, int]:
+        """Store a report; returns (replaced an existing one, new version)."""
+        with self._lock:
+            entry = self.reports.get(test_id)
+            version = entry[2] + 1 if entry else 1
+            self.reports[test_id] = [data, doc, version]
+            return entry is not None, version
+
+    def get(self, test_id: str) -> Optional[Tuple[bytes, int]]:
+        with self._lock:
+            entry = self.reports.get(test_id)
+            if entry is None:
+                return None
+            if entry[0] is None:
+                entry[0] = json.dumps(entry[1], separators=(",", ":"), ensure_ascii=False).encode()
+            return entry[0], entry[2]
+
+    def patch(self, test_id: str, apply, if_match: Optional[int]) -> Tuple[int, int]:
+        """
+        Run `apply(doc) -> doc` on a stored report; returns (HTTP status, version).
+
+        404 when there is no report, 412 when `if_match` is not the current
+        version, 409 when the patch does not apply; a report a patch failed
+        half-way on is dropped, the client answers that with a full PUT.
+        """
+        with self._lock:
+            entry = self.reports.get(test_id)
+            if entry is None:
+                return 404, 0
+            if if_match is not None and if_match != entry[2]:
+                return 412, entry[2]
+            try:
+                entry[1] = apply(entry[1])
+            except PatchConflict:
+                del self.reports[test_id]
+                self.counts["patch_conflicts"] += 1
+                return 409, 0
+            entry[0] = None
+            entry[2] += 1
+            return 200, entry[2]
+
+    def delete(self, test_id: str) -> bool:
+        with self._lock:
+            return self.reports.pop(test_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self.reports)
+
+
+class ProvMnSHandler(BaseHTTPRequestHandler):
+    store: ReportStore = None
+    latency = 0.0       # seconds added to every request
+    jitter = 0.0        # plus up to this many seconds at random
+    error_rate = 0.0    # fraction of requests answered with 429/500/503
+    validate = False    # parse PUT bodies as TestReport and answer 400 when invalid
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: bytes = b"", content_type: str = "application/json",
+              version: Optional[int] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if version:
+            self.send_header("ETag", f'"{version}"')
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": {"status": status, "message": message}}).encode())
+
+    def _test_id(self) -> Optional[str]:
+        if not self.path.startswith(PREFIX):
+            self._error(404, f"unknown path {self.path}")
+            return None
+        test_id = self.path[len(PREFIX):].strip("/")
+        if not test_id or "/" in test_id:
+            self._error(404, f"unknown path {self.path}")
+            return None
+        return test_id
+
+    def _simulate(self) -> bool:
+        """Sleep for the configured latency; False (after answering) when an error is injected."""
+        delay = self.latency + (random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.store.count("injected_errors")
+            status = random.choice([429, 500, 503])
+            self._error(status, "injected failure")
+            return False
+        return True
+
+    def _body(self) -> bytes:
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.store.count("bytes_received", len(data))
+        if self.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return data
+
+    def do_PUT(self):
+        data = self._body()  # always drain the body so the connection stays usable
+        test_id = self._test_id()
+        if test_id is None or not self._simulate():
+            return
+        self.store.count("PUT")
+        start = time.perf_counter()
+        try:
+            doc = json.loads(data)
+            if self.validate:
+                from modules.test_report import TestReport
+                TestReport.model_validate(doc)
+        except ValueError as e:
+            self._error(400, str(e)[:1000])
+            return
+        finally:
+            self.store.count("parse_seconds", time.perf_counter() - start)
+        replaced, version = self.store.put(test_id, data, doc)
+        self._send(200 if replaced else 201, version=version)
+
+    def do_PATCH(self):
+        data = self._body()
+        test_id = self._test_id()
+        if test_id is None or not self._simulate():
+            return
+        self.store.count("PATCH")
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        start = time.perf_counter()
+        try:
+            delta = json.loads(data)
+        except ValueError as e:
+            self._error(400, f"invalid JSON: {e}")
+            return
+        finally:
+            self.store.count("parse_seconds", time.perf_counter() - start)
+        if content_type == JSON_PATCH and isinstance(delta, list):
+            apply = lambda doc: apply_patch(doc, delta, in_place=True)
+        elif content_type == MERGE_PATCH:
+            apply = lambda doc: apply_merge_patch(doc, delta)
+        else:
+            self._error(415, f"PATCH needs {JSON_PATCH} or {MERGE_PATCH}, got {content_type!r}")
+            return
+        if_match = self.headers.get("If-Match")
+        try:
+            if_match = int(if_match.strip('W/"')) if if_match else None
+        except ValueError:
+            if_match = -1  # an ETag this server never issued
+        start = time.perf_counter()
+        status, version = self.store.patch(test_id, apply, if_match)
+        self.store.count("parse_seconds", time.perf_counter() - start)
+        if status != 200:
+            self._error(status, {404: f"no report for {test_id}", 412: f"report {test_id} is at version {version}",
+                                 409: "patch does not apply to the stored report"}[status])
+            return
+        self._send(200, version=version)
+
+    def do_GET(self):
+        test_id = self._test_id()
+        if test_id is None or not self._simulate():
+            return
+        self.store.count("GET")
+        stored = self.store.get(test_id)
+        if stored is None:
+            self._error(404, f"no report for {test_id}")
+            return
+        self._send(200, stored[0], version=stored[1])
+
+    def do_DELETE(self):
+        test_id = self._test_id()
+        if test_id is None or not self._simulate():
+            return
+        self.store.count("DELETE")
+        self._send(204) if self.store.delete(test_id) else self._error(404, f"no report for {test_id}")
+
+
+def start_provmns_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                         error_rate: float = 0.0, validate: bool = False) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stand-in on a background thread and return (server, base_url); reports are in server.store."""
+    store = ReportStore()
+    handler = type("ConfiguredProvMnSHandler", (ProvMnSHandler,), {
+        "store": store, "latency": latency, "jitter": jitter, "error_rate": error_rate, "validate": validate,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.store = store
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{PREFIX.rsplit('/SubNetwork/', 1)[0]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory ProvMnS SubNetwork stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of artificial latency per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    parser.add_argument("--validate", action="store_true", help="reject PUT bodies that are not a valid TestReport")
+    args = parser.parse_args()
+
+    server, base_url = start_provmns_server(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                                            args.validate)
+    print(f"ProvMnS stand-in listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,222 @@
+import copy
+from typing import Any, Dict, List
+
+# Deltas between two JSON documents (dumped reports), in the two standard forms:
+# JSON Patch (RFC 6902), which can express "append these results", and JSON
+# Merge Patch (RFC 7396), which is simpler but replaces changed lists whole.
+
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+
+
+class PatchConflict(ValueError):
+    """Raised when a patch does not apply to the document it is applied to."""
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(old, new) -> bool:
+    # True == 1 in Python but not in JSON
+    return type(old) is type(new) and old == new
+
+
+def _diff(old, new, path: str, ops: List[Dict[str, Any]]):
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key in old:
+                _diff(old[key], value, f"{path}/{_escape(key)}", ops)
+            else:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            if not _same(old[i], new[i]):
+                _diff(old[i], new[i], f"{path}/{i}", ops)
+        # Shrink from the end so earlier indexes stay valid, then append
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for value in new[common:]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": value})
+        return
+    ops.append({"op": "replace", "path": path, "value": new})
+
+
+def json_patch(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """
+    JSON Patch operations turning `old` into `new`.
+
+    Lists are compared index by index, so results appended to testResults
+    (or to a group's groupItems) become "add .../-" operations carrying only
+    the new items, and a changed field deep in an existing case is a single
+    "replace". Unchanged subtrees are skipped with one C-level == each.
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _parent(doc, path: str):
+    if not path.startswith("/"):
+        raise PatchConflict(f"Invalid JSON pointer {path!r}")
+    tokens = [_unescape(t) for t in path[1:].split("/")]
+    target = doc
+    for token in tokens[:-1]:
+        try:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise PatchConflict(f"Path {path!r} does not exist")
+    return target, tokens[-1]
+
+
+def apply_patch(doc: Any, ops: List[Dict[str, Any]], in_place: bool = False) -> Any:
+    """Apply JSON Patch add/remove/replace/test operations; raises PatchConflict when one does not fit."""
+    if not in_place:
+        doc = copy.deepcopy(doc)
+    for op in ops:
+        kind, path = op.get("op"), op.get("path", "")
+        if path == "":
+            if kind in ("add", "replace"):
+                doc = op["value"]
+                continue
+            if kind == "test" and _same(doc, op["value"]):
+                continue
+            raise PatchConflict(f"Cannot {kind} the document root")
+        parent, token = _parent(doc, path)
+        try:
+            if isinstance(parent, list):
+                index = len(parent) if token == "-" else int(token)
+                if kind == "add":
+                    if index > len(parent):
+                        raise IndexError(index)
+                    parent.insert(index, op["value"])
+                elif kind == "remove":
+                    del parent[index]
+                elif kind == "replace":
+                    parent[index] = op["value"]
+                elif kind == "test":
+                    if not _same(parent[index], op["value"]):
+                        raise PatchConflict(f"Test failed at {path!r}")
+                else:
+                    raise PatchConflict(f"Unsupported patch operation {kind!r}")
+            elif isinstance(parent, dict):
+                if kind == "add":
+                    parent[token] = op["value"]
+                elif kind == "remove":
+                    del parent[token]
+                elif kind == "replace":
+                    if token not in parent:
+                        raise KeyError(token)
+                    parent[token] = op["value"]
+                elif kind == "test":
+                    if not _same(parent[token], op["value"]):
+                        raise PatchConflict(f"Test failed at {path!r}")
+                else:
+                    raise PatchConflict(f"Unsupported patch operation {kind!r}")
+            else:
+                raise PatchConflict(f"Path {path!r} does not point into an object or array")
+        except (KeyError, IndexError, ValueError) as e:
+            if isinstance(e, PatchConflict):
+                raise
+            raise PatchConflict(f"Cannot {kind} {path!r}: {e!r}")
+    return doc
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """JSON Merge Patch turning `old` into `new` (removed keys become null; changed lists are sent whole)."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif not _same(old[key], value):
+            patch[key] = merge_patch(old[key], value)
+    return patch
+
+
+def apply_merge_patch(doc: Any, patch: Any) -> Any:
+    """RFC 7396 merge; `doc` is not modified."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(doc) if isinstance(doc, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+if __name__ == "__main__":
+    # python -m modules.report_delta [updates] [cases_per_update]
+    import sys
+    import time
+    import json
+    import datetime
+
+    from modules.provmns_client import ProvMnSClient
+    from modules.provmns_server import start_provmns_server
+    from modules.provmns_loadgen import synthetic_reports
+    from modules.test_metadata import ResultType
+
+    n_updates = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_update = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    # One long run: each update appends results and moves the stop date / overall result, edited in place
+    batches = [next(synthetic_reports(1, per_update, 50)).testResults for _ in range(n_updates)]
+
+    def run(publish_with: str):
+        server, base_url = start_provmns_server()
+        report = next(synthetic_reports(1, 0))
+        report.testResults = []
+        client = ProvMnSClient(base_url, compression="gzip")
+        upload = client.put_report if publish_with == "put" else \
+            lambda r: client.publish(r, patch_format=publish_with)
+        start = time.perf_counter()
+        for i, batch in enumerate(batches):
+            for k, case in enumerate(batch):
+                case.number = f"{i + 1}.{k + 1}"
+            report.testResults.extend(batch)
+            report.testMetadata.stopDate = datetime.datetime(2025, 1, 1, 1) + datetime.timedelta(minutes=i)
+            report.testMetadata.result = ResultType.FAIL if i % 10 == 9 else ResultType.PASS
+            result = upload(report)
+            assert result.ok, result.error
+        elapsed = time.perf_counter() - start
+        test_id = report.testMetadata.testId
+        stored = json.loads(server.store.get(test_id)[0])
+        assert stored == report.model_dump(mode="json", exclude_none=True), "server copy differs"
+        metrics = client.metrics.report()
+        server.shutdown()
+        client.close()
+        return elapsed, metrics, server.store.counts
+
+    print(f"{n_updates} updates of {per_update} cases ({n_updates * per_update} cases at the end)")
+    for mode in ("put", "json-patch"):
+        elapsed, metrics, counts = run(mode)
+        print(f"{mode:12} {metrics['bytes_sent'] / 1e6:8.2f} MB sent (gzip), {elapsed:6.2f}s total, "
+              f"server parse/apply {counts['parse_seconds']:.2f}s, {counts['PUT']} PUT / {counts['PATCH']} PATCH")
+
+    # A merge patch resends any changed list whole, so it only pays off for field updates like closing the run
+    server, base_url = start_provmns_server()
+    report = next(synthetic_reports(1, 2000, 50))
+    with ProvMnSClient(base_url) as client:
+        client.publish(report, patch_format="merge-patch")
+        report.testMetadata.stopDate = datetime.datetime(2025, 1, 2)
+        report.testMetadata.result = ResultType.PASS
+        result = client.publish(report, patch_format="merge-patch")
+        full = len(client.serializer.encode(report, "json", "gzip"))
+        print(f"merge-patch closing the run: {result.method} of {result.bytes_sent} bytes instead of {full}")
+        assert json.loads(server.store.get(report.testMetadata.testId)[0]) == \
+            report.model_dump(mode="json", exclude_none=True)
+    server.shutdown()
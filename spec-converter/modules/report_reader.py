@@ -0,0 +1,258 @@
+import re
+import json
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from modules.test_result import TestCase
+
+# Characters that change the parser state; everything else (numbers, literals,
+# whitespace) is skipped by the regex search
+_TOKEN = re.compile(r'["{}\[\],]')
+# Inside the body of a test case only nesting matters, not keys
+_DEEP_TOKEN = re.compile(r'["{}\[\]]')
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+# Top-level string fields of a results list element that are kept while scanning
+_ITEM_FIELDS = {"number", "result", "status"}
+
+
+class ReportReadError(ValueError):
+    """Raised when a results document is not well-formed JSON."""
+
+
+class ResultCase(NamedTuple):
+    path: Tuple[str, ...]  # numbers of the enclosing test groups, outermost first
+    case: TestCase
+
+
+class _Frame:
+    __slots__ = ("kind", "role", "key", "expect_key", "number")
+
+    def __init__(self, kind: str, role: str):
+        self.kind = kind
+        self.role = role  # root / results / item / group / other
+        self.key: Optional[str] = None
+        self.expect_key = kind == "{"
+        self.number: Optional[list] = None  # a group's [number] cell on the group path
+
+
+class ResultScanner:
+    """
+    Pull parser that finds the test cases of a TIFG results document in streamed text.
+
+    Only the structure is tracked: the top-level "testResults" list and the
+    "groupItems" lists of the groups under it. Each element of those lists is
+    buffered until it either closes, and is returned as the raw JSON text of a
+    test case, or shows a "groupItems" key, at which point it is a group: its
+    buffer is dropped and its number is pushed onto the group path. Memory
+    therefore stays at one test case plus one read chunk. Key order is not
+    guaranteed in files from other tools: when a group's "number" comes after
+    its "groupItems", the cases under it are held back until the number is
+    known (at the latest when the group closes), so their paths are complete.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._path: List[list] = []  # one [number] cell per open group, None until its number is seen
+        self._pending: List[Tuple[Tuple[list, ...], str, Dict[str, str]]] = []
+        self._item_start: Optional[int] = None
+        self._item_fields: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> Iterator[Tuple[Tuple[str, ...], str, Dict[str, str]]]:
+        """
+        Yield (group path, raw case JSON, its number/result/status strings) for
+        every case completed by `chunk`; consume fully before the next feed.
+        """
+        text = self._text + chunk
+        pos = self._pos
+        stack = self._stack
+        try:
+            while True:
+                deep = bool(stack) and stack[-1].role == "other"
+                m = (_DEEP_TOKEN if deep else _TOKEN).search(text, pos)
+                if m is None:
+                    pos = len(text)
+                    break
+                i = m.start()
+                ch = text[i]
+                if ch == '"':
+                    end = _STRING_REST.match(text, i + 1)
+                    if end is None:
+                        pos = i  # string continues in the next chunk
+                        break
+                    pos = end.end()
+                    top = stack[-1] if stack else None
+                    if deep or top is None or top.kind != "{":
+                        continue
+                    if top.expect_key:
+                        key = text[i + 1:pos - 1]
+                        top.key = json.loads(text[i:pos]) if "\\" in key else key
+                        top.expect_key = False
+                        if top.role == "item" and top.key == "groupItems":
+                            top.role = "group"
+                            top.number = [self._item_fields.get("number")]
+                            self._path.append(top.number)
+                            self._item_start = None
+                    elif top.role == "item" and top.key in _ITEM_FIELDS:
+                        self._item_fields[top.key] = json.loads(text[i:pos])
+                    elif top.role == "group" and top.key == "number":
+                        top.number[0] = json.loads(text[i:pos])
+                    continue
+
+                pos = i + 1
+                if ch == "{" or ch == "[":
+                    parent = stack[-1] if stack else None
+                    role = "other"
+                    if parent is None:
+                        role = "root" if ch == "{" else "other"
+                    elif ch == "[" and ((parent.role == "root" and parent.key == "testResults")
+                                        or (parent.role == "group" and parent.key == "groupItems")):
+                        role = "results"
+                    elif ch == "{" and parent.role == "results":
+                        role = "item"
+                        self._item_start = i
+                        self._item_fields = {}
+                    stack.append(_Frame(ch, role))
+                elif ch == "}" or ch == "]":
+                    if not stack or (stack[-1].kind == "{") != (ch == "}"):
+                        raise ReportReadError(f"Unexpected {ch!r} in results document")
+                    frame = stack.pop()
+                    if frame.role == "item":
+                        raw = text[self._item_start:pos]
+                        self._item_start = None
+                        cells = tuple(self._path)
+                        if any(cell[0] is None for cell in cells):
+                            self._pending.append((cells, raw, self._item_fields))
+                        else:
+                            yield tuple(cell[0] for cell in cells), raw, self._item_fields
+                    elif frame.role == "group":
+                        cell = self._path.pop()
+                        if cell[0] is None:
+                            cell[0] = "?"  # the group has no number at all
+                        if self._pending and all(c[0] is not None for c in self._path):
+                            pending, self._pending = self._pending, []
+                            for cells, raw, fields in pending:
+                                yield tuple(c[0] for c in cells), raw, fields
+                elif stack and stack[-1].kind == "{":  # ","
+                    stack[-1].expect_key = True
+        finally:
+            # Keep only the case being buffered (or the unfinished token)
+            keep = self._item_start if self._item_start is not None else pos
+            self._text = text[keep:]
+            self._pos = pos - keep
+            if self._item_start is not None:
+                self._item_start = 0
+
+    def finish(self):
+        if self._stack or self._text[self._pos:].strip():
+            raise ReportReadError("Results document ended inside an unterminated value")
+
+
+def _as_set(value) -> Optional[set]:
+    if value is None:
+        return None
+    if isinstance(value, str) or not isinstance(value, Iterable):
+        value = [value]
+    return {getattr(v, "value", v) for v in value}
+
+
+def iter_test_cases(source: Union[str, IO[str]], result=None, status=None, limit: Optional[int] = None,
+                    chunk_size: int = 1 << 20) -> Iterator[ResultCase]:
+    """
+    Yield the validated test cases of a TestReport / TestResultsSummary JSON file, in document order.
+
+    `result` and `status` filter on one value or a collection of values
+    (ResultType / TestStatus or their strings) before any validation is done.
+    Stop iterating (or pass `limit`) to stop reading the file.
+    """
+    results, statuses = _as_set(result), _as_set(status)
+    f = open(source, "r", encoding="utf-8") if isinstance(source, str) else source
+    try:
+        scanner = ResultScanner()
+        found = 0
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            for path, raw, fields in scanner.feed(chunk):
+                # Filters look at the scanned strings, so skipped cases are never parsed
+                if results is not None and fields.get("result") not in results:
+                    continue
+                if statuses is not None and fields.get("status") not in statuses:
+                    continue
+                yield ResultCase(path, TestCase.model_validate_json(raw))
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        scanner.finish()
+    finally:
+        if f is not source:
+            f.close()
+
+
+if __name__ == "__main__":
+    # python -m modules.report_reader [cases]
+    import os
+    import sys
+    import time
+    import datetime
+    import tempfile
+    import tracemalloc
+
+    from modules.report_writer import StreamingReportWriter
+    from modules.test_report import TestReport
+    from modules.test_metadata import TestMetadata, TestType
+    from modules.test_specification import TestSpecification
+
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    report = TestReport(
+        testMetadata=TestMetadata(startDate=datetime.datetime(2025, 1, 1), dutName="Energy saving rApp",
+                                  testType=TestType.FUNCTIONAL),
+        testSpecifications=[TestSpecification(expectationVerb="EXPECT", expectationObject=[{"objectType": "RAN_SUBNETWORK"}],
+                                              expectationTargets=[{"targetName": "DRB.UEThpDl",
+                                                                   "targetCondition": "IS_GREATER_THAN",
+                                                                   "targetValueRange": [10]}])],
+    )
+
+    def make_case(number: str, i: int) -> TestCase:
+        return TestCase(
+            number=number, name=f"Soak sample {i}", description='Throughput per sample, "quoted" {braces} [and] \\ too.',
+            result="FAIL" if i % 1000 == 999 else "PASS", status="mandatory",
+            metrics=[{"description": "DRB.UEThpDl above target", "status": "mandatory", "result": "PASS",
+                      "measurements": [{"name": "DRB.UEThpDl", "units": "Mbps",
+                                        "values": [(i + k) % 97 * 1.5 for k in range(50)]}]}],
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.json")
+        with open(path, "wb") as f, StreamingReportWriter(f, report) as writer:
+            for g in range(0, n_cases, 1000):
+                with writer.group(f"{g // 1000 + 1}", f"Hour {g // 1000}"):
+                    with writer.group(f"{g // 1000 + 1}.1", "Samples"):
+                        for i in range(g, min(g + 1000, n_cases)):
+                            writer.write_case(make_case(f"{g // 1000 + 1}.1.{i - g + 1}", i))
+        print(f"{n_cases} cases, {os.path.getsize(path) / 1e6:.0f} MB")
+
+        start = time.perf_counter()
+        first = next(iter_test_cases(path))
+        print(f"time to first case: {(time.perf_counter() - start) * 1000:.1f} ms -> {first.path} {first.case.number}")
+
+        start = time.perf_counter()
+        failed = list(iter_test_cases(path, result="FAIL"))
+        print(f"streamed scan for FAIL: {len(failed)} cases in {time.perf_counter() - start:.2f}s")
+        assert all(c.case.number.startswith(c.path[-1] + ".") for c in failed)
+
+        tracemalloc.start()
+        for _ in iter_test_cases(path):
+            pass
+        print(f"streamed read of every case: {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB peak heap")
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        with open(path) as f:
+            whole = TestReport.model_validate_json(f.read())
+        print(f"model_validate_json of the whole file: {time.perf_counter() - start:.2f}s")
+        del whole
+
+        tracemalloc.start()
+        with open(path) as f:
+            whole = TestReport.model_validate_json(f.read())
+        print(f"model_validate_json of the whole file: {tracemalloc.get_traced_memory()[1] / 1e6:.0f} MB peak heap")
+        tracemalloc.stop()
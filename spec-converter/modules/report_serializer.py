@@ -0,0 +1,191 @@
+import gzip
+import json
+import weakref
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+CONTENT_TYPES = {
+    "json": "application/json",         # compact model_dump_json(exclude_none=True)
+    "json-indent": "application/json",  # indent=2, for people rather than the wire
+    "orjson": "application/json",       # same document as "json", encoded by orjson
+    "msgpack": "application/msgpack",
+}
+COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def encode_report(report: BaseModel, encoding: str = "json") -> bytes:
+    """Serialize a report (exclude_none) without any caching."""
+    if encoding == "json":
+        return report.model_dump_json(exclude_none=True).encode()
+    if encoding == "json-indent":
+        return report.model_dump_json(indent=2, exclude_none=True).encode()
+    if encoding == "orjson":
+        if orjson is None:
+            raise RuntimeError("encoding 'orjson' needs the orjson package")
+        return orjson.dumps(report.model_dump(mode="json", exclude_none=True))
+    if encoding == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("encoding 'msgpack' needs the msgpack package")
+        return msgpack.packb(report.model_dump(mode="json", exclude_none=True))
+    raise ValueError(f"Unknown report encoding {encoding!r}, expected one of {list(CONTENT_TYPES)}")
+
+
+def compress(data: bytes, compression: Optional[str], level: Optional[int] = None) -> bytes:
+    if compression is None:
+        return data
+    if compression == "gzip":
+        # mtime=0 keeps the body identical across runs, so it is cacheable downstream
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("compression 'zstd' needs the zstandard package")
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+
+
+class ReportSerializer:
+    """
+    Encodes reports for upload and printing, caching the bytes of frozen reports.
+
+    Caching is opt-in: a report is only encoded once per (revision, encoding,
+    compression) while it has a `cache_token`, which TestReport.freeze() sets
+    and the next field assignment or touch() clears. Reports that are still
+    being built, in place or not, are encoded on each call. Entries go away
+    with the report they belong to.
+    """
+
+    def __init__(self, gzip_level: int = 6, zstd_level: int = 3):
+        self.levels = {"gzip": gzip_level, "zstd": zstd_level}
+        self._cache: Dict[int, Tuple[weakref.ref, int, Dict[Tuple[str, Optional[str]], bytes]]] = {}
+        self.stats = {"hits": 0, "encodes": 0}
+
+    def _entries(self, report: BaseModel) -> Optional[Dict[Tuple[str, Optional[str]], bytes]]:
+        revision = getattr(report, "cache_token", None)
+        if revision is None:
+            return None
+        key = id(report)
+        cached = self._cache.get(key)
+        if cached is None or cached[0]() is not report or cached[1] != revision:
+            ref = weakref.ref(report, lambda _, key=key: self._cache.pop(key, None))
+            cached = (ref, revision, {})
+            self._cache[key] = cached
+        return cached[2]
+
+    def encode(self, report: BaseModel, encoding: str = "json", compression: Optional[str] = None,
+               cached: bool = True) -> bytes:
+        """Encoded report; cached=False always encodes the current content (and leaves the cache alone)."""
+        entries = self._entries(report) if cached else None
+        if entries is not None and (encoding, compression) in entries:
+            self.stats["hits"] += 1
+            return entries[(encoding, compression)]
+        if compression is None:
+            data = encode_report(report, encoding)
+            self.stats["encodes"] += 1
+        else:
+            data = compress(self.encode(report, encoding, cached=cached), compression, self.levels[compression])
+        if entries is not None:
+            entries[(encoding, compression)] = data
+        return data
+
+    def body(self, report: BaseModel, encoding: str = "json", compression: Optional[str] = None,
+             cached: bool = True) -> Tuple[bytes, Dict[str, str]]:
+        """Request body and its Content-Type / Content-Encoding headers."""
+        return self.encode(report, encoding, compression, cached), self.headers(encoding, compression)
+
+    @staticmethod
+    def headers(encoding: str = "json", compression: Optional[str] = None) -> Dict[str, str]:
+        """Content-Type / Content-Encoding headers of a body."""
+        headers = {"Content-Type": CONTENT_TYPES.get(encoding, "application/octet-stream")}
+        if compression is not None:
+            headers["Content-Encoding"] = compression
+        return headers
+
+    def text(self, report: BaseModel, indent: bool = True) -> str:
+        """The report as a str for printing and logs."""
+        return self.encode(report, "json-indent" if indent else "json").decode()
+
+
+_default = ReportSerializer()
+
+
+def get_report_serializer() -> ReportSerializer:
+    return _default
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m modules.report_serializer [test_cases]
+    import sys
+    import time
+    import datetime
+
+    from modules.test_report import TestReport
+    from modules.test_metadata import TestMetadata, TestType
+    from modules.test_specification import TestSpecification
+    from modules.test_result import TestCase
+
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    cases = [
+        TestCase(
+            number=f"1.{i}", name=f"Energy saving check {i}", description="Cell power under the target.",
+            result="PASS" if i % 7 else "FAIL", status="mandatory",
+            startDate=datetime.datetime(2025, 1, 1, 0, 0, i % 60),
+            metrics=[{
+                "description": "PEE.AvgPower within range", "status": "mandatory", "result": "PASS",
+                "measurements": [{"name": "PEE.AvgPower", "units": "W",
+                                  "values": [round(20 + (i * k) % 13 * 0.37, 3) for k in range(20)]}],
+            }],
+        )
+        for i in range(n_cases)
+    ]
+    report = TestReport(
+        testMetadata=TestMetadata(startDate=datetime.datetime(2025, 1, 1), dutName="Energy saving rApp",
+                                  testType=TestType.FUNCTIONAL),
+        testSpecifications=[TestSpecification(expectationVerb="EXPECT", expectationObject=[{"objectType": "RAN_SUBNETWORK"}],
+                                              expectationTargets=[{"targetName": "PEE.AvgPower",
+                                                                   "targetCondition": "IS_LESS_THAN",
+                                                                   "targetValueRange": [20]}])],
+        testResults=cases,
+    )
+    report.freeze()
+    print(f"report with {n_cases} test cases")
+
+    available = ["json-indent", "json"] + (["orjson"] if orjson else []) + (["msgpack"] if msgpack else [])
+    compressions = [None, "gzip"] + (["zstd"] if zstandard else [])
+    for encoding in available:
+        for compression in compressions:
+            serializer = ReportSerializer()
+            start = time.perf_counter()
+            data = serializer.encode(report, encoding, compression)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            serializer.encode(report, encoding, compression)
+            warm = time.perf_counter() - start
+            print(f"{encoding:12} {str(compression):5}  {len(data) / 1e6:7.2f} MB  "
+                  f"encode {cold * 1000:7.1f} ms  cached {warm * 1e6:5.1f} us")
+    missing = [name for name, mod in (("orjson", orjson), ("msgpack", msgpack), ("zstd", zstandard)) if mod is None]
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+
+    serializer = ReportSerializer()
+    serializer.encode(report)
+    report.notes = "changed"
+    assert json.loads(serializer.encode(report))["notes"] == "changed", "assignment must end the freeze"
+    # Not frozen again: in-place edits are picked up without touch()
+    report.testResults[0].name = "edited in place"
+    assert json.loads(serializer.encode(report))["testResults"][0]["name"] == "edited in place", "stale bytes"
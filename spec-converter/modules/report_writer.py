@@ -0,0 +1,206 @@
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from modules.test_report import TestReport
+from modules.test_result import TestCase, TestGroup
+
+_PLACEHOLDER_CASE = TestCase.model_construct(number="0", name="", description="", result="SKIP",
+                                             status="optional", metrics=[])
+
+
+def _split_list_field(model: BaseModel, field: str) -> Tuple[bytes, bytes]:
+    """Compact JSON of `model` around its (empty) list `field`: text up to and including '[', and from ']'."""
+    data = model.model_dump_json(exclude_none=True).encode()
+    marker = f'"{field}":[]'.encode()
+    # The last match is the field itself: string values have their quotes escaped,
+    # and every field after it is a plain scalar
+    at = data.rfind(marker)
+    if at < 0:
+        raise ValueError(f"{type(model).__name__} JSON has no {field!r} list")
+    split = at + len(marker) - 1
+    return data[:split], data[split:]
+
+
+class StreamingReportWriter:
+    """
+    Writes a TestReport document with test results streamed in as they are produced.
+
+    The bytes are identical to `report.model_dump_json(exclude_none=True)` for
+    the same tree of results, but only the case being written is held in
+    memory. `out` is a binary file, or a socket (anything with sendall).
+
+        with open("report.json", "wb") as f, StreamingReportWriter(f, report) as writer:
+            with writer.group("1", "Soak test"):
+                for case in cases():
+                    writer.write_case(case)
+
+    Whatever `report.testResults` holds is ignored; a report with no results
+    written ends up with "testResults":[].
+    """
+
+    def __init__(self, out, report: TestReport, buffer_size: int = 1 << 16):
+        self._send = out.sendall if hasattr(out, "sendall") else out.write
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self.buffer_size = buffer_size
+        head, self._tail = _split_list_field(report.model_copy(update={"testResults": []}), "testResults")
+        self._write(head)
+        # One entry per open list: whether it already holds an item, and its closing bytes
+        self._open: List[List[Union[bool, bytes]]] = [[False, self._tail]]
+        self.cases_written = 0
+        self.bytes_written = 0
+
+    def _write(self, data: bytes):
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            data = b"".join(self._buffer)
+            self._send(data)
+            self.bytes_written += len(data)
+            self._buffer.clear()
+            self._buffered = 0
+
+    def _item(self, data: bytes):
+        if not self._open:
+            raise RuntimeError("report is already closed")
+        current = self._open[-1]
+        if current[0]:
+            self._write(b",")
+        current[0] = True
+        self._write(data)
+
+    def write_case(self, case: TestCase):
+        """Append a test case to the innermost open group (or to testResults)."""
+        self._item(case.model_dump_json(exclude_none=True).encode())
+        self.cases_written += 1
+
+    def write_group(self, group: TestGroup):
+        """Append a group that is already complete in memory."""
+        self._item(group.model_dump_json(exclude_none=True).encode())
+
+    @contextmanager
+    def group(self, number: str, name: str, description: Optional[str] = None):
+        """Open a TestGroup; cases written inside the block become its groupItems."""
+        # Validate the header fields with a stand-in item, then dump it with no items
+        header = TestGroup(number=number, name=name, description=description, groupItems=[_PLACEHOLDER_CASE])
+        head, tail = _split_list_field(header.model_copy(update={"groupItems": []}), "groupItems")
+        self._item(head)
+        current = [False, tail]
+        self._open.append(current)
+        completed = False
+        try:
+            yield self
+            completed = True
+        finally:
+            self._open.pop()
+            self._write(tail)
+        if completed and not current[0]:
+            raise ValueError(f"test group {number} has no items (groupItems needs at least one)")
+
+    def close(self):
+        """Finish the document; groups must already be closed."""
+        if len(self._open) > 1:
+            raise RuntimeError(f"{len(self._open) - 1} test group(s) still open")
+        if self._open:
+            self._open.pop()
+            self._write(self._tail)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.flush()
+
+
+if __name__ == "__main__":
+    # python -m modules.report_writer [cases] [values_per_case]
+    import io
+    import os
+    import sys
+    import time
+    import datetime
+    import tempfile
+    import tracemalloc
+
+    from modules.test_metadata import TestMetadata, TestType
+    from modules.test_specification import TestSpecification
+
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_values = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    def make_case(i: int) -> TestCase:
+        return TestCase(
+            number=f"1.{i // 1000}.{i % 1000}", name=f"Soak sample {i}", description="Throughput per sample.",
+            result="PASS", status="mandatory",
+            metrics=[{"description": "DRB.UEThpDl above target", "status": "mandatory", "result": "PASS",
+                      "measurements": [{"name": "DRB.UEThpDl", "units": "Mbps",
+                                        "values": [(i + k) % 97 * 1.5 for k in range(n_values)]}]}],
+        )
+
+    report = TestReport(
+        testMetadata=TestMetadata(startDate=datetime.datetime(2025, 1, 1), dutName="Energy saving rApp",
+                                  testType=TestType.FUNCTIONAL),
+        testSpecifications=[TestSpecification(expectationVerb="EXPECT", expectationObject=[{"objectType": "RAN_SUBNETWORK"}],
+                                              expectationTargets=[{"targetName": "DRB.UEThpDl",
+                                                                   "targetCondition": "IS_GREATER_THAN",
+                                                                   "targetValueRange": [10]}])],
+        notes="streamed",
+    )
+
+    def write_streamed(out, n):
+        with StreamingReportWriter(out, report) as writer:
+            with writer.group("1", "Soak test", "One case per sample"):
+                for g in range(0, n, 1000):
+                    with writer.group(f"1.{g // 1000}", f"Hour {g // 1000}"):
+                        for i in range(g, min(g + 1000, n)):
+                            writer.write_case(make_case(i))
+            writer.write_case(make_case(n))
+        return writer
+
+    # Byte-identical to the in-memory path on a small tree
+    n_check = 2_500
+    buf = io.BytesIO()
+    write_streamed(buf, n_check)
+    in_memory = report.model_copy(update={"testResults": [
+        TestGroup(number="1", name="Soak test", description="One case per sample", groupItems=[
+            TestGroup(number=f"1.{g // 1000}", name=f"Hour {g // 1000}",
+                      groupItems=[make_case(i) for i in range(g, min(g + 1000, n_check))])
+            for g in range(0, n_check, 1000)
+        ]),
+        make_case(n_check),
+    ]})
+    assert buf.getvalue() == in_memory.model_dump_json(exclude_none=True).encode(), "streamed bytes differ"
+    print(f"{n_check} cases: streamed bytes identical to model_dump_json")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.json")
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, "wb") as f:
+            writer = write_streamed(f, n_cases)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"streamed {writer.cases_written} cases x {n_values} values: {os.path.getsize(path) / 1e6:.0f} MB "
+              f"in {elapsed:.1f}s, {peak / 1e6:.1f} MB peak heap")
+
+    n_mem = min(n_cases, 20_000)
+    tracemalloc.start()
+    start = time.perf_counter()
+    cases = [make_case(i) for i in range(n_mem)]
+    data = report.model_copy(update={"testResults": cases}).model_dump_json(exclude_none=True)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"in memory {n_mem} cases: {len(data) / 1e6:.0f} MB in {elapsed:.1f}s, {peak / 1e6:.0f} MB peak heap "
+          f"(~{peak / n_mem * n_cases / 1e9:.1f} GB at {n_cases} cases)")
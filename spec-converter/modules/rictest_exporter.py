@@ -0,0 +1,234 @@
+import io
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from modules.configuration import ConfigurationParameters
+
+# RICTest cellsConfig key -> ConfigurationParameters field, in the order of
+# third/rictest_config.json, and the template's value when the field is unset
+CELL_FIELDS = {
+    "Configured Tx Power": "totalTransmitPowerIntoAntenna",
+    "Height": "height",
+    "Azimuth": "azimuth",
+    "Tilt": "tilt",
+    "Advanced traffic model": "tddDlUlRatio",
+}
+CELL_DEFAULTS = {"Configured Tx Power": 0, "Height": 0, "Azimuth": 0, "Tilt": 0, "Advanced traffic model": ""}
+
+_EMPTY = np.empty((0, 3), dtype=np.float64)
+
+
+def coordinate_array(geo) -> np.ndarray:
+    """(n, 3) lat/lon/alt array from a CoordinatePoints, (Mapped)GeoLocationGroup, GeoCoordinates list or array."""
+    if geo is None or isinstance(geo, str):
+        return _EMPTY  # geoLocGrp may also be a plain group identifier
+    if isinstance(geo, np.ndarray):
+        return geo
+    if hasattr(geo, "array"):
+        return geo.array
+    points = getattr(geo, "geoLocGrp", geo)
+    if hasattr(points, "array"):
+        return points.array
+    if not points:
+        return _EMPTY
+    rows = [(p["latitude"], p["longitude"], p.get("altitude")) if isinstance(p, dict)
+            else (p.latitude, p.longitude, p.altitude) for p in points]
+    return np.array(rows, dtype=np.float64)  # a None altitude becomes NaN
+
+
+def _value(params: ConfigurationParameters, key: str):
+    value = getattr(params, CELL_FIELDS[key], None)
+    value = getattr(value, "value", value)
+    return CELL_DEFAULTS[key] if value is None else value
+
+
+def cell_type_header(params: ConfigurationParameters, n_cells: int) -> Dict[str, Any]:
+    """The Cell_Config fields of one cell type, without its cellsConfig."""
+    bands = params.band5G or []
+    return {
+        "Cell Type Name": getattr(params.deploymentScale, "value", params.deploymentScale) or "",
+        "Number of Cells": n_cells,
+        "band5G": getattr(bands[0], "value", bands[0]) if bands else "",
+    }
+
+
+def _cell_rows(params: ConfigurationParameters, coordinates: np.ndarray, n_cells: int, chunk_rows: int):
+    """cellsConfig objects as JSON text, `chunk_rows` cells per yielded chunk."""
+    # The template fields are the same for every cell of a type: encode them once
+    constant = json.dumps({key: _value(params, key) for key in CELL_FIELDS}, separators=(",", ":"),
+                          ensure_ascii=False)[:-1]
+    located = min(n_cells, len(coordinates))
+    unplaced = constant + "}"
+    if located:
+        # The field values are user text and may contain "%": escape them before adding the format spec
+        template = constant.replace("%", "%%")
+        points = coordinates[:located]
+        # repr() of nan/inf is not JSON: such cells lose their location (or just their altitude)
+        altitude = ~np.isfinite(points[:, 2])
+        bad = ~np.isfinite(points[:, :2]).all(axis=1)
+        # repr() is what json.dumps writes for a float, so coordinates round-trip exactly
+        with_alt = template + ',"Latitude":%r,"Longitude":%r,"Altitude":%r}'
+        without_alt = template + ',"Latitude":%r,"Longitude":%r}'
+        for start in range(0, located, chunk_rows):
+            block = points[start:start + chunk_rows]
+            missing = altitude[start:start + chunk_rows]
+            unusable = bad[start:start + chunk_rows]
+            if unusable.any():
+                yield ",".join(unplaced if no_loc else (without_alt % (lat, lon)) if no_alt else
+                               (with_alt % (lat, lon, alt)) for (lat, lon, alt), no_alt, no_loc
+                               in zip(block.tolist(), missing.tolist(), unusable.tolist()))
+            elif not missing.any():
+                yield ",".join(map(with_alt.__mod__, map(tuple, block.tolist())))
+            elif missing.all():
+                yield ",".join(map(without_alt.__mod__, map(tuple, block[:, :2].tolist())))
+            else:
+                yield ",".join((without_alt % (lat, lon)) if no_alt else (with_alt % (lat, lon, alt))
+                               for (lat, lon, alt), no_alt in zip(block.tolist(), missing.tolist()))
+    if n_cells > located:
+        for start in range(located, n_cells, chunk_rows):
+            yield ",".join([unplaced] * (min(chunk_rows, n_cells - start)))
+
+
+def write_rictest_config(params_list: Sequence[ConfigurationParameters], out: Union[str, Path, BinaryIO],
+                         coordinates: Optional[Sequence[Any]] = None, chunk_rows: int = 50_000) -> Dict[str, int]:
+    """
+    Stream a RICTest config with one Cell_Config entry per ConfigurationParameters to a path or binary file.
+
+    Each entry gets one cellsConfig object per cell: numberOfCells cells (or
+    one per coordinate when it is unset), placed at the coordinates of the
+    parameters' geoLocGrp, or of coordinates[i] when given (a NaN/inf latitude
+    or longitude leaves the cell without a location, a non-finite altitude is
+    omitted, so the output is always valid JSON). The cell fields
+    are JSON-encoded once per cell type and the coordinates are formatted
+    straight from the (n, 3) array in chunks, so no per-cell dict or model is
+    built and memory stays at one chunk. A path is written atomically.
+    """
+    if isinstance(out, (str, Path)):
+        path = Path(out)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                stats = write_rictest_config(params_list, f, coordinates, chunk_rows)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return stats
+
+    stats = {"cell_types": 0, "cells": 0, "unplaced_cells": 0, "bytes": 0}
+
+    def write(text: str):
+        data = text.encode()
+        out.write(data)
+        stats["bytes"] += len(data)
+
+    write('{"Cell_Config":[')
+    for i, params in enumerate(params_list):
+        points = coordinate_array(coordinates[i] if coordinates is not None else params.geoLocGrp)
+        n_cells = params.numberOfCells if params.numberOfCells is not None else len(points)
+        if n_cells > len(points):
+            logging.warning(f"Cell type {i} ({params.deploymentScale}): {n_cells} cells but "
+                            f"{len(points)} coordinates, {n_cells - len(points)} cells written without a location")
+            stats["unplaced_cells"] += n_cells - len(points)
+        non_finite = int((~np.isfinite(points[:n_cells, :2]).all(axis=1)).sum()) if len(points) else 0
+        if non_finite:
+            logging.warning(f"Cell type {i} ({params.deploymentScale}): {non_finite} coordinates with a "
+                            f"non-finite latitude/longitude, those cells written without a location")
+            stats["unplaced_cells"] += non_finite
+        header = json.dumps(cell_type_header(params, n_cells), separators=(",", ":"), ensure_ascii=False)
+        write(("," if i else "") + header[:-1] + ',"cellsConfig":[')
+        first = True
+        for chunk in _cell_rows(params, points, n_cells, chunk_rows):
+            write(chunk if first else "," + chunk)
+            first = False
+        write("]}")
+        stats["cell_types"] += 1
+        stats["cells"] += n_cells
+    write("]}")
+    return stats
+
+
+def rictest_config(params_list: Sequence[ConfigurationParameters],
+                   coordinates: Optional[Sequence[Any]] = None) -> Dict[str, List[dict]]:
+    """The RICTest config as a dict, for small layouts (same content as write_rictest_config)."""
+    buffer = io.BytesIO()
+    write_rictest_config(params_list, buffer, coordinates)
+    return json.loads(buffer.getvalue())
+
+
+if __name__ == "__main__":
+    # python -m modules.rictest_exporter [cells_per_type]
+    import sys
+    import time
+    import tempfile
+
+    from modules.coordinate_store import CoordinatePoints
+
+    n_per_type = int(sys.argv[1]) if len(sys.argv) > 1 else 34_000
+    rng = np.random.default_rng(0)
+
+    def layout(n):
+        points = np.column_stack([rng.uniform(24.0, 25.0, n), rng.uniform(121.0, 122.0, n), rng.uniform(5, 60, n)])
+        points[::7, 2] = np.nan  # some cells without a surveyed altitude
+        return CoordinatePoints(points)
+
+    params_list = [
+        ConfigurationParameters(deploymentScale=scale, numberOfCells=n_per_type, band5G=[band],
+                                totalTransmitPowerIntoAntenna=power, height=height, azimuth=120, tilt=6,
+                                tddDlUlRatio="7:3")
+        for scale, band, power, height in (("macro", "n78", 46.0, 30), ("micro", "n79", 37.5, 10),
+                                            ("pico", "n41", 24.0, 4))
+    ]
+    for params in params_list:
+        # As in config_mapper: the shared coordinate array is assigned after validation
+        params.geoLocGrp = layout(n_per_type)
+
+    def naive(params_list):
+        # Hand-built dicts, the way the old rictest_format filled the template
+        config = {"Cell_Config": []}
+        for params in params_list:
+            cells = []
+            for p in params.geoLocGrp:
+                cell = {key: _value(params, key) for key in CELL_FIELDS}
+                cell.update({"Latitude": p.latitude, "Longitude": p.longitude})
+                if p.altitude is not None:
+                    cell["Altitude"] = p.altitude
+                cells.append(cell)
+            config["Cell_Config"].append({**cell_type_header(params, params.numberOfCells), "cellsConfig": cells})
+        return config
+
+    total = n_per_type * len(params_list)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        reference = naive(params_list)
+        with open(os.path.join(tmp, "naive.json"), "w") as f:
+            json.dump(reference, f)
+        naive_s = time.perf_counter() - start
+
+        path = os.path.join(tmp, "rictest_config.json")
+        start = time.perf_counter()
+        stats = write_rictest_config(params_list, path)
+        elapsed = time.perf_counter() - start
+        with open(path, "rb") as f:
+            assert json.loads(f.read()) == reference, "streamed config differs from the hand-built one"
+        print(f"{total} cells in {len(params_list)} cell types: streamed {stats['bytes'] / 1e6:.1f} MB in "
+              f"{elapsed:.2f}s, hand-built dicts + json.dump {naive_s:.2f}s (same document)")
+
+    # Field text is data, never format spec
+    odd = ConfigurationParameters(deploymentScale="macro", numberOfCells=3, tddDlUlRatio="70%/30% %s %r")
+    odd.geoLocGrp = layout(2)
+    cells = rictest_config([odd])["Cell_Config"][0]["cellsConfig"]
+    assert [c["Advanced traffic model"] for c in cells] == ["70%/30% %s %r"] * 3, cells
+
+    # Non-finite coordinates never reach the output as bare nan/inf
+    odd.geoLocGrp = CoordinatePoints(np.array([[24.5, 121.5, np.inf], [np.nan, 121.0, 5.0], [24.0, np.inf, 1.0]]))
+    buffer = io.BytesIO()
+    stats = write_rictest_config([odd], buffer)
+    cells = json.loads(buffer.getvalue(), parse_constant=lambda c: 1 / 0)["Cell_Config"][0]["cellsConfig"]
+    assert [sorted(set(c) - set(CELL_FIELDS)) for c in cells] == [["Latitude", "Longitude"], [], []], cells
+    assert stats["unplaced_cells"] == 2, stats
@@ -0,0 +1,348 @@
+import re
+import json
+import math
+import difflib
+from enum import Enum
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union, get_args, get_origin
+
+from pydantic import ValidationError
+
+from modules.band_index import BAND_INDEXES
+from modules.configuration import ConfigurationParameters
+
+# Curated spec-table header -> ConfigurationParameters field, keys in normalize_header() form
+HEADER_FIELDS: Dict[str, str] = {
+    "deployment": "deploymentArchitecture",
+    "deployment architecture": "deploymentArchitecture",
+    "environment": "deploymentArchitecture",
+    "deployment scale": "deploymentScale",
+    "cell type": "deploymentScale",
+    "cell size": "deploymentScale",
+    "rf scenario": "deploymentRfScenario",
+    "deployment rf scenario": "deploymentRfScenario",
+    "propagation scenario": "deploymentRfScenario",
+    "frequency range": "frequencyRange5G",
+    "fr": "frequencyRange5G",
+    "band": "band5G",
+    "nr band": "band5G",
+    "5g band": "band5G",
+    "band5g": "band5G",
+    "operating band": "band5G",
+    "lte band": "bandLTE",
+    "e utra band": "bandLTE",
+    "arfcn": "nr_arfcn",
+    "nr arfcn": "nr_arfcn",
+    "e arfcn": "e_arfcn",
+    "earfcn": "e_arfcn",
+    "scs": "subCarrierSpacing",
+    "subcarrier spacing": "subCarrierSpacing",
+    "sub carrier spacing": "subCarrierSpacing",
+    "numerology": "subCarrierSpacing",
+    "bandwidth": "totalTransmissionBandwidth",
+    "channel bandwidth": "totalTransmissionBandwidth",
+    "carrier bandwidth": "totalTransmissionBandwidth",
+    "transmission bandwidth": "totalTransmissionBandwidth",
+    "bw": "totalTransmissionBandwidth",
+    "prb": "totalResourceBlocks",
+    "prbs": "totalResourceBlocks",
+    "number of prbs": "totalResourceBlocks",
+    "resource blocks": "totalResourceBlocks",
+    "cyclic prefix": "carrierPrefixLength",
+    "slot length": "slotLength",
+    "duplex": "duplexMode",
+    "duplex mode": "duplexMode",
+    "tdd pattern": "tddDlUlRatio",
+    "tdd ratio": "tddDlUlRatio",
+    "tdd dl ul ratio": "tddDlUlRatio",
+    "dl ul ratio": "tddDlUlRatio",
+    "ipv4": "ipv4",
+    "ipv6": "ipv6",
+    "mimo layers": "numMimoLayers",
+    "number of mimo layers": "numMimoLayers",
+    "tx antennas": "numTxAntenna",
+    "number of tx antennas": "numTxAntenna",
+    "rx antennas": "numRxAntenna",
+    "number of rx antennas": "numRxAntenna",
+    "antenna gain": "totalAntennaGain",
+    "tx power": "totalTransmitPowerIntoAntenna",
+    "transmit power": "totalTransmitPowerIntoAntenna",
+    "output power": "totalTransmitPowerIntoAntenna",
+    "configured tx power": "totalTransmitPowerIntoAntenna",
+    "total transmit power into antenna": "totalTransmitPowerIntoAntenna",
+    "number of cells": "numberOfCells",
+    "cells": "numberOfCells",
+    "azimuth": "azimuth",
+    "antenna azimuth": "azimuth",
+    "tilt": "tilt",
+    "antenna tilt": "tilt",
+    "downtilt": "tilt",
+    "height": "height",
+    "antenna height": "height",
+}
+
+# Column names of two-column "Parameter | Value" tables
+_NAME_COLUMNS = {"parameter", "parameters", "name", "item", "configuration parameter", "setting"}
+_VALUE_COLUMNS = {"value", "values", "setting", "configuration", "config", "default"}
+
+_UNIT_IN_HEADER = re.compile(r"\(([^)]*)\)|\[([^\]]*)\]")
+_NUMBER = re.compile(r"[-+]?\d+(?:[.,]\d+)?(?:[eE][-+]?\d+)?")
+
+# Scale factors into the unit each numeric field is stored in
+_BANDWIDTH_UNITS = {"hz": 1e-6, "khz": 1e-3, "mhz": 1.0, "ghz": 1e3}
+_HEIGHT_UNITS = {"m": 1.0, "cm": 0.01, "km": 1000.0, "ft": 0.3048}
+
+
+def normalize_header(header: str) -> str:
+    text = _UNIT_IN_HEADER.sub(" ", str(header))
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return " ".join(re.split(r"[^a-z0-9]+", text.lower())).strip()
+
+
+def _header_unit(header: str) -> Optional[str]:
+    match = _UNIT_IN_HEADER.search(str(header))
+    return (match.group(1) or match.group(2)).strip().lower() if match else None
+
+
+def _field_kind(annotation) -> Tuple[str, Optional[type]]:
+    """Reduce a ConfigurationParameters annotation to (kind, enum class)."""
+    args = [a for a in get_args(annotation) if a is not type(None)] if get_origin(annotation) is Union else [annotation]
+    inner = args[0]
+    if get_origin(inner) in (list, List):
+        item = get_args(inner)[0]
+        return ("enum_list", item) if isinstance(item, type) and issubclass(item, Enum) else ("list", None)
+    if isinstance(inner, type) and issubclass(inner, Enum):
+        return "enum", inner
+    if inner is bool:
+        return "bool", None
+    if inner is int:
+        return "int", None
+    if inner is float:
+        return "float", None
+    return "str", None
+
+
+FIELD_KINDS = {name: _field_kind(field.annotation) for name, field in ConfigurationParameters.model_fields.items()}
+
+
+def _parse_number(text: str) -> Optional[float]:
+    match = _NUMBER.search(text)
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def _unit_of(text: str, header_unit: Optional[str]) -> Optional[str]:
+    match = re.search(r"[-+]?\d+(?:[.,]\d+)?\s*([A-Za-z°%]+)", text)
+    unit = match.group(1) if match else header_unit
+    return unit.lower() if unit else None
+
+
+def _enum_value(enum_cls, text: str):
+    bands = BAND_INDEXES.get(enum_cls)
+    if bands is not None:
+        member = bands.resolve(text)
+        return member.value if member is not None else None
+    compact = re.sub(r"\s+", "", text).lower()
+    for member in enum_cls:
+        if member.value.lower() in (compact, text.strip().lower()):
+            return member.value
+    if enum_cls.__name__ == "SubCarrierSpacingEnum":
+        number = _parse_number(compact)
+        if number is not None and f"{int(number)}khz" in (m.value.lower() for m in enum_cls):
+            return f"{int(number)}kHz"
+    return None
+
+
+def convert_value(field: str, raw: Any, header_unit: Optional[str] = None):
+    """Convert a table cell to the type and unit of `field`; None when it cannot be understood."""
+    kind, enum_cls = FIELD_KINDS[field]
+    if raw is None:
+        return None
+    text = str(raw).strip()
+    if not text:
+        return None
+
+    if kind == "enum_list":
+        values = [_enum_value(enum_cls, part) for part in re.split(r"[,;/]|\band\b", text) if part.strip()]
+        return values if values and None not in values else None
+    if kind == "enum":
+        return _enum_value(enum_cls, text)
+    if kind == "bool":
+        lowered = text.lower()
+        if lowered in ("yes", "true", "enabled", "on", "1", "y"):
+            return True
+        if lowered in ("no", "false", "disabled", "off", "0", "n"):
+            return False
+        return None
+    if kind == "str":
+        return text
+
+    number = _parse_number(text)
+    if number is None:
+        return None
+    unit = _unit_of(text, header_unit)
+    if field == "totalTransmissionBandwidth" and unit in _BANDWIDTH_UNITS:
+        number *= _BANDWIDTH_UNITS[unit]
+    elif field == "totalTransmitPowerIntoAntenna" and unit in ("w", "mw"):
+        milliwatts = number * (1000.0 if unit == "w" else 1.0)
+        number = 10 * math.log10(milliwatts) if milliwatts > 0 else None
+    elif field == "height" and unit in _HEIGHT_UNITS:
+        number *= _HEIGHT_UNITS[unit]
+    if number is None:
+        return None
+    if kind == "int":
+        return int(round(number))
+    return number
+
+
+class RuleMapper:
+    """
+    Maps table rows to ConfigurationParameters locally when every column is a known header.
+
+    Headers are resolved through a curated dictionary (extendable by learning
+    from LLM answers and persisted to `dictionary_path`), falling back to fuzzy
+    matching against the known headers; every header decision is memoized so
+    repeated tables cost a couple of dict lookups per cell. Rows with a column
+    that cannot be resolved, or a value that cannot be converted, are handed
+    to the LLM.
+    """
+
+    def __init__(self, dictionary_path=None, fuzzy_cutoff: float = 0.85):
+        self.dictionary_path = Path(dictionary_path) if dictionary_path else None
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.headers: Dict[str, str] = dict(HEADER_FIELDS)
+        if self.dictionary_path and self.dictionary_path.exists():
+            with open(self.dictionary_path) as f:
+                self.headers.update(json.load(f))
+        self._resolved: Dict[str, Optional[str]] = {}
+        self.stats = {"local_rows": 0, "llm_rows": 0, "unmapped_rows": 0, "learned_headers": 0}
+
+    def resolve_header(self, header: str) -> Optional[str]:
+        if header in self._resolved:
+            return self._resolved[header]
+        key = normalize_header(header)
+        field = self.headers.get(key)
+        if field is None and key:
+            close = difflib.get_close_matches(key, self.headers.keys(), n=1, cutoff=self.fuzzy_cutoff)
+            field = self.headers[close[0]] if close else None
+        if field is None and key.replace(" ", "") in {f.lower() for f in FIELD_KINDS}:
+            field = next(f for f in FIELD_KINDS if f.lower() == key.replace(" ", ""))
+        self._resolved[header] = field
+        return field
+
+    def _cells(self, row: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        keys = list(row.keys())
+        if len(keys) == 2:
+            name_col = next((k for k in keys if normalize_header(k) in _NAME_COLUMNS), None)
+            value_col = next((k for k in keys if k != name_col and normalize_header(k) in _VALUE_COLUMNS), None)
+            if name_col and value_col:
+                return [(str(row[name_col]), row[value_col])]
+        return [(k, v) for k, v in row.items() if v not in (None, "")]
+
+    def map_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Local mapping of `row`, or None if any of its cells needs the LLM."""
+        mapped: Dict[str, Any] = {}
+        for header, raw in self._cells(row):
+            field = self.resolve_header(header)
+            if field is None:
+                return None
+            value = convert_value(field, raw, _header_unit(header))
+            if value is None:
+                return None
+            mapped[field] = value
+        if not mapped:
+            return None
+        try:
+            ConfigurationParameters.model_validate(mapped)
+        except ValidationError:
+            return None
+        return mapped
+
+    def learn(self, row: Dict[str, Any], mapped: Dict[str, Any]):
+        """
+        Record header -> field pairs from an LLM answer, only where the answer is unambiguous.
+
+        A header is learned when its cell is the only cell of the row whose
+        value matches the field's value, it matches no other field, no other
+        header of the row already resolves to that field and its own fuzzy
+        resolution (if any) agrees. Coincidences such as two columns that
+        both hold "4" therefore teach (and persist) nothing.
+        """
+        cells = self._cells(row)
+        fields = {}
+        for field, value in mapped.items():
+            field = "nr_arfcn" if field == "nr-arfcn" else "e_arfcn" if field == "e-arfcn" else field
+            if field in FIELD_KINDS and value is not None:
+                fields[field] = value
+        matches = [[f for f, v in fields.items() if convert_value(f, raw, _header_unit(header)) == v]
+                   for header, raw in cells]
+        cells_per_field = Counter(f for found in matches for f in found)
+        resolved = [self.resolve_header(header) for header, _ in cells]
+        for i, (header, raw) in enumerate(cells):
+            key = normalize_header(header)
+            if not key or key in self.headers or len(matches[i]) != 1:
+                continue
+            field = matches[i][0]
+            if cells_per_field[field] != 1 or field in resolved[:i] + resolved[i + 1:]:
+                continue
+            if resolved[i] is not None and resolved[i] != field:
+                continue  # conflicts with the alias the header already fuzzy-matches
+            self.headers[key] = field
+            self._resolved.pop(header, None)
+            self.stats["learned_headers"] += 1
+
+    def save(self):
+        if self.dictionary_path is None:
+            return
+        learned = {k: v for k, v in self.headers.items() if HEADER_FIELDS.get(k) != v}
+        with open(self.dictionary_path, "w") as f:
+            json.dump(learned, f, indent=2, sort_keys=True)
+
+    def map_rows(self, rows: List[Dict[str, Any]], json_schema=None, llm_mapper=None) -> List[Optional[Dict[str, Any]]]:
+        """Map rows locally where possible and send the rest to `llm_mapper` (if any) in one batch."""
+        results = [self.map_row(row) for row in rows]
+        escalate = [i for i, result in enumerate(results) if result is None]
+        self.stats["local_rows"] += len(rows) - len(escalate)
+        if not escalate:
+            return results
+        if llm_mapper is None:
+            self.stats["unmapped_rows"] += len(escalate)
+            return results
+
+        answers = llm_mapper.map_rows_sync([rows[i] for i in escalate], json_schema)
+        for i, answer in zip(escalate, answers):
+            results[i] = answer
+            if isinstance(answer, dict):
+                self.stats["llm_rows"] += 1
+                self.learn(rows[i], answer)
+            else:
+                self.stats["unmapped_rows"] += 1
+        return results
+
+    def report(self) -> str:
+        total = self.stats["local_rows"] + self.stats["llm_rows"] + self.stats["unmapped_rows"]
+        local_share = self.stats["local_rows"] / total if total else 0.0
+        return (f"rule mapping: {total} rows, {self.stats['local_rows']} mapped locally ({local_share:.0%}), "
+                f"{self.stats['llm_rows']} mapped by the LLM, {self.stats['unmapped_rows']} unmapped, "
+                f"{self.stats['learned_headers']} headers learned")
+
+
+if __name__ == "__main__":
+    import time
+
+    mapper = RuleMapper()
+    rows = [
+        {"Band": "N78", "SCS": "30 kHz", "Channel Bandwidth (MHz)": "100", "Duplex": "TDD"},
+        {"Parameter": "Tx Power", "Value": "20 W"},
+        {"Antenna Height": "25 m", "Antenna Azimuth": "120°", "Antenna Tilt": "6 deg"},
+        {"Beam sweeping periodicity": "20 ms"},
+    ]
+    for row, mapped in zip(rows, mapper.map_rows(rows)):
+        print(row, "->", mapped)
+    print(mapper.report())
+
+    start = time.perf_counter()
+    n = 100_000
+    for i in range(n):
+        mapper.map_row(rows[i % 3])
+    print(f"{(time.perf_counter() - start) / n * 1e6:.1f} us per row")
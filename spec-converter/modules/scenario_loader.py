@@ -0,0 +1,230 @@
+import gc
+from enum import Enum
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Type, Union, get_args, get_origin
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pydantic import BaseModel, TypeAdapter
+
+from modules.band_index import BAND_INDEXES
+from modules.configuration import ConfigurationParameters
+from modules.test_metadata import AdditionalContext, UEContext
+
+# Scenario CSV column (after camel-casing) -> model field, where the two differ
+CELL_COLUMN_FIELDS = {
+    "antennaAzimuth": "azimuth",
+    "antennaTilt": "tilt",
+    "antennaHeight": "height",
+}
+
+# The fields the scenario rows have always set; any other column that happens to match a
+# model field name is left alone rather than validated into the model
+CELL_SCENARIO_FIELDS = ("azimuth", "tilt", "height", "numberOfCells", "deploymentScale", "band5G", "tddDlUlRatio",
+                        "totalTransmitPowerIntoAntenna")
+UE_SCENARIO_FIELDS = ("numberOfUE", "location", "targetThroughput", "slice", "qosId", "mobilityModel",
+                      "mobilitySpeed")
+
+_config_list = TypeAdapter(List[ConfigurationParameters])
+_ue_list = TypeAdapter(List[UEContext])
+
+
+@lru_cache(maxsize=None)
+def camel_case_header(col: str) -> str:
+    """'Number of  cells ' -> 'numberOfCells', the scenario CSV header convention."""
+    trimmed_col = col.strip()
+    l = trimmed_col.split(' ')
+    l[1:] = [x.capitalize() for x in l[1:]]
+    l = ''.join(l)
+    return l[0].lower() + l[1:]
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) is Union:
+        return next(a for a in get_args(annotation) if a is not type(None))
+    return annotation
+
+
+def _is_list(annotation) -> bool:
+    return get_origin(_unwrap_optional(annotation)) in (list, List)
+
+
+def _scalar_type(annotation):
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) in (list, List):
+        annotation = get_args(annotation)[0]
+    return annotation
+
+
+@lru_cache(maxsize=None)
+def model_dtypes(model: Type[BaseModel], column_fields: tuple = ()) -> Dict[str, object]:
+    """pandas dtypes for the CSV columns of `model`, keyed by camel-cased column name."""
+    renames = {field: column for column, field in column_fields}
+    dtypes = {}
+    for name, field in model.model_fields.items():
+        scalar = _scalar_type(field.annotation)
+        # Integers are read as float so that blanks survive until dropna
+        if scalar in (int, float):
+            dtype = "float64"
+        elif isinstance(scalar, type) and issubclass(scalar, Enum):
+            dtype = "category"
+        elif scalar is bool:
+            dtype = "boolean"
+        else:
+            dtype = "string"
+        dtypes[renames.get(name, name)] = dtype
+        if field.alias:
+            dtypes[renames.get(field.alias, field.alias)] = dtype
+    return dtypes
+
+
+def _read_options(path, model: Optional[Type[BaseModel]], column_fields: Dict[str, str]):
+    raw_columns = pd.read_csv(path, nrows=0).columns
+    columns = [camel_case_header(c) for c in raw_columns]
+    dtype = None
+    if model is not None:
+        wanted = model_dtypes(model, tuple(sorted(column_fields.items())))
+        # "Number of UE" camel-cases to numberOfUe; snap such columns to the field name
+        by_lower = {name.lower(): name for name in wanted}
+        columns = [col if col in wanted else by_lower.get(col.lower(), col) for col in columns]
+        dtype = {raw: wanted[col] for raw, col in zip(raw_columns, columns) if col in wanted}
+    return columns, dtype
+
+
+def _finish_frame(df: DataFrame, columns: List[str]) -> DataFrame:
+    df.columns = columns
+    return df.dropna()
+
+
+def load_scenario_csv(path, model: Optional[Type[BaseModel]] = None,
+                      column_fields: Optional[Dict[str, str]] = None) -> DataFrame:
+    """
+    Read a scenario CSV with camel-cased headers and rows with blanks dropped.
+
+    When `model` is given, its field types decide the column dtypes up front
+    (numbers as float64, enums as category, text as string) instead of letting
+    pandas infer object columns.
+    """
+    columns, dtype = _read_options(path, model, column_fields or {})
+    return _finish_frame(pd.read_csv(path, dtype=dtype), columns)
+
+
+def iter_scenario_csv(path, chunksize: int, model: Optional[Type[BaseModel]] = None,
+                      column_fields: Optional[Dict[str, str]] = None) -> Iterator[DataFrame]:
+    """load_scenario_csv for very large files, `chunksize` rows at a time."""
+    columns, dtype = _read_options(path, model, column_fields or {})
+    with pd.read_csv(path, dtype=dtype, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _finish_frame(chunk, columns)
+
+
+def _records(df: DataFrame, model: Type[BaseModel], column_fields: Dict[str, str],
+             mapped_fields: Sequence[str]) -> List[dict]:
+    df = df.rename(columns=column_fields)
+    fields = [c for c in df.columns if c in mapped_fields and c in model.model_fields]
+    data = {}
+    for name in fields:
+        column = df[name]
+        annotation = model.model_fields[name].annotation
+        scalar = _scalar_type(annotation)
+        if scalar in BAND_INDEXES:
+            # "N78", "Band 78", "3.5 GHz" -> "n78"; anything else is left for validation to report
+            column = BAND_INDEXES[scalar].resolve_series(column, keep_unresolved=True)
+        if _is_list(annotation):
+            # A single CSV cell becomes a one-element list, e.g. band5G
+            data[name] = [[v] for v in column.astype(str).tolist()]
+        elif scalar is int:
+            # Same truncation as int(value) on every row
+            data[name] = column.to_numpy(dtype="float64").astype(np.int64).tolist()
+        elif scalar is float:
+            data[name] = column.to_numpy(dtype="float64").tolist()
+        else:
+            data[name] = column.astype(object).tolist()
+    return [dict(zip(fields, values)) for values in zip(*(data[name] for name in fields))]
+
+
+@contextmanager
+def _gc_paused():
+    # Millions of freshly allocated models keep triggering full collections
+    # that find nothing to free; pausing gc roughly halves the build time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_configuration_parameters(df: DataFrame) -> List[ConfigurationParameters]:
+    """Validate every cell-scenario row into ConfigurationParameters in one pydantic call."""
+    with _gc_paused():
+        return _config_list.validate_python(_records(df, ConfigurationParameters, CELL_COLUMN_FIELDS,
+                                                     CELL_SCENARIO_FIELDS))
+
+
+def build_additional_context(df: DataFrame) -> List[AdditionalContext]:
+    """One AdditionalContext(ueContext=...) per ue-scenario row, validated in bulk."""
+    with _gc_paused():
+        ue_contexts = _ue_list.validate_python(_records(df, UEContext, {}, UE_SCENARIO_FIELDS))
+        return [AdditionalContext(ueContext=ue) for ue in ue_contexts]
+
+
+if __name__ == "__main__":
+    # Benchmark on a synthetic cell-scenario file:
+    #   python -m modules.scenario_loader [rows]
+    import os
+    import sys
+    import time
+    import tempfile
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    synthetic = pd.DataFrame({
+        "deployment Scale": rng.choice(["micro", "pico", "macro"], n_rows),
+        "antenna Azimuth": rng.integers(0, 360, n_rows),
+        "antenna Tilt": rng.integers(0, 15, n_rows),
+        "antenna Height": rng.integers(5, 60, n_rows),
+        "number Of Cells": rng.integers(1, 64, n_rows),
+        "band5G": rng.choice(["n77", "n78", "n79"], n_rows),
+        "tdd Dl Ul Ratio": rng.choice(["7:3", "8:2", "4:1"], n_rows),
+        "total Transmit Power Into Antenna": rng.integers(20, 46, n_rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cell-scenario.csv")
+        synthetic.to_csv(path, index=False)
+        print(f"{n_rows} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        df = load_scenario_csv(path, ConfigurationParameters, CELL_COLUMN_FIELDS)
+        read_s = time.perf_counter() - start
+        start = time.perf_counter()
+        params = build_configuration_parameters(df)
+        build_s = time.perf_counter() - start
+        print(f"typed read: {read_s:.2f}s, bulk build: {build_s:.2f}s, {len(params)} models")
+
+        start = time.perf_counter()
+        n_chunked = sum(len(build_configuration_parameters(chunk))
+                        for chunk in iter_scenario_csv(path, 100_000, ConfigurationParameters, CELL_COLUMN_FIELDS))
+        print(f"chunked read + build (100k rows/chunk): {time.perf_counter() - start:.2f}s, {n_chunked} models")
+
+        # The previous approach: object dtypes, then itertuples with per-field casts
+        start = time.perf_counter()
+        legacy = pd.read_csv(path).dropna()
+        legacy.columns = [camel_case_header(c) for c in legacy.columns]
+        legacy_params = []
+        for row in legacy.itertuples():
+            config_params = ConfigurationParameters()
+            config_params.azimuth = int(row.antennaAzimuth)
+            config_params.tilt = int(row.antennaTilt)
+            config_params.height = int(row.antennaHeight)
+            config_params.numberOfCells = int(row.numberOfCells)
+            config_params.deploymentScale = row.deploymentScale
+            config_params.band5G = [row.band5G]
+            config_params.tddDlUlRatio = row.tddDlUlRatio
+            config_params.totalTransmitPowerIntoAntenna = int(row.totalTransmitPowerIntoAntenna)
+            legacy_params.append(config_params)
+        print(f"legacy itertuples loop: {time.perf_counter() - start:.2f}s, {len(legacy_params)} models")
@@ -0,0 +1,194 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "to", "and", "or", "for", "is", "are", "be", "by", "on", "if",
+    "as", "at", "e", "g", "eg", "i", "per", "with", "this", "that", "used", "use", "value", "values",
+    "type", "object", "string", "indicates", "applicable",
+}
+
+# Abbreviations that show up in spec table headers, expanded to schema vocabulary
+_ABBREVIATIONS = {
+    "tx": ["transmit"], "rx": ["receive"], "bw": ["bandwidth"], "scs": ["sub", "carrier", "spacing"],
+    "freq": ["frequency"], "dl": ["downlink"], "ul": ["uplink"], "ant": ["antenna"],
+    "pwr": ["power"], "prb": ["resource", "blocks"], "rb": ["resource", "blocks"],
+    "fr": ["frequency", "range"], "nr": ["5g"], "lte": ["band"], "eirp": ["power"],
+    "subcarrier": ["sub", "carrier"], "cells": ["cell"],
+}
+
+
+def tokenize(text: Any) -> List[str]:
+    """Split camelCase / snake_case / free text into lower-case word tokens."""
+    tokens = []
+    for word in re.split(r"[^A-Za-z0-9]+", str(text)):
+        for part in _CAMEL.findall(word):
+            token = part.lower()
+            if token and token not in _STOPWORDS:
+                tokens.append(token)
+                tokens.extend(_ABBREVIATIONS.get(token, ()))
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt-token estimate (about four characters per token for English/JSON)."""
+    return (len(text) + 3) // 4
+
+
+class SchemaIndex:
+    """
+    Index of the leaf properties of a JSON schema, for selecting the ones a row refers to.
+
+    Every object `properties` entry in the schema (including those under
+    `$defs`) is indexed by the words of its name, its description and its enum
+    values, so a row like {"Band": "n78", "SCS": "30 kHz"} can be matched to
+    band5G and subCarrierSpacing without sending the whole schema.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.paths: List[Tuple[str, ...]] = []
+        self._name_index: Dict[str, Set[int]] = {}
+        self._text_index: Dict[str, Set[int]] = {}
+        self._enum_index: Dict[str, Set[int]] = {}
+        self._walk(schema, ())
+
+    def _add(self, index: Dict[str, Set[int]], tokens: Iterable[str], prop_id: int):
+        for token in tokens:
+            index.setdefault(token, set()).add(prop_id)
+
+    def _walk(self, node: Any, path: Tuple[str, ...]):
+        if not isinstance(node, dict):
+            return
+        for key, value in node.items():
+            if key == "properties" and isinstance(value, dict):
+                for name, prop in value.items():
+                    if not isinstance(prop, dict):
+                        continue  # e.g. a stray "required": [] inside properties
+                    prop_id = len(self.paths)
+                    self.paths.append(path + ("properties", name))
+                    self._add(self._name_index, tokenize(name), prop_id)
+                    self._add(self._text_index, tokenize(prop.get("description", "")), prop_id)
+                    enum = prop.get("enum") or (prop.get("items") or {}).get("enum") or []
+                    self._add(self._enum_index, (str(v).lower() for v in enum), prop_id)
+                    self._walk(prop, path + ("properties", name))
+            elif isinstance(value, dict):
+                self._walk(value, path + (key,))
+
+    def score(self, row: Dict[str, Any]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+
+        def bump(index, token, weight):
+            for prop_id in index.get(token, ()):
+                scores[prop_id] = scores.get(prop_id, 0.0) + weight
+
+        for key, value in row.items():
+            for token in set(tokenize(key)):
+                bump(self._name_index, token, 3.0)
+                bump(self._text_index, token, 1.0)
+            if isinstance(value, str):
+                bump(self._enum_index, value.strip().lower(), 3.0)
+                bump(self._enum_index, value.replace(" ", "").lower(), 3.0)
+                for token in set(tokenize(value)):
+                    bump(self._name_index, token, 1.0)
+        return scores
+
+    def select(self, rows: Iterable[Dict[str, Any]], min_score: float = 3.0) -> List[Tuple[str, ...]]:
+        selected: Set[int] = set()
+        for row in rows:
+            selected.update(prop_id for prop_id, s in self.score(row).items() if s >= min_score)
+        return [self.paths[i] for i in sorted(selected)]
+
+    def project(self, paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+        """Copy of the schema holding only `paths`, their containers' types and any $refs they use."""
+        sliced: Dict[str, Any] = {}
+        for key in ("$schema", "title", "type"):
+            if key in self.schema:
+                sliced[key] = self.schema[key]
+        pending = list(paths)
+        done: Set[Tuple[str, ...]] = set()
+        while pending:
+            path = pending.pop()
+            if path in done:
+                continue
+            done.add(path)
+            node, target = self.schema, sliced
+            for depth, key in enumerate(path):
+                node = node[key]
+                if depth == len(path) - 1:
+                    target[key] = node
+                else:
+                    target = target.setdefault(key, {})
+                    if isinstance(node, dict) and "type" in node and "type" not in target:
+                        target["type"] = node["type"]
+            pending.extend(self._refs(node))
+        return sliced
+
+    def _refs(self, node: Any) -> List[Tuple[str, ...]]:
+        refs = []
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/"):
+                refs.append(tuple(ref[2:].split("/")))
+            for value in node.values():
+                refs.extend(self._refs(value))
+        elif isinstance(node, list):
+            for value in node:
+                refs.extend(self._refs(value))
+        return refs
+
+
+class SchemaSlicer:
+    """Produces per-row schema slices and keeps a running prompt-token tally."""
+
+    def __init__(self, schema: Dict[str, Any], min_score: float = 3.0):
+        self.index = SchemaIndex(schema)
+        self.min_score = min_score
+        self._full_tokens = estimate_tokens(str(schema))
+        self.stats = {"prompts": 0, "fallbacks": 0, "full_schema_tokens": 0, "sliced_schema_tokens": 0}
+
+    def slice(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Schema fragment relevant to `rows`; the full schema when nothing matches."""
+        paths = self.index.select(rows, self.min_score)
+        self.stats["prompts"] += 1
+        self.stats["full_schema_tokens"] += self._full_tokens
+        if not paths:
+            self.stats["fallbacks"] += 1
+            self.stats["sliced_schema_tokens"] += self._full_tokens
+            return self.index.schema
+        sliced = self.index.project(paths)
+        self.stats["sliced_schema_tokens"] += estimate_tokens(str(sliced))
+        return sliced
+
+    def slice_for(self, schema: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """slice(rows) of `schema`, which must be the schema this slicer was built from."""
+        if schema is not self.index.schema and schema != self.index.schema:
+            raise ValueError("SchemaSlicer was built from a different schema than the one passed to slice")
+        return self.slice(rows)
+
+    def report(self) -> str:
+        full, sliced = self.stats["full_schema_tokens"], self.stats["sliced_schema_tokens"]
+        saved = 1 - sliced / full if full else 0.0
+        return (f"schema slicing: {self.stats['prompts']} prompts, ~{full} -> ~{sliced} schema tokens "
+                f"({saved:.0%} fewer), {self.stats['fallbacks']} fell back to the full schema")
+
+
+if __name__ == "__main__":
+    # python -m modules.schema_slicer ../third/tifg-schema.json
+    import sys
+    import json
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else "../third/tifg-schema.json") as f:
+        schema = json.load(f)
+    slicer = SchemaSlicer(schema)
+    rows = [
+        {"Parameter": "Band", "Value": "n78"},
+        {"Channel Bandwidth": "100 MHz", "SCS": "30 kHz"},
+        {"Tx Power": "43 dBm", "Antenna Gain": "17 dBi"},
+        {"Duplex": "TDD", "TDD DL/UL ratio": "7:3"},
+    ]
+    for row in rows:
+        print(row, "->", [path[-1] for path in slicer.index.select([row], slicer.min_score)])
+        slicer.slice([row])
+    print(slicer.report())
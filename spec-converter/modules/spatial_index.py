@@ -0,0 +1,220 @@
+from typing import Iterable, List, NamedTuple, Optional, Set, Union
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from modules.coordinate_store import CoordinatePoints
+from modules.test_specification import (
+    ConvexGeoPolygon, CoverageAreaPolygonContextRequest, TestSpecification,
+)
+
+_polygons = TypeAdapter(List[ConvexGeoPolygon])
+
+
+class CoverageCells(NamedTuple):
+    fragment: int        # index into TestSpecification.expectationObject
+    context: int         # index into that fragment's objectContexts
+    cell_ids: Set[int]
+
+
+def polygon_array(polygon: Union[ConvexGeoPolygon, Iterable]) -> np.ndarray:
+    """(k, 2) latitude/longitude vertex array of a ConvexGeoPolygon or a list of (lat, lon) pairs."""
+    if isinstance(polygon, ConvexGeoPolygon):
+        vertices = [(p.latitude, p.longitude) for p in polygon.convexGeoPolygon]
+    else:
+        vertices = polygon
+    array = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    if len(array) > 1 and np.array_equal(array[0], array[-1]):
+        array = array[:-1]  # closed ring: drop the repeated first vertex
+    if len(array) < 3:
+        raise ValueError(f"A convex polygon needs at least 3 vertices, got {len(array)}")
+    return array
+
+
+def points_in_convex_polygon(lat: np.ndarray, lon: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask of the points inside (or on the boundary of) a convex polygon.
+
+    A point is inside when it lies on the same side of every edge; vertex order
+    may be clockwise or counter-clockwise. Coordinates are treated as planar,
+    which is fine for the few-kilometre areas of a coverage polygon.
+    """
+    y, x = polygon[:, 0], polygon[:, 1]
+    y_next, x_next = np.roll(y, -1), np.roll(x, -1)
+    orientation = 1.0 if np.sum(x * y_next - x_next * y) >= 0 else -1.0
+    inside = np.ones(len(lat), dtype=bool)
+    for x0, y0, x1, y1 in zip(x.tolist(), y.tolist(), x_next.tolist(), y_next.tolist()):
+        cross = (x1 - x0) * (lat - y0) - (y1 - y0) * (lon - x0)
+        inside &= cross * orientation >= -1e-12
+    return inside
+
+
+class CellGridIndex:
+    """
+    Uniform lat/lon grid over cell coordinates for polygon queries.
+
+    Points are bucketed into grid cells of about `points_per_bucket` points and
+    stored sorted by bucket, so the candidates under a polygon's bounding box
+    are one contiguous slice per grid row. Only those candidates go through the
+    vectorized point-in-polygon test. Results are cell IDs: the point's
+    position in the coordinate array unless `cell_ids` are given.
+    """
+
+    def __init__(self, points: Union[CoordinatePoints, np.ndarray], cell_ids: Optional[np.ndarray] = None,
+                 points_per_bucket: int = 8):
+        array = points.array if isinstance(points, CoordinatePoints) else np.asarray(points, dtype=np.float64)
+        lat, lon = array[:, 0], array[:, 1]
+        cell_ids = np.arange(len(lat)) if cell_ids is None else np.asarray(cell_ids)
+        if len(cell_ids) != len(lat):
+            raise ValueError(f"{len(cell_ids)} cell IDs for {len(lat)} points")
+        # Cells without a usable location can never be inside a polygon
+        located = np.isfinite(lat) & np.isfinite(lon)
+        if not located.all():
+            lat, lon, cell_ids = lat[located], lon[located], cell_ids[located]
+        n = len(lat)
+        self.cell_ids = cell_ids
+
+        self.lat_min, self.lon_min = (float(lat.min()), float(lon.min())) if n else (0.0, 0.0)
+        lat_span = max(float(lat.max()) - self.lat_min, 1e-9) if n else 1e-9
+        lon_span = max(float(lon.max()) - self.lon_min, 1e-9) if n else 1e-9
+        buckets = max(1, n // points_per_bucket)
+        # Square buckets, but never more than `buckets` of them along the longer side: a collinear layout
+        # (cells along a highway) would otherwise get a tiny size and a grid of millions of empty buckets.
+        # This keeps nx * ny below 3 * buckets + 1.
+        self.size = max(float(np.sqrt(lat_span * lon_span / buckets)), max(lat_span, lon_span) / buckets)
+        self.nx = int(lon_span / self.size) + 1
+        self.ny = int(lat_span / self.size) + 1
+
+        key = self._row(lat) * self.nx + self._col(lon)
+        self.order = np.argsort(key, kind="stable")
+        self.starts = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key, minlength=self.nx * self.ny), out=self.starts[1:])
+        # Sorted copies keep every query's candidates close together in memory
+        self._lat = np.ascontiguousarray(lat[self.order])
+        self._lon = np.ascontiguousarray(lon[self.order])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _col(self, lon) -> np.ndarray:
+        return np.clip(((np.asarray(lon) - self.lon_min) / self.size).astype(np.int64), 0, self.nx - 1)
+
+    def _row(self, lat) -> np.ndarray:
+        return np.clip(((np.asarray(lat) - self.lat_min) / self.size).astype(np.int64), 0, self.ny - 1)
+
+    def _candidates(self, polygon: np.ndarray) -> np.ndarray:
+        lat_lo, lon_lo = polygon.min(axis=0)
+        lat_hi, lon_hi = polygon.max(axis=0)
+        if (lat_hi < self.lat_min or lon_hi < self.lon_min
+                or lat_lo > self.lat_min + self.ny * self.size or lon_lo > self.lon_min + self.nx * self.size):
+            return np.empty(0, dtype=np.int64)
+        ix0, ix1 = self._col([lon_lo, lon_hi]).tolist()
+        iy0, iy1 = self._row([lat_lo, lat_hi]).tolist()
+        rows = np.arange(iy0, iy1 + 1) * self.nx
+        lo, hi = self.starts[rows + ix0], self.starts[rows + ix1 + 1]
+        lengths = hi - lo
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenate the per-row ranges [lo, hi) without a Python loop
+        offsets = np.repeat(lo - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return offsets + np.arange(total)
+
+    def query_polygon(self, polygon) -> np.ndarray:
+        """Sorted cell IDs inside a convex polygon (ConvexGeoPolygon or (lat, lon) vertices)."""
+        polygon = polygon_array(polygon)
+        idx = self._candidates(polygon)
+        inside = points_in_convex_polygon(self._lat[idx], self._lon[idx], polygon)
+        return np.sort(self.cell_ids[self.order[idx[inside]]])
+
+    def query_polygons(self, polygons: Iterable) -> List[np.ndarray]:
+        return [self.query_polygon(p) for p in polygons]
+
+
+def coverage_polygons(context) -> Optional[List[ConvexGeoPolygon]]:
+    """The polygons of a CoverageAreaPolygon context, or None for any other context."""
+    if isinstance(context, CoverageAreaPolygonContextRequest):
+        return context.contextValueRange
+    # Contexts that fell through to the generic ContextRequest keep raw dicts
+    if getattr(context, "contextAttribute", None) == "CoverageAreaPolygon":
+        return _polygons.validate_python(context.contextValueRange)
+    return None
+
+
+def resolve_coverage_areas(spec: TestSpecification, index: CellGridIndex) -> List[CoverageCells]:
+    """
+    Cell IDs covered by each CoverageAreaPolygon context of a TestSpecification.
+
+    The polygons of one context are combined (IS_ALL_OF the listed areas), so
+    a context's cell set is the union of the cells inside each of them.
+    """
+    out = []
+    for i, fragment in enumerate(spec.expectationObject):
+        for j, context in enumerate(fragment.objectContexts or []):
+            polygons = coverage_polygons(context)
+            if polygons is None:
+                continue
+            cell_ids: Set[int] = set()
+            for ids in index.query_polygons(polygons):
+                cell_ids.update(ids.tolist())
+            out.append(CoverageCells(i, j, cell_ids))
+    return out
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m modules.spatial_index [cells] [polygons]
+    import sys
+    import time
+
+    n_cells = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_polygons = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = np.random.default_rng(0)
+    cells = np.full((n_cells, 3), np.nan)
+    cells[:, 0] = rng.uniform(25.0, 25.2, n_cells)
+    cells[:, 1] = rng.uniform(121.4, 121.7, n_cells)
+
+    # Random convex polygons: 4-10 vertices on a circle of 100-800 m radius
+    polygons = []
+    for _ in range(n_polygons):
+        k = int(rng.integers(4, 11))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, k))
+        radius = rng.uniform(0.001, 0.008)
+        lat0, lon0 = rng.uniform(25.0, 25.2), rng.uniform(121.4, 121.7)
+        polygons.append(np.column_stack([lat0 + radius * np.sin(angles), lon0 + radius * np.cos(angles)]))
+
+    start = time.perf_counter()
+    index = CellGridIndex(cells)
+    print(f"index {n_cells} cells into {index.nx}x{index.ny} buckets: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    results = index.query_polygons(polygons)
+    elapsed = time.perf_counter() - start
+    print(f"{n_polygons} polygon queries: {elapsed:.2f}s ({elapsed / n_polygons * 1e3:.2f} ms each, "
+          f"{sum(len(r) for r in results) / n_polygons:.0f} cells per polygon)")
+
+    # Brute force on a sample, both to check results and to compare
+    sample = range(0, n_polygons, max(1, n_polygons // 20))
+    start = time.perf_counter()
+    for i in sample:
+        brute = np.flatnonzero(points_in_convex_polygon(cells[:, 0], cells[:, 1], polygons[i]))
+        assert np.array_equal(brute, results[i]), f"polygon {i} differs from brute force"
+    per_query = (time.perf_counter() - start) / len(sample)
+    print(f"full scan: {per_query * 1e3:.1f} ms per polygon (~{per_query * n_polygons:.1f}s for all {n_polygons})")
+
+    spec = TestSpecification.model_validate({
+        "expectationVerb": "ENSURE",
+        "expectationObject": [
+            {"objectType": "RAN_SUBNETWORK"},
+            {"objectContexts": [{
+                "contextAttribute": "CoverageAreaPolygon",
+                "contextCondition": "IS_ALL_OF",
+                "contextValueRange": [{"convexGeoPolygon": [
+                    {"latitude": lat, "longitude": lon} for lat, lon in polygons[0].tolist()
+                ]}],
+            }]},
+        ],
+        "expectationTargets": [{"targetName": "PEE.AvgPower", "targetCondition": "IS_LESS_THAN",
+                                "targetValueRange": 20}],
+    })
+    for area in resolve_coverage_areas(spec, index):
+        print(f"expectationObject[{area.fragment}].objectContexts[{area.context}]: {len(area.cell_ids)} cells")
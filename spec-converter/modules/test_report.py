@@ -1,7 +1,7 @@
 from typing import List, Optional, Union
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field, EmailStr, HttpUrl
+from pydantic import BaseModel, Field, EmailStr, HttpUrl, PrivateAttr
 from modules.test_specification import TestSpecification
 from modules.test_metadata import TestMetadata
 from modules.test_bed_component import TestbedComponentsItem
@@ -20,3 +20,35 @@ class TestReport(BaseModel):
     testResults: Optional[List[Union[TestCase, TestGroup]]] = Field(None, description="test results.")
     notes: Optional[str] = Field(None, description="notes.")
 
+    # Bumped on every field assignment; freeze() marks a revision as safe to cache
+    _revision: int = PrivateAttr(0)
+    _frozen_at: Optional[int] = PrivateAttr(None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._revision += 1
+
+    def touch(self):
+        """Mark the report as changed after editing nested objects in place."""
+        self._revision += 1
+
+    def freeze(self) -> int:
+        """
+        Declare the report finished, so serializers may cache its encoded bytes.
+
+        The freeze ends with the next field assignment or touch(). Nested
+        objects edited in place are not seen, so only freeze a report that is
+        no longer being built (or touch() it after such edits).
+        """
+        self._frozen_at = self._revision
+        return self._revision
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def cache_token(self) -> Optional[int]:
+        """The revision while the report is frozen, else None (encode on every call)."""
+        return self._revision if self._frozen_at == self._revision else None
@@ -2,6 +2,7 @@ from typing import List, Optional, Union
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field, EmailStr, HttpUrl
+from modules.measurement_series import MeasurementValues
 
 class Units(str, Enum):
     """Units of the value(s)."""
@@ -60,7 +61,8 @@ class MeasurementsItem(BaseModel):
     """Test measurements recorded during the test procedure.  Measurements are in addition to values recorded or required as part a test metric."""
     name: str = Field(..., description="Name of the measurement.", max_length=255)
     description: Optional[str] = Field(None, description="Description of the measurement values.", max_length=1023)
-    values: List[Union[int, float, str, bool]] = Field(..., description="Actual measurement value(s).  Must be an arary, of at least 1 value.  All values must be in the same units.", min_items=1)
+    # Long homogeneous numeric lists are stored as a MeasurementSeries (NumPy array)
+    values: MeasurementValues = Field(..., description="Actual measurement value(s).  Must be an arary, of at least 1 value.  All values must be in the same units.", min_items=1)
     units: Units = Field(..., description="Units of the measurement value(s).")
     references: Optional[List[DecoratedLinksItem]] = Field(None, description="Link(s) to defintiion of counter or measurement parameter within O-RAN ALLIANCE, 3GPP, or other specification(s).")
 
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.expectation_engine import ExpectationEngine
+from modules.expectation_monitor import ExpectationMonitor, tail_kpi_file
+from modules.test_result import ResultType
+from modules.test_specification import ExpectationTargetRequest
+
+TARGET = ExpectationTargetRequest(targetName="PEE.AvgPower", targetCondition="IS_LESS_THAN", targetValueRange=[20])
+
+
+def kpis(passing: int, total: int, scope: str = "cell-1") -> pd.DataFrame:
+    values = [10.0] * passing + [30.0] * (total - passing)
+    return pd.DataFrame({"kpi": "PEE.AvgPower", "scope": scope, "value": values})
+
+
+@pytest.mark.parametrize("ratio, passing, total", [(0.55, 55, 100), (0.7, 7, 10), (0.29, 29, 100), (1.0, 3, 3)])
+def test_engine_passes_at_exact_ratio(ratio, passing, total):
+    verdict, = ExpectationEngine([TARGET], ratio).evaluate(kpis(passing, total), keep_values=False)
+    assert (verdict.samples, verdict.passed, verdict.result) == (total, passing, ResultType.PASS)
+
+
+def test_engine_fails_one_below_ratio():
+    verdict, = ExpectationEngine([TARGET], 0.55).evaluate(kpis(54, 100), keep_values=False)
+    assert verdict.result == ResultType.FAIL
+
+
+def test_engine_drops_rows_with_missing_fields():
+    df = pd.concat([kpis(3, 3), pd.DataFrame({"kpi": [None, "PEE.AvgPower", "PEE.AvgPower"],
+                                              "scope": ["cell-1", None, "cell-1"],
+                                              "value": [10.0, 10.0, np.nan]})], ignore_index=True)
+    verdicts = ExpectationEngine([TARGET]).evaluate(df, keep_values=False)
+    assert [(v.scope, v.samples, v.result) for v in verdicts] == [("cell-1", 3, ResultType.PASS)]
+
+
+@pytest.mark.parametrize("ratio, passing, total", [(0.55, 55, 100), (0.7, 7, 10)])
+def test_monitor_passes_at_exact_ratio(ratio, passing, total):
+    monitor = ExpectationMonitor([TARGET], window=1e9, pass_ratio=ratio)
+    for t, value in enumerate([10.0] * passing + [30.0] * (total - passing)):
+        monitor.on_sample(t, "PEE.AvgPower", "cell-1", value)
+    assert monitor.verdicts() == {("PEE.AvgPower", "cell-1"): ResultType.PASS}
+
+
+def test_monitor_skips_non_numeric_sample():
+    monitor = ExpectationMonitor([TARGET])
+    assert monitor.on_sample(1, "PEE.AvgPower", "cell-1", "n/a") == []
+    changes = monitor.on_sample(2, "PEE.AvgPower", "cell-1", 10.0)
+    assert monitor.samples_rejected == 1 and monitor.samples_seen == 1
+    assert [c.current for c in changes] == [ResultType.PASS]
+
+
+def test_tail_reads_last_line_without_newline(tmp_path):
+    path = tmp_path / "kpis.csv"
+    path.write_text("timestamp,kpi,scope,value\n1,PEE.AvgPower,cell-1,12.5\n2,PEE.AvgPower,cell-1,13")
+    samples = list(tail_kpi_file(str(path), follow=False))
+    assert [(s.timestamp, s.value) for s in samples] == [(1.0, 12.5), (2.0, 13.0)]
+
+
+def test_tail_reads_jsonl_without_trailing_newline(tmp_path):
+    path = tmp_path / "kpis.jsonl"
+    path.write_text('{"timestamp": 1, "kpi": "PEE.AvgPower", "scope": "cell-1", "value": 12.5}')
+    assert [s.value for s in tail_kpi_file(str(path), follow=False)] == [12.5]
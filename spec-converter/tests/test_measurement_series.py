@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from modules.measurement_series import MeasurementSeries, restore_measurements, spill_measurements
+from modules.test_result import ArtifactsItem, MeasurementsItem, TestCase
+
+
+def soak_case(values, description=None) -> TestCase:
+    measurement = MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=values, description=description)
+    return TestCase(number="1.1", name="Soak", description="24h throughput", result="PASS", status="mandatory",
+                    metrics=[{"description": "DRB.UEThpDl above target", "status": "mandatory", "result": "PASS",
+                              "measurements": [measurement]}])
+
+
+def test_long_homogeneous_list_becomes_series_with_same_json():
+    values = [float(i) / 3 for i in range(100)]
+    item = MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=values)
+    assert isinstance(item.values, MeasurementSeries)
+    assert item.model_dump(mode="json")["values"] == values
+
+
+def test_values_schema_keeps_min_items_and_validation_enforces_it():
+    assert MeasurementsItem.model_json_schema()["properties"]["values"]["minItems"] == 1
+    with pytest.raises(ValidationError):
+        MeasurementsItem(name="DRB.UEThpDl", units="Mbps", values=[])
+
+
+@pytest.mark.parametrize("length", [None, 0, 10, 1000, 1005, 1010, 1015, 1022, 1023])
+def test_spill_restore_round_trips_description(tmp_path, length):
+    values = np.arange(20_000, dtype=np.float64)
+    description = None if length is None else "x" * length
+    case = soak_case(values, description)
+    assert spill_measurements(case, tmp_path) == 1
+    measurement = case.metrics[0].measurements[0]
+    assert len(measurement.values) == 3 and len(measurement.description) <= 1023
+    assert (tmp_path / case.artifacts[0].path).exists()
+
+    assert restore_measurements(case, tmp_path) == 1
+    measurement = case.metrics[0].measurements[0]
+    assert measurement.description == (description or None)
+    assert measurement.values == MeasurementSeries(values)
+    assert case.artifacts is None
+
+
+def test_restore_leaves_unrelated_artifacts(tmp_path):
+    case = soak_case(np.arange(20_000, dtype=np.float64))
+    case.artifacts = [ArtifactsItem(name="log", path="logs/run.txt", description="Run log.")]
+    spill_measurements(case, tmp_path)
+    restore_measurements(case, tmp_path)
+    assert [a.path for a in case.artifacts] == ["logs/run.txt"]
+
+
+def test_respill_of_memory_mapped_series_to_same_path(tmp_path):
+    case = soak_case(np.arange(20_000, dtype=np.float64))
+    spill_measurements(case, tmp_path)
+    restore_measurements(case, tmp_path, mmap=True)
+    spill_measurements(case, tmp_path)
+    restore_measurements(case, tmp_path, mmap=False)
+    assert case.metrics[0].measurements[0].values == MeasurementSeries(np.arange(20_000, dtype=np.float64))
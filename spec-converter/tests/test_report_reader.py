@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from modules.report_reader import ReportReadError, ResultScanner
+
+
+def case(number: str) -> dict:
+    return {"number": number, "name": f"Case {number}", "description": "d", "result": "PASS", "status": "mandatory"}
+
+
+def scan(doc: str, chunk_size: int):
+    scanner = ResultScanner()
+    found = []
+    for start in range(0, len(doc), chunk_size):
+        found += [(path, json.loads(raw)["number"]) for path, raw, _ in scanner.feed(doc[start:start + chunk_size])]
+    scanner.finish()
+    return found
+
+
+EXPECTED = [(("1",), "1.1"), (("1", "1.2"), "1.2.1"), (("1",), "1.3"), ((), "2")]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10_000])
+def test_group_path_with_number_before_group_items(chunk_size):
+    doc = {"testResults": [{"number": "1", "name": "G", "groupItems": [
+        case("1.1"), {"number": "1.2", "name": "g", "groupItems": [case("1.2.1")]}, case("1.3")]}, case("2")]}
+    assert scan(json.dumps(doc), chunk_size) == EXPECTED
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10_000])
+def test_group_path_with_number_after_group_items(chunk_size):
+    doc = {"testResults": [{"groupItems": [
+        case("1.1"), {"groupItems": [case("1.2.1")], "name": "g", "number": "1.2"}, case("1.3")],
+        "number": "1", "name": "G"}, case("2")]}
+    assert sorted(scan(json.dumps(doc), chunk_size)) == sorted(EXPECTED)
+
+
+def test_group_without_number_gets_placeholder():
+    doc = {"testResults": [{"name": "G", "groupItems": [case("1.1")]}]}
+    assert scan(json.dumps(doc), 10_000) == [(("?",), "1.1")]
+
+
+def test_truncated_document_raises():
+    with pytest.raises(ReportReadError):
+        scan(json.dumps({"testResults": [case("1")]})[:-5], 10_000)
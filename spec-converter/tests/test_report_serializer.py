@@ -0,0 +1,38 @@
+import datetime
+import gzip
+import json
+
+from modules.report_serializer import ReportSerializer
+from modules.test_metadata import TestMetadata, TestType
+from modules.test_report import TestReport
+
+
+def report() -> TestReport:
+    return TestReport(
+        testMetadata=TestMetadata(startDate=datetime.datetime(2025, 1, 1), dutName="Energy saving rApp",
+                                  testType=TestType.FUNCTIONAL),
+        testSpecifications=[{"expectationVerb": "EXPECT", "expectationObject": [{"objectType": "RAN_SUBNETWORK"}],
+                             "expectationTargets": [{"targetName": "DRB.UEThpDl", "targetCondition": "IS_GREATER_THAN",
+                                                     "targetValueRange": [10]}]}],
+    )
+
+
+def test_unfrozen_report_is_encoded_every_time():
+    serializer, r = ReportSerializer(), report()
+    serializer.encode(r)
+    r.testMetadata.dutName = "edited in place"
+    assert json.loads(serializer.encode(r))["testMetadata"]["dutName"] == "edited in place"
+    assert serializer.stats == {"hits": 0, "encodes": 2}
+
+
+def test_frozen_report_is_cached_until_changed():
+    serializer, r = ReportSerializer(), report()
+    r.freeze()
+    body, headers = serializer.body(r, "json", "gzip")
+    assert serializer.body(r, "json", "gzip")[0] is body
+    assert headers == {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    assert serializer.stats == {"hits": 1, "encodes": 1}
+
+    r.notes = "changed"
+    assert json.loads(gzip.decompress(serializer.encode(r, "json", "gzip")))["notes"] == "changed"
+    assert serializer.stats["encodes"] == 2
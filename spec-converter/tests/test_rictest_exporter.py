@@ -0,0 +1,51 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from modules.configuration import ConfigurationParameters
+from modules.coordinate_store import CoordinatePoints
+from modules.rictest_exporter import CELL_FIELDS, rictest_config, write_rictest_config
+
+
+def strict_loads(data: bytes):
+    def reject(constant):
+        raise ValueError(f"{constant} is not JSON")
+    return json.loads(data, parse_constant=reject)
+
+
+def params(n_cells, points, **fields) -> ConfigurationParameters:
+    p = ConfigurationParameters(deploymentScale="macro", numberOfCells=n_cells, **fields)
+    p.geoLocGrp = CoordinatePoints(np.array(points, dtype=np.float64))
+    return p
+
+
+def test_coordinates_round_trip_and_missing_altitude_is_omitted():
+    cells = rictest_config([params(2, [[24.123456789, 121.5, 30.0], [24.5, 121.25, np.nan]])])["Cell_Config"][0]
+    assert cells["Number of Cells"] == 2
+    assert [(c["Latitude"], c["Longitude"], c.get("Altitude")) for c in cells["cellsConfig"]] == \
+        [(24.123456789, 121.5, 30.0), (24.5, 121.25, None)]
+
+
+def test_percent_in_field_text_is_not_a_format_spec():
+    cells = rictest_config([params(3, [[24.5, 121.5, 1.0]] * 2, tddDlUlRatio="70%/30% %s %r")])
+    assert [c["Advanced traffic model"] for c in cells["Cell_Config"][0]["cellsConfig"]] == ["70%/30% %s %r"] * 3
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 50_000])
+def test_non_finite_coordinates_still_write_valid_json(chunk_rows):
+    buffer = io.BytesIO()
+    layout = [[24.5, 121.5, np.inf], [np.nan, 121.0, 5.0], [24.0, np.inf, 1.0], [24.0, 121.0, 2.0]]
+    stats = write_rictest_config([params(4, layout)], buffer, chunk_rows=chunk_rows)
+    cells = strict_loads(buffer.getvalue())["Cell_Config"][0]["cellsConfig"]
+    assert [sorted(set(c) - set(CELL_FIELDS)) for c in cells] == \
+        [["Latitude", "Longitude"], [], [], ["Altitude", "Latitude", "Longitude"]]
+    assert stats["unplaced_cells"] == 2 and stats["cells"] == 4
+
+
+def test_path_output_is_written_atomically(tmp_path):
+    path = tmp_path / "rictest_config.json"
+    write_rictest_config([params(1, [[24.5, 121.5, 1.0]])], path)
+    assert strict_loads(path.read_bytes())["Cell_Config"][0]["Number of Cells"] == 1
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,43 @@
+import json
+
+from modules.rule_mapper import RuleMapper
+
+
+def learned(mapper, *keys):
+    return {k: mapper.headers[k] for k in keys if k in mapper.headers}
+
+
+def test_learns_unambiguous_header():
+    mapper = RuleMapper()
+    mapper.learn({"Zzz sites": "4", "Qqq": "7"}, {"numberOfCells": 4})
+    assert learned(mapper, "zzz sites", "qqq") == {"zzz sites": "numberOfCells"}
+    assert mapper.map_row({"Zzz sites": "12"}) == {"numberOfCells": 12}
+
+
+def test_two_cells_with_the_same_value_teach_nothing():
+    mapper = RuleMapper()
+    mapper.learn({"Foo cnt": "4", "Bar cnt": "4"}, {"numberOfCells": 4})
+    assert learned(mapper, "foo cnt", "bar cnt") == {}
+    assert mapper.stats["learned_headers"] == 0
+
+
+def test_field_already_resolved_in_row_is_not_learned_again():
+    mapper = RuleMapper()
+    # "Number of cells" already resolves to numberOfCells; the coincidental "Zzz" cell must not take it over
+    mapper.learn({"Number of cells": "4", "Zzz": "4"}, {"numberOfCells": 4})
+    assert learned(mapper, "zzz") == {}
+
+
+def test_null_answer_fields_do_not_match_unparsable_cells():
+    mapper = RuleMapper()
+    mapper.learn({"Zzz": "not a number"}, {"height": None})
+    assert learned(mapper, "zzz") == {}
+
+
+def test_saved_dictionary_has_only_unambiguous_aliases(tmp_path):
+    path = tmp_path / "headers.json"
+    mapper = RuleMapper(path)
+    mapper.learn({"Foo cnt": "4", "Bar cnt": "4", "Zzz sites": "30"}, {"numberOfCells": 4, "height": 30})
+    mapper.save()
+    assert json.loads(path.read_text()) == {"zzz sites": "height"}
+    assert RuleMapper(path).resolve_header("Zzz sites") == "height"